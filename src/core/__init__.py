@@ -14,6 +14,7 @@ class Core:
         self._listeners = {"main": KeyEventListener()}
         self._gizmo_root = NodePath("gizmo_root")
         self._long_process_id = ""
+        self._long_process_stats = {}
 
         def handle_pending_tasks(task):
 
@@ -38,6 +39,10 @@ class Core:
         GD.set_default("alt_down", False)
         GD.set_default("long_process_running", False)
         GD.set_default("progress_steps", 0)
+        # the maximum time (in milliseconds) that a long process is allowed to
+        # take up each frame
+        GD.set_default("long_process_frame_budget", 25.)
+        Mgr.expose("long_process_stats", lambda process_id: self._long_process_stats.get(process_id))
 
         def enter_suppressed_state(*args):
 
@@ -83,6 +88,8 @@ class Core:
         # The given process is expected to be a Python generator object;
         # it will be handled over multiple frames while a progressbar gives an indication
         # of when it will finish.
+        # Each frame, the process is advanced as many times as possible within the
+        # time budget set through GD["long_process_frame_budget"].
 
         if GD["long_process_running"]:
             return False
@@ -92,28 +99,72 @@ class Core:
         self._long_process_id = process_id
         task_mgr = GD.showbase.task_mgr
         Mgr.update_remotely("progress", "start", descr, cancellable)
+        stats = {"start_time": time.perf_counter(), "frames": 0, "steps": 0, "estimate": 0}
 
         def progress(task):
 
             progress_steps = GD["progress_steps"]
 
             if progress_steps:
-                Mgr.update_remotely("progress", "set_rate", 1. / progress_steps)
-                Notifiers.mgr.debug(f'Long-running process to be handled over {progress_steps} frames.')
+                stats["estimate"] = progress_steps
+                Notifiers.mgr.debug(f'Long-running process estimated to take {progress_steps} steps.')
                 GD["progress_steps"] = 0
 
-            if next(process):
-                Mgr.update_remotely("progress", "advance")
-                return task.cont
+            stats["frames"] += 1
+            end_time = time.perf_counter() + GD["long_process_frame_budget"] * .001
 
-            self.__end_long_process()
-            Notifiers.mgr.debug(f'****** Long-running process finished: {process_id}.')
+            while True:
+
+                if not next(process):
+                    self.__end_long_process()
+                    self.__report_long_process_stats(process_id, stats)
+                    return
+
+                stats["steps"] += 1
+
+                # the process could have been cancelled during the last step
+                if not GD["long_process_running"]:
+                    return
+
+                if time.perf_counter() >= end_time:
+                    break
+
+            estimate = stats["estimate"]
+
+            if estimate:
+
+                steps = stats["steps"]
+
+                # if the estimated number of steps turns out to be too low, increase
+                # it so the progress bar slows down instead of stalling at the end
+                if steps > estimate * .9:
+                    stats["estimate"] = estimate = int(steps * 1.25)
+
+                Mgr.update_remotely("progress", "set", steps / estimate)
+
+            return task.cont
 
         task_mgr.add(progress, "progress")
         Notifiers.mgr.debug(f'****** Long-running process started: {process_id}.')
 
         return True
 
+    def __report_long_process_stats(self, process_id, stats):
+
+        wall_time = time.perf_counter() - stats["start_time"]
+        frames = stats["frames"]
+        steps = stats["steps"]
+        steps_per_frame = steps / frames if frames else 0.
+        self._long_process_stats[process_id] = {
+            "wall_time": wall_time,
+            "frames": frames,
+            "steps": steps,
+            "steps_per_frame": steps_per_frame
+        }
+        Notifiers.mgr.debug(f'****** Long-running process finished: {process_id}'
+                            f' ({wall_time:.3f} s, {frames} frames, {steps} steps,'
+                            f' {steps_per_frame:.1f} steps/frame).')
+
     def __end_long_process(self):
 
         Mgr.update_remotely("progress", "end")
@@ -514,7 +514,11 @@ class ObjectManager:
 
         self._objects = {}
         self._object_id = 0
-        self._objects_backup = None
+        # instead of a full copy of the registry, a journal of the changes made
+        # to it since the last checkpoint is kept, as (key, previous object)
+        # pairs, where the previous object is None if the key wasn't registered
+        self._journal = None
+        self._journaled_objects = None
         self._object_id_backup = None
 
         Mgr.accept(f"create_{obj_type}", create_func)
@@ -546,6 +550,16 @@ class ObjectManager:
 
         self._object_id = obj_id
 
+    def __journal_changes(self, keys):
+
+        # after a reset, the journaled registry is no longer the current one and
+        # will remain as it is, so changes to the new registry need no recording
+        if self._journal is None or self._objects is not self._journaled_objects:
+            return
+
+        objects = self._objects
+        self._journal.extend((key, objects.get(key)) for key in keys)
+
     def __register_object(self, obj, restore=True):
 
         if self._pickable:
@@ -553,6 +567,7 @@ class ObjectManager:
         else:
             key = obj.id
 
+        self.__journal_changes((key,))
         self._objects[key] = obj
 
         if self._pickable and restore:
@@ -565,6 +580,7 @@ class ObjectManager:
         else:
             d = {obj.id: obj for obj in objects}
 
+        self.__journal_changes(d)
         self._objects.update(d)
 
         if self._pickable and restore:
@@ -577,6 +593,7 @@ class ObjectManager:
         else:
             key = obj.id
 
+        self.__journal_changes((key,))
         del self._objects[key]
 
         if self._pickable:
@@ -589,6 +606,8 @@ class ObjectManager:
         else:
             ids = [obj.id for obj in objects]
 
+        self.__journal_changes(ids)
+
         for i in ids:
             del self._objects[i]
 
@@ -602,17 +621,28 @@ class ObjectManager:
 
     def __create_registry_backup(self):
 
-        self._objects_backup = self._objects.copy()
+        self._journal = []
+        self._journaled_objects = self._objects
         self._object_id_backup = self._object_id
 
     def __restore_registry_backup(self):
 
-        self._objects = self._objects_backup
+        objects = self._journaled_objects
+
+        for key, obj in reversed(self._journal):
+            if obj is None:
+                del objects[key]
+            else:
+                objects[key] = obj
+
+        self._journal = []
+        self._objects = objects
         self._object_id = self._object_id_backup
 
     def __remove_registry_backup(self):
 
-        self._objects_backup = None
+        self._journal = None
+        self._journaled_objects = None
         self._object_id_backup = None
 
 
@@ -1,6 +1,85 @@
 from panda3d.core import SparseArray
 from .mgr import CoreManager as Mgr
 from .base import Notifiers, PendingTasks
+import time
+
+
+def _log_debug(get_text):
+    """
+    Log the text returned by the given function, but only if debug output is
+    enabled, to avoid formatting potentially huge SparseArrays for nothing.
+
+    """
+
+    if Notifiers.reg.getDebug():
+        Notifiers.reg.debug(get_text())
+
+
+def _reserve_ids(id_ranges, count):
+    """
+    Remove the given number of lowest IDs from the given SparseArray, taking
+    them in contiguous runs.
+    Return the IDs in a list, as well as a list of the (begin, size) tuples
+    describing the runs.
+    Fewer IDs are returned if not enough of them are available.
+
+    """
+
+    ids = []
+    runs = []
+
+    if id_ranges.is_inverse():
+
+        # this should not happen, as the ranges are bounded, but should it
+        # happen anyway, take one ID at a time
+        while id_ranges and len(ids) < count:
+            next_id = id_ranges.get_lowest_on_bit()
+            id_ranges.clear_bit(next_id)
+            ids.append(next_id)
+            runs.append((next_id, 1))
+
+        return ids, runs
+
+    for i in range(id_ranges.get_num_subranges()):
+
+        begin = id_ranges.get_subrange_begin(i)
+        end = min(id_ranges.get_subrange_end(i), begin + count - len(ids))
+        runs.append((begin, end - begin))
+        ids.extend(range(begin, end))
+
+        if len(ids) == count:
+            break
+
+    for begin, size in runs:
+        id_ranges.clear_range(begin, size)
+
+    return ids, runs
+
+
+def benchmark_id_allocation(count=1000000):
+    """
+    Compare the time taken to allocate the given number of picking color IDs
+    one at a time with that of allocating them all at once.
+    Return the times (in seconds) as a (single, bulk) tuple.
+
+    """
+
+    id_ranges = SparseArray.range(1, 2 ** 24)
+    start_time = time.perf_counter()
+
+    for _ in range(count):
+        next_id = id_ranges.get_lowest_on_bit()
+        id_ranges.clear_bit(next_id)
+
+    single_time = time.perf_counter() - start_time
+    id_ranges = SparseArray.range(1, 2 ** 24)
+    start_time = time.perf_counter()
+    _reserve_ids(id_ranges, count)
+    bulk_time = time.perf_counter() - start_time
+    Notifiers.reg.info(f'Allocated {count} picking color IDs in {single_time :.3f} s '
+                       f'(one at a time) and {bulk_time :.3f} s (in bulk).')
+
+    return single_time, bulk_time
 
 
 # All managers of pickable objects should derive from the following class
@@ -16,6 +95,7 @@ class PickingColorIDManager:
         Mgr.accept("update_picking_col_id_ranges", cls.__update_id_ranges)
         Mgr.accept("create_id_range_backups", cls.__create_id_range_backups)
         Mgr.accept("restore_id_range_backups", cls.__restore_id_range_backups)
+        Mgr.expose("next_picking_color_ids", cls.__get_next_ids)
         Mgr.add_notification_handler("long_process_cancelled", "picking_col_mgr",
                                      cls.__restore_id_range_backups)
 
@@ -27,6 +107,11 @@ class PickingColorIDManager:
         for obj_type in types:
             cls._mgrs[obj_type].reset()
 
+    @classmethod
+    def __get_next_ids(cls, obj_type, count):
+
+        return cls._mgrs[obj_type].get_next_picking_color_ids(count)
+
     @classmethod
     def __update_id_ranges(cls, as_task=True):
 
@@ -89,27 +174,69 @@ class PickingColorIDManager:
         self._id_ranges = SparseArray.range(1, 2 ** 24)
         self._ids_to_recover = SparseArray()
         self._ids_to_discard = SparseArray()
-        self._id_ranges_backup = None
+        # instead of a full copy of the ID ranges, the IDs whose availability
+        # changed since the last checkpoint are kept, such that the ranges can
+        # be restored by flipping those IDs back
+        self._id_range_changes = None
 
     def reset(self):
 
-        self._id_ranges = SparseArray.range(1, 2 ** 24)
+        id_ranges = SparseArray.range(1, 2 ** 24)
+
+        if self._id_range_changes is not None:
+            self._id_range_changes ^= self._id_ranges ^ id_ranges
+
+        self._id_ranges = id_ranges
         self._ids_to_recover = SparseArray()
         self._ids_to_discard = SparseArray()
         Notifiers.reg.debug(f'"{self.get_managed_object_type()}" picking color IDs reset.')
 
+    def __handle_id_exhaustion(self, requested_count, available_count):
+
+        # TODO: pop up a message notifying the user that no more objects
+        # can be created
+        Notifiers.reg.warning(f'Out of "{self.get_managed_object_type()}" picking color IDs; '
+                              f'{available_count} of {requested_count} requested IDs available.')
+
     def get_next_picking_color_id(self):
 
         if not self._id_ranges:
-            # TODO: pop up a message notifying the user that no more objects
-            # can be created
+            self.__handle_id_exhaustion(1, 0)
             return
 
         next_id = self._id_ranges.get_lowest_on_bit()
         self._id_ranges.clear_bit(next_id)
+        changes = self._id_range_changes
+
+        if changes is not None:
+            if changes.get_bit(next_id):
+                changes.clear_bit(next_id)
+            else:
+                changes.set_bit(next_id)
 
         return next_id
 
+    def get_next_picking_color_ids(self, count):
+        """
+        Reserve the given number of picking color IDs in one go, taking them from
+        the lowest available ranges, just like the same number of calls to
+        get_next_picking_color_id() would.
+        Return a list of the IDs, padded with None if not enough IDs are left.
+
+        """
+
+        ids, runs = _reserve_ids(self._id_ranges, count)
+
+        if self._id_range_changes is not None:
+            for begin, size in runs:
+                self._id_range_changes ^= SparseArray.range(begin, size)
+
+        if len(ids) < count:
+            self.__handle_id_exhaustion(count, len(ids))
+            ids.extend([None] * (count - len(ids)))
+
+        return ids
+
     def recover_picking_color_id(self, color_id):
         """ Recover the given color ID, so it can be used again """
 
@@ -130,8 +257,8 @@ class PickingColorIDManager:
                                   f'already recovered!')
 
         self._ids_to_recover |= s
-        Notifiers.reg.debug(f'****** {self.get_managed_object_type()} picking color IDs '
-                            f'to be recovered:\n{self._ids_to_recover}')
+        _log_debug(lambda: f'****** {self.get_managed_object_type()} picking color IDs '
+                           f'to be recovered:\n{self._ids_to_recover}')
 
     def discard_picking_color_id(self, color_id):
         """ Discard the given color ID, so it can no longer be used """
@@ -153,8 +280,8 @@ class PickingColorIDManager:
                                   f'already discarded!')
 
         self._ids_to_discard |= s
-        Notifiers.reg.debug(f'****** {self.get_managed_object_type()} picking color IDs '
-                            f'to be discarded:\n{self._ids_to_discard}')
+        _log_debug(lambda: f'****** {self.get_managed_object_type()} picking color IDs '
+                           f'to be discarded:\n{self._ids_to_discard}')
 
     def update_picking_color_id_ranges(self):
 
@@ -165,8 +292,8 @@ class PickingColorIDManager:
         if not (ids_to_recover or ids_to_discard):
             return
 
-        Notifiers.reg.debug(f'++++++ Updating {self.get_managed_object_type()} '
-                            f'picking color IDs ranges, starting with:\n{id_ranges}')
+        _log_debug(lambda: f'++++++ Updating {self.get_managed_object_type()} '
+                           f'picking color IDs ranges, starting with:\n{id_ranges}')
 
         # remove the common IDs from both arrays
         if ids_to_recover.has_bits_in_common(ids_to_discard):
@@ -175,33 +302,41 @@ class PickingColorIDManager:
             ids_to_recover &= ~ids_to_discard
 
         if ids_to_recover:
-            Notifiers.reg.debug(f'++++++ Recovering {self.get_managed_object_type()} '
-                                f'picking color IDs:\n{ids_to_recover}')
+            _log_debug(lambda: f'++++++ Recovering {self.get_managed_object_type()} '
+                               f'picking color IDs:\n{ids_to_recover}')
+
+            if self._id_range_changes is not None:
+                self._id_range_changes ^= ids_to_recover & ~id_ranges
+
             id_ranges |= ids_to_recover
 
         if ids_to_discard:
-            Notifiers.reg.debug(f'++++++ Discarding {self.get_managed_object_type()} '
-                                f'picking color IDs:\n{ids_to_discard}')
+            _log_debug(lambda: f'++++++ Discarding {self.get_managed_object_type()} '
+                               f'picking color IDs:\n{ids_to_discard}')
+
+            if self._id_range_changes is not None:
+                self._id_range_changes ^= ids_to_discard & id_ranges
+
             id_ranges &= ~ids_to_discard
 
         ids_to_recover.clear()
         ids_to_discard.clear()
-        Notifiers.reg.debug(f'++++++ New {self.get_managed_object_type()} '
-                            f'picking color ID ranges:\n{id_ranges}')
+        _log_debug(lambda: f'++++++ New {self.get_managed_object_type()} '
+                           f'picking color ID ranges:\n{id_ranges}')
 
     def create_id_ranges_backup(self):
 
-        self._id_ranges_backup = SparseArray(self._id_ranges)
-        Notifiers.reg.debug(f'"{self.get_managed_object_type()}" picking color IDs '
-                            f'backup created:\n{self._id_ranges_backup}')
+        self._id_range_changes = SparseArray()
+        Notifiers.reg.debug(f'"{self.get_managed_object_type()}" picking color IDs backup created.')
 
     def restore_id_ranges_backup(self):
 
-        self._id_ranges = self._id_ranges_backup
-        Notifiers.reg.debug(f'"{self.get_managed_object_type()}" picking color '
-                            f'IDs backup restored:\n{self._id_ranges}')
+        self._id_ranges ^= self._id_range_changes
+        self._id_range_changes = SparseArray()
+        _log_debug(lambda: f'"{self.get_managed_object_type()}" picking color '
+                           f'IDs backup restored:\n{self._id_ranges}')
 
     def remove_id_ranges_backup(self):
 
-        self._id_ranges_backup = None
+        self._id_range_changes = None
         Notifiers.reg.debug(f'"{self.get_managed_object_type()}" picking color IDs backup removed.')
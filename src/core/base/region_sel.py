@@ -0,0 +1,512 @@
+from .base import *
+import array
+import re
+
+
+# the positions of the set bits within each possible byte value
+_BYTE_BITS = tuple(tuple(j for j in range(8) if value & (1 << j)) for value in range(256))
+_NON_ZERO_BYTES = re.compile(rb"[^\x00]+")
+
+
+def get_selected_indices(mask_data):
+    """
+    Return the ascending list of indices whose bits are set in the given
+    bitmask, as written by the region-selection shaders into a 1D r32i texture.
+
+    Since the bits of index i are set in texel i >> 5 at bit position i & 31 and
+    texels are stored in little-endian byte order, the index of each set bit is
+    simply 8 times the position of its byte within the mask data plus its
+    position within that byte; only the (usually few) non-zero bytes are looked
+    at, with runs of zero bytes being skipped in bulk.
+
+    """
+
+    data = bytes(mask_data)
+    byte_bits = _BYTE_BITS
+    indices = []
+    extend = indices.extend
+
+    for match in _NON_ZERO_BYTES.finditer(data):
+        for pos, value in enumerate(match.group(), match.start()):
+            offset = pos * 8
+            extend([offset + j for j in byte_bits[value]])
+
+    return indices
+
+
+def benchmark_mask_decoding(index_count=1000000, densities=(.001, .01, .1, .5)):
+    """
+    Time the decoding of synthetic region-selection bitmasks with the given
+    numbers of set bits (as fractions of index_count), using both the bulk
+    decoding of get_selected_indices and a loop over every bit of every texel.
+    Return a dict mapping each density to a tuple of both timings (in seconds).
+
+    """
+
+    import random
+
+    results = {}
+
+    for density in densities:
+
+        texels = array.array("I", bytes(4 * ((index_count + 31) // 32)))
+
+        for index in random.sample(range(index_count), int(index_count * density)):
+            texels[index >> 5] |= 1 << (index & 31)
+
+        start_time = time.perf_counter()
+        indices = get_selected_indices(memoryview(texels).cast("B"))
+        bulk_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        loop_indices = []
+
+        for i, mask in enumerate(texels):
+            for j in range(32):
+                if mask & (1 << j):
+                    loop_indices.append(32 * i + j)
+
+        loop_time = time.perf_counter() - start_time
+
+        assert indices == loop_indices
+
+        results[density] = (bulk_time, loop_time)
+        Notifiers.geom.info(f"Decoded {len(indices)} of {index_count} indices in"
+                            f" {bulk_time * 1000.:.1f} ms (bit loop: {loop_time * 1000.:.1f} ms).")
+
+    return results
+
+
+def use_cpu_region_select():
+    """
+    Check whether region-selection should be done on the CPU, by projecting
+    geometry through the lens of the region-selection camera and testing the
+    resulting 2D coordinates against the selection region, instead of rendering
+    that geometry with the region-selection shaders into an offscreen buffer.
+
+    The "backend" option of the "region_select" global data can be set to "gpu"
+    (the default), "cpu" or "auto"; in the latter case, the CPU is used only
+    when the graphics hardware does not support the needed shaders (e.g. in
+    offscreen sessions).
+    Since the CPU backend does not select exactly the same things as the shaders
+    (see SelectionRegion), it is never chosen based on the amount of geometry.
+
+    """
+
+    backend = GD["region_select"].get("backend", "gpu")
+
+    if backend != "auto":
+        return backend == "cpu"
+
+    gsg = GD.window.get_gsg() if GD.window else None
+
+    return gsg is None or not gsg.supports_glsl
+
+
+def get_projection_mat(node_path, cam):
+    """
+    Return the matrix that transforms points in the space of the given node_path
+    to clip space, as seen through the lens of the given camera NodePath.
+
+    """
+
+    return node_path.get_mat(cam) * cam.node().get_lens().get_projection_mat()
+
+
+def project_points(points, mat, size):
+    """
+    Project the given points through the given projection matrix onto a buffer of
+    the given size.
+
+    The points are given as a flat sequence of x, y, z coordinates; they are
+    projected to a flat array of x, y pixel coordinates. Points that are clipped
+    by the near or far plane get NaN coordinates, such that they never compare as
+    being inside of any region.
+
+    """
+
+    (m00, m01, m02, m03), (m10, m11, m12, m13), (m20, m21, m22, m23), \
+        (m30, m31, m32, m33) = [tuple(row) for row in mat]
+    w_b, h_b = size
+    s_x = .5 * w_b
+    s_y = .5 * h_b
+    nan = float("nan")
+    coords = []
+    append = coords.append
+    it = iter(points)
+
+    for x, y, z in zip(it, it, it):
+
+        w = x * m03 + y * m13 + z * m23 + m33
+        c_z = x * m02 + y * m12 + z * m22 + m32
+
+        if w <= 0. or not -w <= c_z <= w:
+            append(nan)
+            append(nan)
+            continue
+
+        append(((x * m00 + y * m10 + z * m20 + m30) / w + 1.) * s_x)
+        append(((x * m01 + y * m11 + z * m21 + m31) / w + 1.) * s_y)
+
+    return array.array("f", coords)
+
+
+def read_geom_points(geom):
+    """ Return a flat list of the vertex coordinates of the given Geom """
+
+    reader = GeomVertexReader(geom.get_vertex_data(), InternalName.get_vertex())
+    points = []
+
+    while not reader.is_at_end():
+        points.extend(reader.get_data3())
+
+    return points
+
+
+class SelectionRegion:
+    """
+    The 2D region used for region-selection on the CPU.
+
+    All coordinates are in pixels of the (virtual) region-selection buffer, whose
+    lower left corner is at (0., 0.); the region is the rectangle spanned by that
+    buffer, optionally constrained to an ellipse (defined by the same data as the
+    one passed to the elliptic region-selection shaders) or to the non-empty
+    texels of a mask texture.
+
+    Unlike the region-selection shaders, back-facing polygons are not excluded,
+    holes in a mask are ignored when enclosing polygons, and point helpers are
+    tested by the position of their origin only.
+
+    """
+
+    def __init__(self, size, ellipse_data=(), mask_tex=None):
+
+        self._size = size
+        self._ellipse_data = ellipse_data
+        self._mask = None
+        anchor = (size[0] * .5, size[1] * .5)
+
+        if ellipse_data:
+
+            radius, aspect_ratio, offset_x, offset_y = ellipse_data
+            w_b, h_b = size
+            x = min(w_b - 1., max(0., radius - offset_x))
+            y = min(h_b - 1., max(0., radius / aspect_ratio - offset_y))
+            anchor = (x, y)
+
+        elif mask_tex and mask_tex.has_ram_image():
+
+            # the mask texture has the same size as the buffer, and its texels
+            # are stored from the bottom row upwards, just like the pixels of
+            # the buffer
+            ram_image = bytes(mask_tex.get_ram_image_as("RGBA"))
+            self._mask = memoryview(ram_image).cast("I")
+            index = (len(ram_image) - len(ram_image.lstrip(b"\0"))) // 4
+            w_b = size[0]
+            anchor = (index % w_b + .5, index // w_b + .5) if index < len(self._mask) else None
+
+        self._anchor = anchor if anchor and self.contains_point(*anchor) else None
+
+    @property
+    def size(self):
+
+        return self._size
+
+    def contains_point(self, x, y):
+
+        w_b, h_b = self._size
+
+        if not (0. <= x < w_b and 0. <= y < h_b):
+            return False
+
+        if self._ellipse_data:
+            radius, aspect_ratio, offset_x, offset_y = self._ellipse_data
+            d_x = offset_x + int(x) - radius
+            d_y = (offset_y + int(y)) * aspect_ratio - radius
+            return d_x * d_x + d_y * d_y <= radius * radius
+
+        if self._mask is not None:
+            return self._mask[int(y) * w_b + int(x)] != 0
+
+        return True
+
+    def get_contained_points(self, coords):
+        """
+        Return a bytearray with a non-zero value for every point in the given
+        flat sequence of x, y coordinates that lies inside of this region.
+
+        """
+
+        w_b, h_b = self._size
+        it = iter(coords)
+        flags = bytearray(x >= 0. and y >= 0. and x < w_b and y < h_b for x, y in zip(it, it))
+
+        if self._ellipse_data:
+
+            radius, aspect_ratio, offset_x, offset_y = self._ellipse_data
+            r_sq = radius * radius
+
+            for i in range(len(flags)):
+                if flags[i]:
+                    d_x = offset_x + int(coords[i * 2]) - radius
+                    d_y = (offset_y + int(coords[i * 2 + 1])) * aspect_ratio - radius
+                    flags[i] = d_x * d_x + d_y * d_y <= r_sq
+
+        elif self._mask is not None:
+
+            mask = self._mask
+
+            for i in range(len(flags)):
+                if flags[i]:
+                    flags[i] = mask[int(coords[i * 2 + 1]) * w_b + int(coords[i * 2])] != 0
+
+        return flags
+
+    def __clip_segment(self, x1, y1, x2, y2):
+        """ Clip the given segment to the buffer rectangle (Liang-Barsky) """
+
+        w_b, h_b = self._size
+        d_x = x2 - x1
+        d_y = y2 - y1
+        t_min = 0.
+        t_max = 1.
+
+        for p, q in ((-d_x, x1), (d_x, w_b - x1), (-d_y, y1), (d_y, h_b - y1)):
+
+            if p == 0.:
+                if q < 0.:
+                    return None
+                continue
+
+            t = q / p
+
+            if p < 0.:
+                if t > t_max:
+                    return None
+                t_min = max(t_min, t)
+            else:
+                if t < t_min:
+                    return None
+                t_max = min(t_max, t)
+
+        return (x1 + t_min * d_x, y1 + t_min * d_y, x1 + t_max * d_x, y1 + t_max * d_y)
+
+    def __sample_segment(self, x1, y1, x2, y2):
+
+        w_b, h_b = self._size
+        count = int(max(abs(x2 - x1), abs(y2 - y1))) + 1
+        step_x = (x2 - x1) / count
+        step_y = (y2 - y1) / count
+
+        for i in range(count + 1):
+            x = min(w_b - 1., x1 + i * step_x)
+            y = min(h_b - 1., y1 + i * step_y)
+            yield x, y
+
+    def intersects_segment(self, x1, y1, x2, y2):
+
+        if x1 != x1 or x2 != x2:
+            # at least one of the end points got clipped during projection
+            return False
+
+        clipped = self.__clip_segment(x1, y1, x2, y2)
+
+        if clipped is None:
+            return False
+
+        x1, y1, x2, y2 = clipped
+
+        if self._ellipse_data:
+            # map the segment to the space in which the ellipse is a circle
+            # centered at the origin, then check its distance to that origin
+            radius, aspect_ratio, offset_x, offset_y = self._ellipse_data
+            x1 = offset_x + x1 - radius
+            x2 = offset_x + x2 - radius
+            y1 = (offset_y + y1) * aspect_ratio - radius
+            y2 = (offset_y + y2) * aspect_ratio - radius
+            d_x = x2 - x1
+            d_y = y2 - y1
+            length_sq = d_x * d_x + d_y * d_y
+            t = 0. if length_sq == 0. else max(0., min(1., -(x1 * d_x + y1 * d_y) / length_sq))
+            x = x1 + t * d_x
+            y = y1 + t * d_y
+            return x * x + y * y <= radius * radius
+
+        if self._mask is not None:
+            w_b = self._size[0]
+            mask = self._mask
+            return any(mask[int(y) * w_b + int(x)] for x, y in self.__sample_segment(*clipped))
+
+        return True
+
+    def encloses_segment(self, x1, y1, x2, y2):
+
+        if not (self.contains_point(x1, y1) and self.contains_point(x2, y2)):
+            return False
+
+        if self._mask is None:
+            # both the rectangle and the ellipse are convex
+            return True
+
+        w_b = self._size[0]
+        mask = self._mask
+
+        return all(mask[int(y) * w_b + int(x)] for x, y in self.__sample_segment(x1, y1, x2, y2))
+
+    def overlaps_triangle(self, x1, y1, x2, y2, x3, y3):
+        """
+        Check whether the given triangle has any part inside of this region.
+
+        The vertices and edges of the triangle are expected to have already been
+        tested, so only the case where the region lies inside of the triangle
+        is handled here, by testing the triangle against an anchor point known to
+        be inside of the region.
+
+        """
+
+        if self._anchor is None or x1 != x1 or x2 != x2 or x3 != x3:
+            return False
+
+        x, y = self._anchor
+        d1 = (x - x2) * (y1 - y2) - (x1 - x2) * (y - y2)
+        d2 = (x - x3) * (y2 - y3) - (x2 - x3) * (y - y3)
+        d3 = (x - x1) * (y3 - y1) - (x3 - x1) * (y - y1)
+        has_neg = d1 < 0. or d2 < 0. or d3 < 0.
+        has_pos = d1 > 0. or d2 > 0. or d3 > 0.
+
+        return not (has_neg and has_pos)
+
+    def get_selected_segments(self, coords, segments, enclose=False):
+        """
+        Return the indices of the given segments that intersect (or, if enclose
+        is True, lie completely inside of) this region.
+
+        The segments are given as a sequence of pairs of indices into the given
+        flat sequence of x, y point coordinates.
+
+        """
+
+        if enclose:
+            test = self.encloses_segment
+            inside = self.get_contained_points(coords)
+        else:
+            test = self.intersects_segment
+            inside = None
+
+        selected = []
+
+        for i, (p1, p2) in enumerate(segments):
+
+            if inside is not None and not (inside[p1] and inside[p2]):
+                continue
+
+            if test(coords[p1 * 2], coords[p1 * 2 + 1], coords[p2 * 2], coords[p2 * 2 + 1]):
+                selected.append(i)
+
+        return selected
+
+    def get_selected_polygons(self, coords, polygons, enclose=False):
+        """
+        Return the indices of the given polygons that overlap (or, if enclose is
+        True, lie completely inside of) this region.
+
+        Each polygon is given as a sequence of triangles, each of which is a
+        tuple of three indices into the given flat sequence of x, y point
+        coordinates.
+        Note that back-facing polygons are not excluded.
+
+        """
+
+        inside = self.get_contained_points(coords)
+        selected = []
+
+        for i, tris in enumerate(polygons):
+
+            if enclose:
+
+                point_indices = set(p for tri in tris for p in tri)
+
+                if not all(inside[p] for p in point_indices):
+                    continue
+
+                if self._mask is None:
+                    selected.append(i)
+                    continue
+
+            elif any(inside[p] for tri in tris for p in tri):
+
+                selected.append(i)
+                continue
+
+            is_selected = enclose
+
+            for tri in tris:
+
+                (x1, y1), (x2, y2), (x3, y3) = [(coords[p * 2], coords[p * 2 + 1]) for p in tri]
+
+                if enclose:
+                    if not (self.encloses_segment(x1, y1, x2, y2)
+                            and self.encloses_segment(x2, y2, x3, y3)
+                            and self.encloses_segment(x3, y3, x1, y1)):
+                        is_selected = False
+                        break
+                elif (self.intersects_segment(x1, y1, x2, y2)
+                        or self.intersects_segment(x2, y2, x3, y3)
+                        or self.intersects_segment(x3, y3, x1, y1)
+                        or self.overlaps_triangle(x1, y1, x2, y2, x3, y3)):
+                    is_selected = True
+                    break
+
+            if is_selected:
+                selected.append(i)
+
+        return selected
+
+    def overlaps_geom(self, geom, mat, enclose=False):
+        """
+        Check whether the given Geom has any part inside of (or, if enclose is
+        True, lies completely inside of) this region, when its vertices are
+        projected through the given matrix.
+
+        """
+
+        coords = project_points(read_geom_points(geom), mat, self._size)
+        point_count = len(coords) // 2
+
+        if not point_count:
+            return False
+
+        inside = self.get_contained_points(coords)
+
+        if not enclose and any(inside):
+            return True
+
+        if enclose and self._mask is None:
+            return all(inside)
+
+        for prim in geom.get_primitives():
+
+            prim = prim.decompose()
+            rows = prim.get_vertex_list()
+            vert_count = prim.get_num_vertices_per_primitive()
+
+            if vert_count == 3:
+                tris = [tuple(rows[i:i + 3]) for i in range(0, len(rows), 3)]
+                polygons = [(tri,) for tri in tris]
+                count = len(self.get_selected_polygons(coords, polygons, enclose))
+                prim_count = len(polygons)
+            elif vert_count == 2:
+                segments = [tuple(rows[i:i + 2]) for i in range(0, len(rows), 2)]
+                count = len(self.get_selected_segments(coords, segments, enclose))
+                prim_count = len(segments)
+            else:
+                count = sum(inside[row] for row in rows)
+                prim_count = len(rows)
+
+            if enclose and count < prim_count:
+                return False
+
+            if not enclose and count:
+                return True
+
+        return enclose
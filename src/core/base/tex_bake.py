@@ -0,0 +1,198 @@
+from .base import *
+import array
+
+
+def _wrap_texels(indices, size, wrap_mode):
+    """
+    Return the given texel indices along one texture axis wrapped into the range
+    [0, size) according to the given wrap mode, with -1 denoting the border color.
+
+    """
+
+    if wrap_mode == SamplerState.WM_repeat:
+        return [i % size for i in indices]
+
+    last = size - 1
+
+    if wrap_mode == SamplerState.WM_mirror:
+        period = 2 * size
+        return [i if i < size else period - 1 - i for i in (j % period for j in indices)]
+
+    if wrap_mode == SamplerState.WM_mirror_once:
+        return [min(-i - 1 if i < 0 else i, last) for i in indices]
+
+    if wrap_mode == SamplerState.WM_border_color:
+        return [i if 0 <= i < size else -1 for i in indices]
+
+    return [0 if i < 0 else (last if i > last else i) for i in indices]
+
+
+class TextureSampler:
+    """
+    Samples the RAM image of a texture at many UV coordinates in one pass.
+
+    The wrap modes and magnification filter of the texture are honored; any
+    filter other than "nearest" results in bilinear filtering.
+    The texels are kept as packed 32-bit RGBA values, such that bilinear
+    filtering can process two color channels per integer multiplication.
+
+    """
+
+    def __init__(self, texture):
+
+        self._size = (texture.x_size, texture.y_size)
+        self._wrap_modes = (texture.wrap_u, texture.wrap_v)
+        self._bilinear = texture.magfilter != SamplerState.FT_nearest
+        self._texels = None
+        self._peeker = None
+
+        if not texture.has_ram_image():
+            return
+
+        component_type = texture.component_type
+
+        if component_type not in (Texture.T_unsigned_byte, Texture.T_unsigned_short):
+            # sample other component types (e.g. floating-point) the slow way
+            self._peeker = texture.peek()
+            return
+
+        data = bytes(texture.get_ram_image_as("RGBA"))
+
+        if component_type == Texture.T_unsigned_short:
+            # keep only the most significant byte of each (little-endian) component
+            data = data[1::2]
+
+        self._texels = texels = array.array("I")
+        texels.frombytes(data)
+        # the border color is appended to the texels, such that texel index -1
+        # refers to it
+        border_color = bytes(int(min(max(c, 0.), 1.) * 255. + .5)
+                             for c in texture.border_color)
+        texels.frombytes(border_color)
+
+    def sample(self, uvs):
+        """
+        Return the colors of the texture at the given UV coordinates, which are
+        expected as a flat sequence of (u, v) pairs, as bytes with 4 RGBA values
+        per color.
+
+        """
+
+        count = len(uvs) // 2
+
+        if self._peeker:
+            return self.__sample_with_peeker(uvs)
+
+        if self._texels is None:
+            return b"\xff" * (count * 4)
+
+        w, h = self._size
+        wrap_u, wrap_v = self._wrap_modes
+        us = uvs[0::2]
+        vs = uvs[1::2]
+        texels = self._texels
+
+        if not self._bilinear:
+            xs = _wrap_texels([math.floor(u * w) for u in us], w, wrap_u)
+            ys = _wrap_texels([math.floor(v * h) for v in vs], h, wrap_v)
+            colors = array.array("I", [texels[-1 if x < 0 or y < 0 else y * w + x]
+                                       for x, y in zip(xs, ys)])
+            return colors.tobytes()
+
+        # compute the weights of the texels in 8-bit fixed point, such that they
+        # always add up to 256
+        xs = [u * w - .5 for u in us]
+        ys = [v * h - .5 for v in vs]
+        xs0 = [math.floor(x) for x in xs]
+        ys0 = [math.floor(y) for y in ys]
+        weights_x = [int((x - x0) * 256. + .5) for x, x0 in zip(xs, xs0)]
+        weights_y = [int((y - y0) * 256. + .5) for y, y0 in zip(ys, ys0)]
+        xs1 = _wrap_texels([x + 1 for x in xs0], w, wrap_u)
+        ys1 = _wrap_texels([y + 1 for y in ys0], h, wrap_v)
+        xs0 = _wrap_texels(xs0, w, wrap_u)
+        ys0 = _wrap_texels(ys0, h, wrap_v)
+        colors = array.array("I", bytes(count * 4))
+
+        for i, (x0, x1, y0, y1, a, b) in enumerate(zip(xs0, xs1, ys0, ys1, weights_x, weights_y)):
+
+            c00 = texels[-1 if x0 < 0 or y0 < 0 else y0 * w + x0]
+            c10 = texels[-1 if x1 < 0 or y0 < 0 else y0 * w + x1]
+            c01 = texels[-1 if x0 < 0 or y1 < 0 else y1 * w + x0]
+            c11 = texels[-1 if x1 < 0 or y1 < 0 else y1 * w + x1]
+            w11 = (a * b + 128) >> 8
+            w10 = a - w11
+            w01 = b - w11
+            w00 = 256 - a - b + w11
+            # the even and odd color channels are processed separately, each
+            # channel getting 16 bits to accommodate the weighted sum
+            even = ((c00 & 0xFF00FF) * w00 + (c10 & 0xFF00FF) * w10
+                    + (c01 & 0xFF00FF) * w01 + (c11 & 0xFF00FF) * w11 + 0x800080)
+            odd = (((c00 >> 8) & 0xFF00FF) * w00 + ((c10 >> 8) & 0xFF00FF) * w10
+                   + ((c01 >> 8) & 0xFF00FF) * w01 + ((c11 >> 8) & 0xFF00FF) * w11 + 0x800080)
+            colors[i] = ((even >> 8) & 0xFF00FF) | (odd & 0xFF00FF00)
+
+        return colors.tobytes()
+
+    def __sample_with_peeker(self, uvs):
+
+        peeker = self._peeker
+        color = LColor()
+        colors = bytearray(len(uvs) // 2 * 4)
+
+        for i, (u, v) in enumerate(zip(uvs[0::2], uvs[1::2])):
+            peeker.lookup(color, u, v)
+            colors[i*4:i*4+4] = bytes(int(min(max(c, 0.), 1.) * 255. + .5) for c in color)
+
+        return colors
+
+
+def bake_texture(vertex_data, texture, sampler=None, uv_set_id=0):
+    """
+    Replace the vertex colors of the given GeomVertexData, which should have the
+    "full" vertex format, with the colors of the given texture at the UVs of the
+    given set.
+    A TextureSampler can be passed in, to reuse it when baking the same texture
+    into the vertex data of multiple models.
+    Return the modified color GeomVertexArrayData.
+
+    """
+
+    if sampler is None:
+        sampler = TextureSampler(texture)
+
+    uvs = memoryview(vertex_data.get_array(4 + uv_set_id)).cast("B").cast("f")
+    colors = sampler.sample(uvs)
+    color_array = vertex_data.modify_array(1)
+
+    if colors:
+        memoryview(color_array).cast("B")[:] = colors
+
+    return color_array
+
+
+def benchmark(vert_count=1000000, tex_size=1024):
+    """
+    Time the sampling of a random texture at the given number of random UVs,
+    with and without bilinear filtering.
+    Return the time taken per vertex (in seconds) for both, as a
+    (nearest, bilinear) tuple.
+
+    """
+
+    texture = Texture("bake_benchmark")
+    texture.setup_2d_texture(tex_size, tex_size, Texture.T_unsigned_byte, Texture.F_rgba)
+    texture.set_ram_image(bytes(random.getrandbits(8) for _ in range(tex_size * tex_size * 4)))
+    uvs = array.array("f", [random.uniform(-2., 2.) for _ in range(vert_count * 2)])
+    times = []
+
+    for filter_type in (SamplerState.FT_nearest, SamplerState.FT_linear):
+        texture.magfilter = filter_type
+        sampler = TextureSampler(texture)
+        start_time = time.perf_counter()
+        sampler.sample(memoryview(uvs))
+        times.append((time.perf_counter() - start_time) / vert_count)
+
+    Notifiers.geom.info(f'Sampled {vert_count} vertices; {times[0] * 1e9:.1f} ns (nearest) '
+                        f'and {times[1] * 1e9:.1f} ns (bilinear) per vertex.')
+
+    return tuple(times)
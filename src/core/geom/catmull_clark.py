@@ -24,6 +24,7 @@ CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 '''
 
 from panda3d.core import Point3, Vec3
+import array
 
 
 class Point:
@@ -626,10 +627,13 @@ def _subdivide(positions, uvs, old_faces, old_uv_faces):
             "faces": new_faces, "uv_faces": new_uv_faces}
 
 
-def subdivide(positions, uvs, faces, uv_faces, subdivision_count):
+def _subdivide_reference(positions, uvs, faces, uv_faces, subdivision_count):
+    """
+    Subdivide the given cage using the original object-graph implementation.
+    This is kept as a reference for validating and benchmarking the array-based
+    subdivision engine.
 
-    if subdivision_count < 1:
-        raise RuntimeError("`subdivision_count` must be a positive number!")
+    """
 
     data = {"positions": positions, "uvs": uvs, "faces": faces, "uv_faces": uv_faces}
 
@@ -641,48 +645,491 @@ def subdivide(positions, uvs, faces, uv_faces, subdivision_count):
     return data
 
 
-def convert_data(subdiv_data, vert_normals):
+# The following functions implement the same algorithm as above, but operate on
+# flat coordinate lists and face-vertex index arrays instead of a graph of Point,
+# UV, Edge and Face objects.
+# Coordinates are stored as [x0, y0, z0, x1, y1, z1, ...] (or [u0, v0, u1, ...]
+# for UVs), while faces are described by a flat list of vertex indices together
+# with a list of offsets into that list (face `f` uses the indices in
+# `face_verts[face_starts[f]:face_starts[f + 1]]`).
 
-    positions = subdiv_data["positions"]
-    uvs = subdiv_data["uvs"]
-    subdiv_uv_faces = subdiv_data["uv_faces"]
-    geom_data = []
-    processed_data = {}
-    processed_mvs = []
-    processed_uv_mvs = []
 
-    for face in subdiv_uv_faces:
+def _build_edge_table(face_verts, face_starts, vert_count):
+    """
+    Return, for every face corner, the index of the edge running from that corner
+    to the next one, as well as the sorted vertex indices of every edge and the
+    number of faces connected to each edge.
+    Edges are identified by a single integer key derived from their sorted vertex
+    indices, such that (1, 2) and (2, 1) are considered to be the same edge.
 
-        for i in face:
+    """
+
+    corner_edges = [0] * len(face_verts)
+    edge_indices = {}
+    edge_verts1 = []
+    edge_verts2 = []
+    edge_face_counts = []
+
+    for f in range(len(face_starts) - 1):
+
+        start = face_starts[f]
+        end = face_starts[f + 1]
 
-            vert_data = {}
-            (u, v), j = uvs[i]
-            vert_data["pos"] = Point3(*positions[j])
-            vert_data["normal"] = Vec3(vert_normals[j])
-            vert_data["uvs"] = {0: (u, v)}
+        for k in range(start, end):
 
-            if j in processed_mvs:
-                vert_data["pos_ind"] = processed_mvs.index(j)
+            i1 = face_verts[k]
+            i2 = face_verts[k + 1 if k + 1 < end else start]
+
+            if i1 > i2:
+                i1, i2 = i2, i1
+
+            key = i1 * vert_count + i2
+            e = edge_indices.get(key)
+
+            if e is None:
+                e = edge_indices[key] = len(edge_verts1)
+                edge_verts1.append(i1)
+                edge_verts2.append(i2)
+                edge_face_counts.append(1)
             else:
-                vert_data["pos_ind"] = len(processed_mvs)
-                processed_mvs.append(j)
+                edge_face_counts[e] += 1
+
+            corner_edges[k] = e
+
+    return corner_edges, edge_verts1, edge_verts2, edge_face_counts
+
+
+def _compute_face_points(coords, dim, face_verts, face_starts):
+
+    face_points = []
+
+    for f in range(len(face_starts) - 1):
+
+        start = face_starts[f]
+        end = face_starts[f + 1]
+        size = end - start
+
+        for d in range(dim):
+
+            s = 0.
+
+            for k in range(start, end):
+                s += coords[face_verts[k] * dim + d]
+
+            face_points.append(s / size)
+
+    return face_points
+
+
+def _compute_edge_points(coords, dim, face_points, face_starts, corner_edges,
+                         edge_verts1, edge_verts2, edge_face_counts):
+
+    edge_count = len(edge_verts1)
+    mid_points = [0.] * (edge_count * dim)
+    edge_points = [0.] * (edge_count * dim)
+
+    # scatter-add the face points onto their edges
+    for f in range(len(face_starts) - 1):
+
+        offset = f * dim
+
+        for k in range(face_starts[f], face_starts[f + 1]):
+
+            e_offset = corner_edges[k] * dim
+
+            for d in range(dim):
+                edge_points[e_offset + d] += face_points[offset + d]
+
+    for e in range(edge_count):
+
+        e_offset = e * dim
+        offset1 = edge_verts1[e] * dim
+        offset2 = edge_verts2[e] * dim
+        face_count = edge_face_counts[e]
+
+        for d in range(dim):
+
+            c1 = coords[offset1 + d]
+            c2 = coords[offset2 + d]
+            mid_points[e_offset + d] = (c1 + c2) * .5
 
-            if i in processed_uv_mvs:
-                vert_data["uv_ind"] = processed_uv_mvs.index(i)
+            if face_count == 1:
+                # the edge belongs to a hole border;
+                # the edge point is just the midpoint in this case
+                edge_points[e_offset + d] = mid_points[e_offset + d]
             else:
-                vert_data["uv_ind"] = len(processed_uv_mvs)
-                processed_uv_mvs.append(i)
+                edge_points[e_offset + d] = (edge_points[e_offset + d] + c1 + c2) / (face_count + 2)
+
+    return edge_points, mid_points
+
+
+def _compute_vertex_points(coords, face_points, mid_points, face_verts, face_starts,
+                           edge_verts1, edge_verts2, edge_face_counts):
+
+    vert_count = len(coords) // 3
+    vert_face_counts = [0] * vert_count
+    vert_edge_counts = [0] * vert_count
+    face_point_sums = [0.] * (vert_count * 3)
+    mid_point_sums = [0.] * (vert_count * 3)
+    border_mid_point_sums = [0.] * (vert_count * 3)
+
+    for f in range(len(face_starts) - 1):
+
+        offset = f * 3
+        x, y, z = face_points[offset:offset+3]
+
+        for k in range(face_starts[f], face_starts[f + 1]):
+            v = face_verts[k]
+            vert_face_counts[v] += 1
+            v_offset = v * 3
+            face_point_sums[v_offset] += x
+            face_point_sums[v_offset + 1] += y
+            face_point_sums[v_offset + 2] += z
+
+    for e in range(len(edge_verts1)):
+
+        offset = e * 3
+        x, y, z = mid_points[offset:offset+3]
+        v1 = edge_verts1[e]
+        v2 = edge_verts2[e]
+        is_border_edge = edge_face_counts[e] == 1
+
+        for v in ((v1,) if v1 == v2 else (v1, v2)):
+
+            vert_edge_counts[v] += 1
+            v_offset = v * 3
+            mid_point_sums[v_offset] += x
+            mid_point_sums[v_offset + 1] += y
+            mid_point_sums[v_offset + 2] += z
+
+            if is_border_edge:
+                border_mid_point_sums[v_offset] += x
+                border_mid_point_sums[v_offset + 1] += y
+                border_mid_point_sums[v_offset + 2] += z
+
+    vertex_points = coords[:]
+
+    # Each original point is moved to the position (F + 2R + (n-3)P) / n.
+    # See the Wikipedia article for more details.
+
+    for v in range(vert_count):
+
+        n = vert_face_counts[v]
+
+        if not n:
+            continue
+
+        v_offset = v * 3
+
+        if n != vert_edge_counts[v]:
+
+            # the point lies on the border of a hole;
+            # the new point is the weighted average of the midpoints of both
+            # border edges connected at the original point and that point (p):
+            # new_point = 1/4 mp1 + 1/4 mp2 + 1/2 p
+
+            for d in range(3):
+                i = v_offset + d
+                vertex_points[i] = border_mid_point_sums[i] * .25 + coords[i] * .5
+
+            continue
+
+        for d in range(3):
+            i = v_offset + d
+            p = face_point_sums[i] / n
+            p += mid_point_sums[i] / n * 2.
+            p += coords[i] * (n - 3)
+            vertex_points[i] = p / n
+
+    return vertex_points
+
+
+def _create_subdivided_faces(points, dim, vert_count, edge_count, face_verts, face_starts,
+                             corner_edges):
+    """
+    Subdivide every n-sided face into n new quads.
+    The given points are the concatenated vertex, edge and face points; the new
+    vertices are indexed in the order in which they are first encountered while
+    going through the faces.
+    Also return, for every new vertex, the offset into the new face-vertex list
+    at which it was first referenced.
+
+    """
+
+    new_indices = [-1] * (len(points) // dim)
+    new_coords = []
+    new_face_verts = []
+    first_refs = []
+    face_point_offset = vert_count + edge_count
+
+    for f in range(len(face_starts) - 1):
+
+        start = face_starts[f]
+        end = face_starts[f + 1]
+        c = face_point_offset + f
+
+        for k in range(start, end):
+
+            a = face_verts[k]
+            b = vert_count + corner_edges[k]
+            d = vert_count + corner_edges[k - 1 if k > start else end - 1]
+            quad_offset = len(new_face_verts)
+            new_face_verts.extend((0, 0, 0, 0))
+
+            # the new quad is defined as [d, a, b, c]
+            for point_index, slot in ((a, 1), (b, 2), (c, 3), (d, 0)):
+
+                index = new_indices[point_index]
+
+                if index < 0:
+                    index = new_indices[point_index] = len(first_refs)
+                    offset = point_index * dim
+                    new_coords.extend(points[offset:offset+dim])
+                    first_refs.append(quad_offset + slot)
+
+                new_face_verts[quad_offset + slot] = index
+
+    return new_coords, new_face_verts, first_refs
+
+
+def _subdivide_arrays(coords, uv_coords, face_verts, uv_face_verts, face_starts):
+
+    vert_count = len(coords) // 3
+    corner_edges, edge_verts1, edge_verts2, edge_face_counts = _build_edge_table(
+        face_verts, face_starts, vert_count)
+    face_points = _compute_face_points(coords, 3, face_verts, face_starts)
+    edge_points, mid_points = _compute_edge_points(coords, 3, face_points, face_starts,
+        corner_edges, edge_verts1, edge_verts2, edge_face_counts)
+    vertex_points = _compute_vertex_points(coords, face_points, mid_points, face_verts,
+        face_starts, edge_verts1, edge_verts2, edge_face_counts)
+    points = vertex_points + edge_points + face_points
+    new_coords, new_face_verts, _ = _create_subdivided_faces(points, 3, vert_count,
+        len(edge_verts1), face_verts, face_starts, corner_edges)
+
+    # Implement the Catmull-Clark subdivision for UVs;
+    # UV seams are preserved, since UV edges are defined by UV indices instead of
+    # position indices; note that the original UVs themselves are not moved
+
+    uv_count = len(uv_coords) // 2
+    corner_edges, edge_verts1, edge_verts2, edge_face_counts = _build_edge_table(
+        uv_face_verts, face_starts, uv_count)
+    face_points = _compute_face_points(uv_coords, 2, uv_face_verts, face_starts)
+    edge_points, _ = _compute_edge_points(uv_coords, 2, face_points, face_starts,
+        corner_edges, edge_verts1, edge_verts2, edge_face_counts)
+    points = uv_coords + edge_points + face_points
+    new_uv_coords, new_uv_face_verts, first_refs = _create_subdivided_faces(points, 2,
+        uv_count, len(edge_verts1), uv_face_verts, face_starts, corner_edges)
+    # the new quads in UV space correspond exactly to the new quads in world space,
+    # so the index of the point associated with a new UV can be retrieved from the
+    # corner of the new world-space quad at which that UV was first referenced
+    new_uv_point_indices = [new_face_verts[k] for k in first_refs]
+
+    return new_coords, new_uv_coords, new_uv_point_indices, new_face_verts, new_uv_face_verts
+
+
+def subdivide(positions, uvs, faces, uv_faces, subdivision_count):
+
+    if subdivision_count < 1:
+        raise RuntimeError("`subdivision_count` must be a positive number!")
+
+    coords = [c for pos in positions for c in pos]
+    uv_coords = [c for uv, point_index in uvs for c in uv]
+    face_verts = [i for face in faces for i in face]
+    uv_face_verts = [i for uv_face in uv_faces for i in uv_face]
+    face_starts = [0]
+
+    for face in faces:
+        face_starts.append(face_starts[-1] + len(face))
+
+    for i in range(subdivision_count):
+        coords, uv_coords, uv_point_indices, face_verts, uv_face_verts = _subdivide_arrays(
+            coords, uv_coords, face_verts, uv_face_verts, face_starts)
+        # all of the faces are quads after subdivision
+        face_starts = range(0, len(face_verts) + 1, 4)
+
+    positions = [coords[i:i+3] for i in range(0, len(coords), 3)]
+    uvs = [(uv_coords[i*2:i*2+2], j) for i, j in enumerate(uv_point_indices)]
+    faces = [face_verts[i:i+4] for i in range(0, len(face_verts), 4)]
+    uv_faces = [uv_face_verts[i:i+4] for i in range(0, len(uv_face_verts), 4)]
+    faces = _quads_to_tris(faces)
+
+    return {"positions": positions, "uvs": uvs, "faces": faces, "uv_faces": uv_faces}
+
+
+def benchmark(subdivision_count=2, tolerance=1.e-5):
+    """
+    Compare the array-based subdivision engine with the reference implementation,
+    using the geometry generated for each of the primitive types.
+    Return a dict with the time (in seconds) taken by each implementation for
+    every primitive type, as well as whether their results match within the
+    given tolerance.
+
+    """
+
+    import time
+    from .prim import box, plane, sphere, cylinder, cone, torus
+
+    generators = {
+        "box": lambda: box._define_geom_data({"x": 4, "y": 4, "z": 4}),
+        "plane": lambda: plane._define_geom_data({"x": 8, "y": 8}),
+        "sphere": lambda: sphere._define_geom_data(16, True),
+        "cylinder": lambda: cylinder._define_geom_data(
+            {"circular": 12, "height": 4, "caps": 1}, True),
+        "cone": lambda: cone._define_geom_data(
+            {"circular": 24, "height": 6, "caps": 1}, True),
+        "torus": lambda: torus._define_geom_data({"ring": 24, "section": 12}, True)
+    }
+
+    def get_cage(geom_data):
+
+        positions = []
+        uvs = []
+        uv_indices = {}
+        faces = []
+        uv_faces = []
+        pos_indices = {}
+
+        for poly_data in geom_data:
+
+            face = []
+            uv_face = []
+
+            for vert_data in poly_data["verts"]:
+
+                pos_ind = vert_data["pos_ind"]
+                index = pos_indices.setdefault(pos_ind, len(positions))
+
+                if index == len(positions):
+                    positions.append(list(vert_data["pos"]))
+
+                uv = tuple(vert_data["uvs"].get(0, (0., 0.)))
+                uv_index = uv_indices.setdefault((index, uv), len(uvs))
+
+                if uv_index == len(uvs):
+                    uvs.append((list(uv), index))
+
+                face.append(index)
+                uv_face.append(uv_index)
+
+            faces.append(face)
+            uv_faces.append(uv_face)
+
+        return positions, uvs, faces, uv_faces
+
+    def is_close(values1, values2):
+
+        return all(abs(a - b) <= tolerance for a, b in zip(values1, values2))
+
+    results = {}
+
+    for prim_type, generator in generators.items():
+
+        geom_data = generator()
+        geom_data = geom_data[0] if type(geom_data) is tuple else geom_data
+        cage = get_cage(geom_data)
+        start = time.perf_counter()
+        data = subdivide(*cage, subdivision_count)
+        arrays_time = time.perf_counter() - start
+        start = time.perf_counter()
+        ref_data = _subdivide_reference(*cage, subdivision_count)
+        reference_time = time.perf_counter() - start
+        match = (data["faces"] == ref_data["faces"]
+                 and data["uv_faces"] == ref_data["uv_faces"]
+                 and len(data["positions"]) == len(ref_data["positions"])
+                 and len(data["uvs"]) == len(ref_data["uvs"])
+                 and all(is_close(p1, p2) for p1, p2
+                         in zip(data["positions"], ref_data["positions"]))
+                 and all(i1 == i2 and is_close(uv1, uv2) for (uv1, i1), (uv2, i2)
+                         in zip(data["uvs"], ref_data["uvs"])))
+        results[prim_type] = {"arrays": arrays_time, "reference": reference_time,
+                              "match": match}
+
+    return results
+
+
+class PackedQuadData:
+    """
+    Compact, columnar representation of a quad mesh, as produced by subdivision.
+    Positions and normals are stored per merged vertex and UVs per merged UV, while
+    every quad refers to those through 4 consecutive entries of the position and
+    UV index arrays.
+    Its polygons can be processed without creating a dict for every vertex.
+
+    """
+
+    def __init__(self, positions, normals, uvs, pos_indices, uv_indices):
+
+        self.positions = positions
+        self.normals = normals
+        self.uvs = uvs
+        self.pos_indices = pos_indices
+        self.uv_indices = uv_indices
+
+    def __len__(self):
+
+        return len(self.pos_indices) // 4
+
+    def get_subdivision_data(self, inverted=False):
+
+        coords = self.positions
+        uv_coords = self.uvs
+        pos_indices = self.pos_indices
+        uv_indices = self.uv_indices
+        sign = -1 if inverted else 1
+        positions = [list(coords[i:i+3]) for i in range(0, len(coords), 3)]
+        uv_point_indices = [0] * (len(uv_coords) // 2)
+
+        for pos_ind, uv_ind in zip(pos_indices, uv_indices):
+            uv_point_indices[uv_ind] = pos_ind
+
+        uvs = [(list(uv_coords[i*2:i*2+2]), j) for i, j in enumerate(uv_point_indices)]
+        faces = [list(pos_indices[i:i+4])[::sign] for i in range(0, len(pos_indices), 4)]
+        uv_faces = [list(uv_indices[i:i+4])[::sign] for i in range(0, len(uv_indices), 4)]
+
+        return positions, uvs, faces, uv_faces
+
+
+def convert_data(subdiv_data, vert_normals):
+    """
+    Convert the given subdivision data into a PackedQuadData object.
+    Positions and UVs are renumbered in the order in which they are first used
+    by the quads.
+
+    """
+
+    positions = subdiv_data["positions"]
+    uvs = subdiv_data["uvs"]
+    pos_map = [-1] * len(positions)
+    uv_map = [-1] * len(uvs)
+    pos_values = array.array("f", [])
+    normal_values = array.array("f", [])
+    uv_values = array.array("f", [])
+    pos_indices = array.array("I", [])
+    uv_indices = array.array("I", [])
+    pos_count = 0
+    uv_count = 0
+
+    for face in subdiv_data["uv_faces"]:
+
+        for i in face:
+
+            uv_ind = uv_map[i]
+            uv, j = uvs[i]
 
-            processed_data[i] = vert_data
+            if uv_ind < 0:
+                uv_ind = uv_map[i] = uv_count
+                uv_values.extend(uv)
+                uv_count += 1
 
-        tris = []
+            pos_ind = pos_map[j]
 
-        for indices in ((face[0], face[1], face[2]), (face[0], face[2], face[3])):
-            tri_data = [processed_data[i] for i in indices]
-            tris.append(tri_data)
+            if pos_ind < 0:
+                pos_ind = pos_map[j] = pos_count
+                pos_values.extend(positions[j])
+                normal_values.extend(vert_normals[j])
+                pos_count += 1
 
-        poly_verts = [processed_data[i] for i in face]
-        poly_data = {"verts": poly_verts, "tris": tris}
-        geom_data.append(poly_data)
+            pos_indices.append(pos_ind)
+            uv_indices.append(uv_ind)
 
-    return geom_data
+    return PackedQuadData(pos_values, normal_values, uv_values, pos_indices, uv_indices)
@@ -1,4 +1,145 @@
 from ...base import *
+import array
+
+
+class SubobjectSnapshot:
+    """
+    Columnar store of the state of newly created subobjects of a single type.
+
+    Instead of pickling every subobject separately, the state of all of them is
+    laid out column by column: vector-valued attributes go into flat float arrays,
+    everything else into plain lists. The whole snapshot is then pickled as a
+    single object.
+    Subobjects are only rebuilt when looked up by ID, so restoring just a few
+    of them does not require decoding the entire snapshot.
+
+    """
+
+    def __getstate__(self):
+
+        state = {
+            "cls": self._cls,
+            "ids": self._ids,
+            "columns": self._columns
+        }
+
+        return state
+
+    def __setstate__(self, state):
+
+        self._cls = state["cls"]
+        self._ids = state["ids"]
+        self._columns = state["columns"]
+        self._indices = None
+
+    def __init__(self, subobjs):
+
+        self._cls = None
+        self._ids = array.array("q")
+        self._columns = {}
+        self._indices = None
+
+        if not subobjs:
+            return
+
+        states = [s.__getstate__() for s in subobjs]
+        self._cls = type(subobjs[0])
+        self._ids.extend(s.id for s in subobjs)
+        columns = self._columns
+
+        for key, value in states[0].items():
+            if type(value) is dict:
+                # the "_data" of a Vertex; its keys become separate columns
+                sub_states = [state[key] for state in states]
+                sub_keys = set().union(*(s.keys() for s in sub_states))
+                columns[key] = {k: self.__create_column(sub_states, k) for k in sub_keys}
+            else:
+                columns[key] = self.__create_column(states, key)
+
+    @staticmethod
+    def __create_column(states, key):
+
+        missing = object()
+        values = [state.get(key, missing) for state in states]
+        value_type = type(values[0])
+
+        if value_type in (Point3, Vec3) and all(type(v) is value_type for v in values):
+            coords = array.array("f")
+
+            for value in values:
+                coords.extend(value)
+
+            return ("vec", value_type, coords)
+
+        # the values can be mutable objects (e.g. dicts and lists) that are still
+        # referenced by the subobjects, while the snapshot only gets pickled
+        # later on, so a frozen copy of them needs to be made right away
+        if any(v is missing for v in values):
+            # not every subobject has a value for this key (e.g. vertex color)
+            values = {i: v for i, v in enumerate(values) if v is not missing}
+            return ("sparse", pickle.loads(pickle.dumps(values, -1)))
+
+        return ("list", pickle.loads(pickle.dumps(values, -1)))
+
+    @staticmethod
+    def __get_column_value(column, index, state, key):
+
+        column_type = column[0]
+
+        if column_type == "vec":
+            value_type, coords = column[1:]
+            state[key] = value_type(*coords[index * 3:index * 3 + 3])
+        elif column_type == "sparse":
+            if index in column[1]:
+                state[key] = column[1][index]
+        else:
+            state[key] = column[1][index]
+
+    def __contains__(self, subobj_id):
+
+        if self._indices is None:
+            self._indices = {s_id: i for i, s_id in enumerate(self._ids)}
+
+        return subobj_id in self._indices
+
+    def __iter__(self):
+
+        return iter(self._ids)
+
+    def __len__(self):
+
+        return len(self._ids)
+
+    def __getitem__(self, subobj_id):
+
+        if self._indices is None:
+            self._indices = {s_id: i for i, s_id in enumerate(self._ids)}
+
+        index = self._indices[subobj_id]
+        get_value = self.__get_column_value
+        state = {}
+
+        for key, column in self._columns.items():
+            if type(column) is dict:
+                state[key] = sub_state = {}
+                for sub_key, sub_column in column.items():
+                    get_value(sub_column, index, sub_state, sub_key)
+            else:
+                get_value(column, index, state, key)
+
+        subobj = self._cls.__new__(self._cls)
+        subobj.__setstate__(state)
+
+        return subobj
+
+    def keys(self):
+
+        return list(self._ids)
+
+    def items(self):
+
+        return [(s_id, self[s_id]) for s_id in self._ids]
+
 
 
 class HistoryMixin:
@@ -35,10 +176,10 @@ class HistoryMixin:
                 for subobj in subobjs.values():
                     subobj.creation_time = cur_time_id
 
-                pickled_objs = {s_id: pickle.dumps(s, -1) for s_id, s in subobjs.items()}
+                snapshot = SubobjectSnapshot(list(subobjs.values()))
 
                 unique_prop_id = unique_prop_ids[f"{subobj_type}__extra__"]
-                extra_data = {unique_prop_id: {"created": pickled_objs}}
+                extra_data = {unique_prop_id: {"created": snapshot}}
 
                 unique_prop_id = unique_prop_ids[f"{subobj_type}s"]
                 data[unique_prop_id] = {"main": prev_time_ids, "extra": extra_data}
@@ -100,13 +241,11 @@ class HistoryMixin:
                 if "created" in subobj_change[subobj_type]:
 
                     created_subobjs = subobj_change[subobj_type]["created"]
-                    pickled_objs = {}
 
                     for subobj in created_subobjs:
                         subobj.creation_time = cur_time_id
-                        pickled_objs[subobj.id] = pickle.dumps(subobj, -1)
 
-                    data_to_store["created"] = pickled_objs
+                    data_to_store["created"] = SubobjectSnapshot(list(created_subobjs))
 
                 extra_data = {unique_prop_ids[f"{subobj_type}__extra__"]: data_to_store}
                 data[unique_prop_ids[f"{subobj_type}s"]] = {"main": prev_time_ids, "extra": extra_data}
@@ -798,7 +937,7 @@ class HistoryMixin:
                 created_subobjs = subobj_data["created"]
 
                 for subobj_id in subobj_ids:
-                    subobjs_to_recreate[subobj_id] = created_subobjs[subobj_id]
+                    subobjs_to_recreate[subobj_id] = created_subobjs
 
         # redo target subobject creation/deletion state
 
@@ -814,12 +953,19 @@ class HistoryMixin:
                 else:
                     subobjs_to_remove[subobj_id] = registered_subobjs[subobj_id]
 
-            subobjs_to_recreate.update(created_subobjs)
+            subobjs_to_recreate.update(dict.fromkeys(created_subobjs, created_subobjs))
 
         subobjs_to_restore = {}
 
-        for subobj_id, pickled_subobj in subobjs_to_recreate.items():
-            subobj = pickle.loads(pickled_subobj)
+        # the subobjects are only decoded now, from the stored data they were created
+        # with; older histories store each of them pickled separately
+        for subobj_id, created_subobjs in subobjs_to_recreate.items():
+
+            subobj = created_subobjs[subobj_id]
+
+            if type(subobj) is bytes:
+                subobj = pickle.loads(subobj)
+
             subobjs_to_restore[subobj_id] = subobj
 
         return subobjs_to_remove, subobjs_to_restore
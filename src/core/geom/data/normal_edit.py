@@ -615,30 +615,47 @@ class NormalEditMixin:
         self._normal_change.update(verts_to_process)
 
         vertex_data_top = self._toplvl_node.modify_geom(0).modify_vertex_data()
-        normal_writer = GeomVertexWriter(vertex_data_top, "normal")
+        normal_view = memoryview(vertex_data_top.modify_array(2)).cast("B").cast("f")
         sign = -1. if self.owner.has_inverted_geometry() else 1.
-        shared_normals_tmp = [s.difference(locked_normals) for s in
-                              set(shared_normals[v_id] for v_id in verts_to_process)]
+        # the normal of each polygon is only retrieved once, as it is usually
+        # needed by several of the vertices being updated
+        poly_normals = {}
+
+        for shared_normal in set(shared_normals[v_id] for v_id in verts_to_process):
 
-        for shared_normal in shared_normals_tmp:
+            verts_to_update = [verts[v_id] for v_id in shared_normal if v_id not in locked_normals]
+            x = y = z = 0.
 
-            vert = verts[shared_normal.pop()]
-            verts_to_update = [vert]
-            poly = polys[vert.polygon_id]
-            normal = Vec3(poly.normal)
+            for vert in verts_to_update:
 
-            for vert_id in shared_normal:
+                poly_id = vert.polygon_id
 
-                vert = verts[vert_id]
-                verts_to_update.append(vert)
-                poly = polys[vert.polygon_id]
-                normal += poly.normal
+                if poly_id in poly_normals:
+                    poly_normal = poly_normals[poly_id]
+                else:
+                    poly_normal = poly_normals[poly_id] = tuple(polys[poly_id].normal)
+
+                x += poly_normal[0]
+                y += poly_normal[1]
+                z += poly_normal[2]
+
+            length = math.sqrt(x * x + y * y + z * z)
+
+            if length:
+                x /= length
+                y /= length
+                z /= length
 
-            normal.normalize()
+            normal = Vec3(x, y, z)
+            x *= sign
+            y *= sign
+            z *= sign
 
             for vert in verts_to_update:
-                normal_writer.set_row(vert.row_index)
-                normal_writer.set_data3(normal * sign)
+                i = vert.row_index * 3
+                normal_view[i] = x
+                normal_view[i + 1] = y
+                normal_view[i + 2] = z
                 vert.normal = normal
 
         normal_array = vertex_data_top.get_array(2)
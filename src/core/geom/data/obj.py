@@ -1,4 +1,6 @@
 from ...base import *
+import array
+from ..catmull_clark import PackedQuadData
 from .select import SelectionMixin
 from .transform import GeomTransformMixin
 from .history import HistoryMixin
@@ -221,38 +223,22 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
         merged_edges = self.merged_edges
         verts_by_pos_ind = {}
 
-        if gradual:
-            poly_count = 0
+        # reserve the picking color IDs of all new subobjects in one go; each
+        # polygon has as many edges as vertices
+        if isinstance(geom_data, PackedQuadData):
+            vert_count = len(geom_data.pos_indices)
+            poly_count = vert_count // 4
+        else:
+            vert_count = sum(len(poly_data["verts"]) for poly_data in geom_data)
+            poly_count = len(geom_data)
 
-        for poly_data in geom_data:
+        vert_col_ids = iter(Mgr.get("next_picking_color_ids", "vert", vert_count))
+        edge_col_ids = iter(Mgr.get("next_picking_color_ids", "edge", vert_count))
+        poly_col_ids = iter(Mgr.get("next_picking_color_ids", "poly", poly_count))
 
-            vert_ids_by_data = {}
+        def create_polygon(poly_verts, poly_tris):
 
-            poly_verts = []
             poly_edges = []
-            poly_tris = []
-
-            for vert_data in poly_data["verts"]:
-
-                pos = vert_data["pos"]
-                vertex = Mgr.do("create_vert", self, pos)
-                vertex.normal = vert_data["normal"]
-                vertex.set_uvs(vert_data["uvs"])
-
-                if "color" in vert_data:
-                    vertex.color = vert_data["color"]
-
-                vert_id = vertex.id
-                verts[vert_id] = vertex
-                vert_ids_by_data[id(vert_data)] = vert_id
-                pos_ind = vert_data["pos_ind"]
-                verts_by_pos_ind.setdefault(pos_ind, []).append(vertex)
-                poly_verts.append(vertex)
-
-            for tri_data in poly_data["tris"]:
-                tri = tuple(vert_ids_by_data[id(v_data)] for v_data in tri_data)
-                poly_tris.append(tri)
-
             poly_edge_verts = poly_verts[:]
             poly_edge_verts.append(poly_edge_verts[0])
 
@@ -260,7 +246,7 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
                 vert1 = poly_edge_verts[i]
                 vert2 = poly_edge_verts[i+1]
                 edge_vert_ids = (vert1.id, vert2.id)
-                edge = Mgr.do("create_edge", self, edge_vert_ids)
+                edge = Mgr.do("create_edge", self, edge_vert_ids, edge_col_ids)
                 edges[edge.id] = edge
                 poly_edges.append(edge)
 
@@ -268,19 +254,88 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
                 vert.add_edge_id(poly_edges[i-1].id)
                 vert.add_edge_id(poly_edges[i].id)
 
-            polygon = Mgr.do("create_poly", self, poly_tris, poly_edges, poly_verts)
+            polygon = Mgr.do("create_poly", self, poly_tris, poly_edges, poly_verts,
+                             poly_col_ids)
             polygon.update_normal()
             ordered_polys.append(polygon)
             poly_id = polygon.id
             polys[poly_id] = polygon
 
-            if gradual:
+        if gradual:
+            poly_count = 0
 
-                poly_count += 1
+        if isinstance(geom_data, PackedQuadData):
 
-                if poly_count == 20:
-                    yield
-                    poly_count = 0
+            # process the compact quad data without creating a dict per vertex
+
+            positions = geom_data.positions
+            normals = geom_data.normals
+            uvs = geom_data.uvs
+            uv_indices = geom_data.uv_indices
+            pos_indices = geom_data.pos_indices
+
+            for i in range(0, len(pos_indices), 4):
+
+                poly_verts = []
+
+                for pos_ind, uv_ind in zip(pos_indices[i:i+4], uv_indices[i:i+4]):
+                    j = pos_ind * 3
+                    vertex = Mgr.do("create_vert", self, positions[j:j+3], vert_col_ids)
+                    vertex.normal = Vec3(*normals[j:j+3])
+                    vertex.set_uvs({0: tuple(uvs[uv_ind*2:uv_ind*2+2])})
+                    verts[vertex.id] = vertex
+                    verts_by_pos_ind.setdefault(pos_ind, []).append(vertex)
+                    poly_verts.append(vertex)
+
+                vi1, vi2, vi3, vi4 = (v.id for v in poly_verts)
+                create_polygon(poly_verts, [(vi1, vi2, vi3), (vi1, vi3, vi4)])
+
+                if gradual:
+
+                    poly_count += 1
+
+                    if poly_count == 20:
+                        yield
+                        poly_count = 0
+
+        else:
+
+            for poly_data in geom_data:
+
+                vert_ids_by_data = {}
+                poly_verts = []
+                poly_tris = []
+
+                for vert_data in poly_data["verts"]:
+
+                    pos = vert_data["pos"]
+                    vertex = Mgr.do("create_vert", self, pos, vert_col_ids)
+                    vertex.normal = vert_data["normal"]
+                    vertex.set_uvs(vert_data["uvs"])
+
+                    if "color" in vert_data:
+                        vertex.color = vert_data["color"]
+
+                    vert_id = vertex.id
+                    verts[vert_id] = vertex
+                    vert_ids_by_data[id(vert_data)] = vert_id
+                    pos_ind = vert_data["pos_ind"]
+                    verts_by_pos_ind.setdefault(pos_ind, []).append(vertex)
+                    poly_verts.append(vertex)
+
+                for tri_data in poly_data["tris"]:
+                    tri = tuple(vert_ids_by_data[id(v_data)] for v_data in tri_data)
+                    poly_tris.append(tri)
+
+                create_polygon(poly_verts, poly_tris)
+
+                if gradual:
+
+                    poly_count += 1
+
+                    if poly_count == 20:
+                        yield
+                        poly_count = 0
 
         if gradual:
             vert_count = 0
@@ -360,10 +415,12 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
         tris_prim.set_index_type(Geom.NT_uint32)
         tris_prim.reserve_num_vertices(tri_vert_count)
 
-        if not restore:
-            pos_writer = GeomVertexWriter(vertex_data_poly, "vertex")
-            normal_writer = GeomVertexWriter(vertex_data_poly, "normal")
-
+        # the vertex and index data is first collected into flat arrays, which are
+        # then copied into the vertex data and primitives in one go
+        pos_values = array.array("f")
+        normal_values = array.array("f")
+        tri_rows = array.array("I")
+        line_rows = array.array("I")
         row_index_offset = 0
 
         if gradual:
@@ -381,17 +438,16 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
                     locked_normals.add(vert.id)
 
                 if not restore:
-                    pos_writer.add_data3(vert.get_pos())
-                    normal_writer.add_data3(vert.normal)
+                    pos_values.extend(vert.get_pos())
+                    normal_values.extend(vert.normal)
                     vert.row_index = row_index
                     row_index += 1
 
-            for vert_ids in poly:
-                tris_prim.add_vertices(*[verts[v_id].row_index for v_id in vert_ids])
+            tri_rows.extend(verts[v_id].row_index for vert_ids in poly for v_id in vert_ids)
 
             for edge in poly.edges:
                 row1, row2 = (verts[v_id].row_index for v_id in edge)
-                lines_prim.add_vertices(row1, row2 + count)
+                line_rows.extend((row1, row2 + count))
 
             row_index_offset += poly.vertex_count
 
@@ -405,6 +461,18 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
                     yield
                     poly_count = 0
 
+        if not restore and count:
+            pos_view = memoryview(vertex_data_poly.modify_array(0)).cast("B").cast("f")
+            pos_view[:] = pos_values
+            normal_view = memoryview(vertex_data_poly.modify_array(2)).cast("B").cast("f")
+            normal_view[:] = normal_values
+
+        for prim, rows in ((tris_prim, tri_rows), (lines_prim, line_rows)):
+            prim_array = prim.modify_vertices()
+            prim_array.unclean_set_num_rows(len(rows))
+            if rows:
+                memoryview(prim_array).cast("B").cast("I")[:] = rows
+
         pos_array_poly = vertex_data_poly.get_array(0)
         vertex_data_vert.set_array(0, pos_array_poly)
         vertex_data_poly_picking.set_array(0, pos_array_poly)
@@ -629,22 +697,11 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
             pos_writer.set_row(row)
             pos_writer.set_data3(pos)
 
-    def bake_texture(self, texture):
-
-        geom_copy = self.toplevel_geom.copy_to(GD.world)
-        geom_copy.detach_node()
-        vertex_data_copy = geom_copy.node().get_geom(0).get_vertex_data()
-        vertex_data_copy = vertex_data_copy.set_color((1., 1., 1., 1.))
-        geom_copy.node().modify_geom(0).set_vertex_data(vertex_data_copy)
-        geom_copy.set_texture(TextureStage.default, texture)
-        geom_copy.flatten_light()
-        geom_copy.apply_texture_colors()
-        vertex_data_copy = geom_copy.node().modify_geom(0).modify_vertex_data()
-        index = vertex_data_copy.format.get_array_with("color")
-        array = vertex_data_copy.modify_array(index)
-        self._vertex_data["poly"].set_array(1, array)
+    def bake_texture(self, texture, sampler=None):
+
         vertex_data = self._toplvl_node.modify_geom(0).modify_vertex_data()
-        vertex_data.set_array(1, GeomVertexArrayData(array))
+        array = tex_bake.bake_texture(vertex_data, texture, sampler)
+        self._vertex_data["poly"].set_array(1, GeomVertexArrayData(array))
 
     def update_vertex_colors(self):
 
@@ -656,7 +713,7 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
             texture = vert_color_map.get_texture()
 
             if vert_color_map.active and texture:
-                self.bake_texture(texture)
+                self.bake_texture(texture, vert_color_map.get_sampler())
 
     def clear_vertex_colors(self):
 
@@ -687,72 +744,69 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
         indexed_verts = indexed_subobjs["vert"]
         indexed_edges = indexed_subobjs["edge"]
         indexed_polys = indexed_subobjs["poly"]
-        pickable_id_vert = PickableTypes.get_id("vert")
-        pickable_id_edge = PickableTypes.get_id("edge")
-        pickable_id_poly = PickableTypes.get_id("poly")
-        vertex_data = self._geoms["vert"]["pickable"].node().modify_geom(0).modify_vertex_data()
-        col_writer_vert = GeomVertexWriter(vertex_data, "color")
-        ind_writer_vert = GeomVertexWriter(vertex_data, "index")
-        vertex_data = self._geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
-        col_writer_edge = GeomVertexWriter(vertex_data, "color")
-        ind_writer_edge = GeomVertexWriter(vertex_data, "index")
-        vertex_data = self._vertex_data["poly_picking"]
-        col_writer_poly = GeomVertexWriter(vertex_data, "color")
-        ind_writer_poly = GeomVertexWriter(vertex_data, "index")
+        # the pickable type ID ends up in the alpha component of the picking color
+        alpha_vert = PickableTypes.get_id("vert") << 24
+        alpha_edge = PickableTypes.get_id("edge") << 24
+        alpha_poly = PickableTypes.get_id("poly") << 24
+        vertex_data_vert = self._geoms["vert"]["pickable"].node().modify_geom(0).modify_vertex_data()
+        vertex_data_edge = self._geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
+        vertex_data_poly = self._vertex_data["poly_picking"]
+        count = self._data_row_count
 
+        # Each row of the color-and-index array of the picking vertex data consists of
+        # 4 uint8 color components followed by an int32 index, so it can be filled as
+        # two 32-bit values: the RGBA color packed in little-endian byte order (i.e.
+        # with the red component in the lowest byte), followed by the index.
+        vert_values = array.array("I", bytes(8 * count))
+        poly_values = array.array("I", bytes(8 * count))
+        edge_values = array.array("I", bytes(16 * count))
+        poly_row = 0
         vert_index = 0
-        edge_index = 0
-        poly_index = 0
-
-        for poly in self.ordered_polys:
 
-            picking_color = get_color_vec(poly.picking_color_id, pickable_id_poly)
-            verts = poly.vertices
-
-            for i in range(len(verts)):
-                col_writer_poly.add_data4(picking_color)
-                ind_writer_poly.add_data1i(poly_index)
-
-            for vert in verts:
-                row = vert.row_index
-                picking_color = get_color_vec(vert.picking_color_id, pickable_id_vert)
-                col_writer_vert.set_row(row)
-                col_writer_vert.set_data4(picking_color)
-                ind_writer_vert.set_row(row)
-                ind_writer_vert.set_data1i(vert_index)
+        for poly_index, poly in enumerate(self.ordered_polys):
+
+            color_id = poly.picking_color_id
+            color = (color_id >> 16) | (color_id & 0xFF00) | ((color_id & 0xFF) << 16) | alpha_poly
+            poly_verts = poly.vertices
+            poly_vert_count = len(poly_verts)
+            poly_values[poly_row * 2:(poly_row + poly_vert_count) * 2] = \
+                array.array("I", (color, poly_index) * poly_vert_count)
+            poly_row += poly_vert_count
+
+            for vert in poly_verts:
+                color_id = vert.picking_color_id
+                color = (color_id >> 16) | (color_id & 0xFF00) | ((color_id & 0xFF) << 16) | alpha_vert
+                row = vert.row_index * 2
+                vert_values[row] = color
+                vert_values[row + 1] = vert_index
                 indexed_verts[vert_index] = vert
                 vert_index += 1
 
             indexed_polys[poly_index] = poly
-            poly_index += 1
-
-        vertex_data = self._geoms["vert"]["pickable"].node().get_geom(0).get_vertex_data()
-        col_array = vertex_data.get_array(1)
-        vertex_data = self._geoms["normal"]["pickable"].node().modify_geom(0).modify_vertex_data()
-        vertex_data.set_array(1, col_array)
 
         vert_subobjs = self._subobjs["vert"]
-        edge_subobjs = self._subobjs["edge"]
-        picking_colors = {}
-        indices = {}
-        count = self._data_row_count
 
-        for edge in edge_subobjs.values():
-            picking_color = get_color_vec(edge.picking_color_id, pickable_id_edge)
-            row_index = vert_subobjs[edge[0]].row_index
-            picking_colors[row_index] = picking_color
-            indices[row_index] = edge_index
-            row_index = vert_subobjs[edge[1]].row_index + count
-            picking_colors[row_index] = picking_color
-            indices[row_index] = edge_index
+        for edge_index, edge in enumerate(self._subobjs["edge"].values()):
+            color_id = edge.picking_color_id
+            color = (color_id >> 16) | (color_id & 0xFF00) | ((color_id & 0xFF) << 16) | alpha_edge
+            vert_id1, vert_id2 = edge
+            row = vert_subobjs[vert_id1].row_index * 2
+            edge_values[row] = color
+            edge_values[row + 1] = edge_index
+            row = (vert_subobjs[vert_id2].row_index + count) * 2
+            edge_values[row] = color
+            edge_values[row + 1] = edge_index
             indexed_edges[edge_index] = edge
-            edge_index += 1
 
-        for row_index in sorted(picking_colors):
-            picking_color = picking_colors[row_index]
-            col_writer_edge.add_data4(picking_color)
-            index = indices[row_index]
-            ind_writer_edge.add_data1i(index)
+        for vertex_data, values in ((vertex_data_vert, vert_values),
+                (vertex_data_edge, edge_values), (vertex_data_poly, poly_values)):
+            col_array = vertex_data.modify_array(1)
+            col_array.unclean_set_num_rows(len(values) // 2)
+            memoryview(col_array).cast("B").cast("I")[:] = values
+
+        col_array = vertex_data_vert.get_array(1)
+        vertex_data = self._geoms["normal"]["pickable"].node().modify_geom(0).modify_vertex_data()
+        vertex_data.set_array(1, col_array)
 
     def update_subobject_indices(self):
 
@@ -770,72 +824,162 @@ class GeomDataObject(SelectionMixin, GeomTransformMixin, HistoryMixin,
         verts = subobjs["vert"]
         edges = subobjs["edge"]
         polys = subobjs["poly"]
+        count = len(verts)
 
         geoms = self._geoms
         vertex_data_vert = geoms["vert"]["pickable"].node().modify_geom(0).modify_vertex_data()
         vertex_data_edge = geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
         vertex_data_normal = geoms["normal"]["pickable"].node().modify_geom(0).modify_vertex_data()
         vertex_data_poly_picking = self._vertex_data["poly_picking"]
-        ind_writer_vert = GeomVertexWriter(vertex_data_vert, "index")
-        ind_writer_edge = GeomVertexWriter(vertex_data_edge, "index")
-        ind_writer_poly = GeomVertexWriter(vertex_data_poly_picking, "index")
-        vert_index = 0
-        edge_index = 0
-        poly_index = 0
+        # the int32 index column follows the 4-byte color column, so the index of
+        # row i is found at position 2 * i + 1 in 32-bit views of these arrays
+        view_vert = memoryview(vertex_data_vert.modify_array(1)).cast("B").cast("I")
+        view_edge = memoryview(vertex_data_edge.modify_array(1)).cast("B").cast("I")
+        view_poly = memoryview(vertex_data_poly_picking.modify_array(1)).cast("B").cast("I")
+        vert_rows = {vert_id: vert.row_index * 2 + 1 for vert_id, vert in verts.items()}
 
-        for vert in verts.values():
-            row = vert.row_index
-            ind_writer_vert.set_row(row)
-            ind_writer_vert.set_data1i(vert_index)
-            indexed_verts[vert_index] = vert
-            vert_index += 1
+        for vert_index, vert_id in enumerate(verts):
+            view_vert[vert_rows[vert_id]] = vert_index
 
-        for edge in edges.values():
+        for edge_index, (vert_id1, vert_id2) in enumerate(edges.values()):
+            view_edge[vert_rows[vert_id1]] = edge_index
+            view_edge[vert_rows[vert_id2] + count * 2] = edge_index
 
-            for row in edge.row_indices:
-                ind_writer_edge.set_row(row)
-                ind_writer_edge.set_data1i(edge_index)
+        for poly_index, poly in enumerate(polys.values()):
+            for vert_id in poly.vertex_ids:
+                view_poly[vert_rows[vert_id]] = poly_index
 
-            indexed_edges[edge_index] = edge
-            edge_index += 1
-
-        for poly in polys.values():
-
-            for row in poly.row_indices:
-                ind_writer_poly.set_row(row)
-                ind_writer_poly.set_data1i(poly_index)
-
-            indexed_polys[poly_index] = poly
-            poly_index += 1
+        indexed_verts.update(enumerate(verts.values()))
+        indexed_edges.update(enumerate(edges.values()))
+        indexed_polys.update(enumerate(polys.values()))
 
         array = vertex_data_vert.get_array(1)
         vertex_data_normal.set_array(1, GeomVertexArrayData(array))
 
     def update_tangent_space(self, tangent_flip, bitangent_flip, poly_ids=None):
+        """
+        Compute the tangent space of the vertices of the given polygons (all of
+        them by default) in a single pass over their triangles, and write it
+        directly into the tangent and binormal columns of the vertex data.
+
+        The result is the same as that of Polygon.update_tangent_space: each vertex
+        gets its tangent space from the first triangle of its polygon that yields
+        non-degenerate tangent and bitangent vectors.
+
+        """
 
-        vertex_data = GeomVertexData(self._vertex_data["poly"])
-        tan_writer = GeomVertexWriter(vertex_data, "tangent")
-        bitan_writer = GeomVertexWriter(vertex_data, "binormal")
+        verts = self._subobjs["vert"]
         polys = self._subobjs["poly"]
+        vertex_data_poly = self._vertex_data["poly"]
+        normal_view = memoryview(vertex_data_poly.get_array(2)).cast("B").cast("f")
+        epsilon = 1.e-010
+        t_sign = -1. if tangent_flip else 1.
+        b_sign = -1. if bitangent_flip else 1.
+        # positions and first-set UVs of the vertices, retrieved only once per vertex
+        vert_data = {}
+
+        def get_vert_data(vert_id):
+
+            data = vert_data.get(vert_id)
+
+            if data is None:
+                vert = verts[vert_id]
+                data = vert_data[vert_id] = (tuple(vert.get_pos()), vert.get_uvs(0))
+
+            return data
+
+        updated_verts = []
 
         for poly_id in (polys if poly_ids is None else poly_ids):
 
-            poly = polys[poly_id]
-            poly.update_tangent_space(tangent_flip, bitangent_flip)
+            processed_vert_ids = set()
+
+            for tri_vert_ids in polys[poly_id]:
+
+                tri_data = [get_vert_data(vert_id) for vert_id in tri_vert_ids]
+
+                for i, vert_id in enumerate(tri_vert_ids):
+
+                    if vert_id in processed_vert_ids:
+                        continue
+
+                    (x, y, z), (u, v) = tri_data[i]
+                    (x1, y1, z1), (u1, v1) = tri_data[1 if i == 0 else 0]
+                    (x2, y2, z2), (u2, v2) = tri_data[1 if i == 2 else 2]
+                    e1 = (x1 - x, y1 - y, z1 - z)
+                    e2 = (x2 - x, y2 - y, z2 - z)
+                    du1 = u1 - u
+                    dv1 = v1 - v
+                    du2 = u2 - u
+                    dv2 = v2 - v
+
+                    # compute vectors pointing in the +U and +V directions, in
+                    # texture space and in world space
+
+                    if abs(dv1) < epsilon:
+                        u_local = du1
+                        u_world = e1
+                    elif abs(dv2) < epsilon:
+                        u_local = du2
+                        u_world = e2
+                    else:
+                        scale = dv1 / dv2
+                        u_local = du1 - du2 * scale
+                        u_world = tuple(c1 - c2 * scale for c1, c2 in zip(e1, e2))
+
+                    if abs(du1) < epsilon:
+                        v_local = dv1
+                        v_world = e1
+                    elif abs(du2) < epsilon:
+                        v_local = dv2
+                        v_world = e2
+                    else:
+                        scale = du1 / du2
+                        v_local = dv1 - dv2 * scale
+                        v_world = tuple(c1 - c2 * scale for c1, c2 in zip(e1, e2))
+
+                    # the tangent and bitangent vectors are the world-space U- and
+                    # V-vectors projected onto the tangent plane, normalized and
+                    # flipped as needed
+
+                    row = verts[vert_id].row_index
+                    n_x, n_y, n_z = normal_view[row * 3:row * 3 + 3]
+                    vectors = []
+
+                    for (w_x, w_y, w_z), sign in ((u_world, t_sign if u_local >= 0. else -t_sign),
+                                                  (v_world, b_sign if v_local >= 0. else -b_sign)):
+
+                        d = w_x * n_x + w_y * n_y + w_z * n_z
+                        w_x -= n_x * d
+                        w_y -= n_y * d
+                        w_z -= n_z * d
+                        length_sq = w_x * w_x + w_y * w_y + w_z * w_z
+
+                        if length_sq == 0.:
+                            break
+
+                        f = sign / math.sqrt(length_sq)
+                        vectors.append(Vec3(w_x * f, w_y * f, w_z * f))
+
+                    if len(vectors) < 2:
+                        continue
+
+                    vert = verts[vert_id]
+                    vert.tangent_space = tuple(vectors)
+                    processed_vert_ids.add(vert_id)
+
+            updated_verts.extend(verts[vert_id] for vert_id in polys[poly_id].vertex_ids)
+
+        # the tangent (3 floats) and binormal (3 floats) columns make up array 3
+        tan_view = memoryview(vertex_data_poly.modify_array(3)).cast("B").cast("f")
+
+        for vert in updated_verts:
+            row = vert.row_index * 6
+            tangent, bitangent = vert.tangent_space
+            tan_view[row:row + 6] = array.array("f", (*tangent, *bitangent))
 
-            for vert in poly.vertices:
-                row = vert.row_index
-                tan_writer.set_row(row)
-                bitan_writer.set_row(row)
-                tangent, bitangent = vert.tangent_space
-                tan_writer.set_data3(tangent)
-                bitan_writer.set_data3(bitangent)
-
-        array = vertex_data.get_array(3)
-        vertex_data_poly = self._vertex_data["poly"]
-        vertex_data_poly.set_array(3, GeomVertexArrayData(array))
         vertex_data_top = self._toplvl_node.modify_geom(0).modify_vertex_data()
-        vertex_data_top.set_array(3, GeomVertexArrayData(array))
+        vertex_data_top.set_array(3, vertex_data_poly.get_array(3))
 
         self.is_tangent_space_initialized = True
 
@@ -1186,6 +1330,8 @@ class GeomDataManager(ObjectManager):
         }
         copier = dict.copy
         GD.set_default("subobj_edit_options", subobj_edit_options, copier)
+        # update vertex normals while interactively transforming subobjects
+        GD.set_default("subobj_drag_normal_update", True)
 
         # Define GeomVertexArrayFormats for the various vertex attributes.
 
@@ -238,6 +238,51 @@ class SelectionMixin:
             del sel_backup[subobj_lvl]
             del self._sel_subobj_ids_backup[subobj_lvl]
 
+    def get_region_selected_subobjects(self, subobj_lvl, cam, region, enclose=False):
+        """
+        Return the subobjects at the given level that lie in (or, if enclose is
+        True, completely inside of) the given region.SelectionRegion, as seen
+        through the given region-selection camera.
+        For the "normal" level, the vertices whose normals are selected are
+        returned.
+
+        """
+
+        vertex_data = self._vertex_data["poly"]
+        pos_view = memoryview(vertex_data.get_array(0)).cast("B").cast("f")
+        mat = region_sel.get_projection_mat(self.origin, cam)
+        verts = self._subobjs["vert"]
+
+        if subobj_lvl == "vert":
+            coords = region_sel.project_points(pos_view, mat, region.size)
+            inside = region.get_contained_points(coords)
+            return [vert for vert in verts.values() if inside[vert.row_index]]
+
+        if subobj_lvl == "normal":
+            normal_view = memoryview(vertex_data.get_array(2)).cast("B").cast("f")
+            length = self._normal_length
+            points = pos_view.tolist()
+            points.extend(p + n * length for p, n in zip(pos_view, normal_view))
+            coords = region_sel.project_points(points, mat, region.size)
+            row_count = len(pos_view) // 3
+            subobjs = list(verts.values())
+            segments = [(vert.row_index, vert.row_index + row_count) for vert in subobjs]
+            indices = region.get_selected_segments(coords, segments, enclose)
+            return [subobjs[i] for i in indices]
+
+        coords = region_sel.project_points(pos_view, mat, region.size)
+        subobjs = list(self._subobjs[subobj_lvl].values())
+
+        if subobj_lvl == "edge":
+            segments = [tuple(verts[vert_id].row_index for vert_id in edge) for edge in subobjs]
+            indices = region.get_selected_segments(coords, segments, enclose)
+        else:
+            polygons = [[tuple(verts[vert_id].row_index for vert_id in tri) for tri in poly]
+                        for poly in subobjs]
+            indices = region.get_selected_polygons(coords, polygons, enclose)
+
+        return [subobjs[i] for i in indices]
+
     def clear_selection(self, subobj_lvl, update_verts_to_transf=True, force=False):
 
         if not (force or self._selected_subobj_ids[subobj_lvl]):
@@ -1094,7 +1139,54 @@ class SelectionManager:
 
         self._selections[obj_lvl].replace(obj.special_selection)
 
-    def __region_select(self, cam, lens_exp, tex_buffer, ellipse_data, mask_tex, op):
+    def __region_select(self, cam, lens_exp, tex_buffer, ellipse_data, mask_tex, op,
+                        region=None):
+
+        if region is None:
+            new_sel = self.__get_region_selection(cam, lens_exp, tex_buffer, ellipse_data, mask_tex)
+        else:
+            new_sel = self.__get_region_selection_cpu(cam, region)
+
+        obj_lvl = GD["active_obj_level"]
+        selection = self._selections[obj_lvl]
+
+        if op == "replace":
+            selection.replace(new_sel)
+        elif op == "add":
+            selection.add(new_sel)
+        elif op == "remove":
+            selection.remove(new_sel)
+        elif op == "toggle":
+            old_sel = set(selection)
+            selection.replace(old_sel ^ new_sel)
+
+    def __get_region_selection_cpu(self, cam, region):
+
+        obj_lvl = GD["active_obj_level"]
+        enclose = GD["region_select"]["enclose"]
+        sel_edges_by_border = GD["subobj_edit_options"]["sel_edges_by_border"]
+        sel = set()
+
+        for obj in Mgr.get("selection_top"):
+
+            geom_data_obj = obj.geom_obj.geom_data_obj
+            subobjs = geom_data_obj.get_region_selected_subobjects(obj_lvl, cam, region, enclose)
+
+            if obj_lvl == "edge":
+                for subobj in subobjs:
+                    subobj = subobj.merged_subobj
+                    if not sel_edges_by_border or len(subobj) == 1:
+                        sel.update(subobj.special_selection)
+            elif obj_lvl == "normal":
+                for subobj in subobjs:
+                    sel.update(subobj.shared_normal.special_selection)
+            else:
+                for subobj in subobjs:
+                    sel.update(subobj.merged_subobj.special_selection)
+
+        return sel
+
+    def __get_region_selection(self, cam, lens_exp, tex_buffer, ellipse_data, mask_tex):
 
         obj_lvl = GD["active_obj_level"]
 
@@ -1169,37 +1261,27 @@ class SelectionManager:
 
             if ge.extract_texture_data(tex, GD.window.get_gsg()):
 
-                texels = memoryview(tex.get_ram_image()).cast("I")
+                indices = region_sel.get_selected_indices(tex.get_ram_image())
+
+                # several indices can map to the same merged subobject or shared
+                # normal, so these are collected first
+                if obj_lvl == "normal":
+                    combined_subobjs = set(subobjs[index].shared_normal for index in indices)
+                else:
+                    combined_subobjs = set(subobjs[index].merged_subobj for index in indices)
 
                 if obj_lvl == "edge":
 
                     sel_edges_by_border = subobj_edit_options["sel_edges_by_border"]
 
-                    for i, mask in enumerate(texels):
-                        for j in range(32):
-                            if mask & (1 << j):
-                                index = 32 * i + j
-                                subobj = subobjs[index].merged_subobj
-                                if not sel_edges_by_border or len(subobj) == 1:
-                                    sel.update(subobj.special_selection)
-
-                elif obj_lvl == "normal":
-
-                    for i, mask in enumerate(texels):
-                        for j in range(32):
-                            if mask & (1 << j):
-                                index = 32 * i + j
-                                subobj = subobjs[index].shared_normal
-                                sel.update(subobj.special_selection)
+                    for subobj in combined_subobjs:
+                        if not sel_edges_by_border or len(subobj) == 1:
+                            sel.update(subobj.special_selection)
 
                 else:
 
-                    for i, mask in enumerate(texels):
-                        for j in range(32):
-                            if mask & (1 << j):
-                                index = 32 * i + j
-                                subobj = subobjs[index].merged_subobj
-                                sel.update(subobj.special_selection)
+                    for subobj in combined_subobjs:
+                        sel.update(subobj.special_selection)
 
             state_np.clear_attrib(ShaderAttrib)
 
@@ -1220,17 +1302,7 @@ class SelectionManager:
         if pick_via_poly:
             Mgr.update_locally("picking_via_poly", True)
 
-        selection = self._selections[obj_lvl]
-
-        if op == "replace":
-            selection.replace(new_sel)
-        elif op == "add":
-            selection.add(new_sel)
-        elif op == "remove":
-            selection.remove(new_sel)
-        elif op == "toggle":
-            old_sel = set(selection)
-            selection.replace(old_sel ^ new_sel)
+        return new_sel
 
     def __set_subobj_picking_via_poly(self, via_poly=False):
 
@@ -1,4 +1,5 @@
 from ...base import *
+import array
 
 
 class GeomTransformMixin:
@@ -12,6 +13,9 @@ class GeomTransformMixin:
         self._pos_arrays = {"main": None, "edge": None}
         self._transformed_verts = set()
         self._picking_geom_xform_locked = False
+        # data used to keep vertex normals up to date while dragging subobjects
+        self._drag_update_data = None
+        self._drag_update_stats = {"frames": 0, "total_time": 0., "max_time": 0., "pos_time": 0.}
 
     def _update_verts_to_transform(self, subobj_lvl):
 
@@ -87,27 +91,16 @@ class GeomTransformMixin:
         else:
             return Mgr.get("transf_center_pos")
 
-    def update_vertex_positions(self, vertex_ids, update_bounds=True):
+    def _share_position_array(self, pos_array):
+        """
+        Make the given vertex position array the one used by all subobject geoms.
 
-        verts = self._subobjs["vert"]
-        polys = self._subobjs["poly"]
-        merged_verts = self.merged_verts
-        polys_to_update = set()
-        verts_to_resmooth = set()
-        geom_node_top = self._toplvl_node
-        vertex_data_top = geom_node_top.modify_geom(0).modify_vertex_data()
-        pos_writer = GeomVertexWriter(vertex_data_top, "vertex")
+        The edge geoms cannot share it, since every polygon vertex is both the
+        start of one edge and the end of another, with a different picking color
+        for each; their vertex data has twice as many rows, so the positions are
+        copied into both halves of a separate array instead.
 
-        for vert_id in vertex_ids:
-            vert = verts[vert_id]
-            poly = polys[vert.polygon_id]
-            polys_to_update.add(poly)
-            row = vert.row_index
-            pos = vert.get_pos()
-            pos_writer.set_row(row)
-            pos_writer.set_data3(pos)
-
-        pos_array = vertex_data_top.get_array(0)
+        """
 
         for geom_type in ("poly", "poly_picking"):
             vertex_data = self._vertex_data[geom_type]
@@ -121,16 +114,43 @@ class GeomTransformMixin:
             vertex_data = geoms[geom_type]["sel_state"].node().modify_geom(0).modify_vertex_data()
             vertex_data.set_array(0, pos_array)
 
-        size = pos_array.data_size_bytes
         vertex_data = geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
-        pos_array_edge = vertex_data.modify_array(0)
+        self._copy_edge_positions(pos_array, vertex_data.modify_array(0))
+        pos_array_edge = vertex_data.get_array(0)
+        vertex_data = geoms["edge"]["sel_state"].node().modify_geom(0).modify_vertex_data()
+        vertex_data.set_array(0, pos_array_edge)
+
+    @staticmethod
+    def _copy_edge_positions(pos_array, pos_array_edge):
+        """ Copy the given vertex positions into both halves of the edge position array """
+
+        size = pos_array.data_size_bytes
         from_view = memoryview(pos_array).cast("B")
         to_view = memoryview(pos_array_edge).cast("B")
         to_view[:size] = from_view
         to_view[size:] = from_view
-        pos_array_edge = vertex_data.get_array(0)
-        vertex_data = geoms["edge"]["sel_state"].node().modify_geom(0).modify_vertex_data()
-        vertex_data.set_array(0, pos_array_edge)
+
+    def update_vertex_positions(self, vertex_ids, update_bounds=True):
+
+        verts = self._subobjs["vert"]
+        polys = self._subobjs["poly"]
+        merged_verts = self.merged_verts
+        polys_to_update = set()
+        verts_to_resmooth = set()
+        geom_node_top = self._toplvl_node
+        vertex_data_top = geom_node_top.modify_geom(0).modify_vertex_data()
+        pos_writer = GeomVertexWriter(vertex_data_top, "vertex")
+
+        for vert_id in vertex_ids:
+            vert = verts[vert_id]
+            poly = polys[vert.polygon_id]
+            polys_to_update.add(poly)
+            row = vert.row_index
+            pos = vert.get_pos()
+            pos_writer.set_row(row)
+            pos_writer.set_data3(pos)
+
+        self._share_position_array(vertex_data_top.get_array(0))
 
         for poly in polys_to_update:
             poly.update_center_pos()
@@ -148,8 +168,6 @@ class GeomTransformMixin:
     def reposition_vertices(self, computation):
         """ Change the positions of all vertices using the given computation """
 
-        verts = self._subobjs["vert"]
-        geoms = self._geoms
         geom_node_top = self._toplvl_node
         vertex_data_top = geom_node_top.modify_geom(0).modify_vertex_data()
         pos_writer = GeomVertexWriter(vertex_data_top, "vertex")
@@ -162,28 +180,7 @@ class GeomTransformMixin:
             pos_writer.set_data3(Point3(*new_pos))
             vert.set_pos(Point3(*new_pos))
 
-        pos_array = vertex_data_top.get_array(0)
-
-        for geom_type in ("poly", "poly_picking"):
-            vertex_data = self._vertex_data[geom_type]
-            vertex_data.set_array(0, pos_array)
-
-        for geom_type in ("vert", "normal"):
-            vertex_data = geoms[geom_type]["pickable"].node().modify_geom(0).modify_vertex_data()
-            vertex_data.set_array(0, pos_array)
-            vertex_data = geoms[geom_type]["sel_state"].node().modify_geom(0).modify_vertex_data()
-            vertex_data.set_array(0, pos_array)
-
-        size = pos_array.data_size_bytes
-        vertex_data = geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
-        pos_array_edge = vertex_data.modify_array(0)
-        from_view = memoryview(pos_array).cast("B")
-        to_view = memoryview(pos_array_edge).cast("B")
-        to_view[:size] = from_view
-        to_view[size:] = from_view
-        pos_array_edge = vertex_data.get_array(0)
-        vertex_data = geoms["edge"]["sel_state"].node().modify_geom(0).modify_vertex_data()
-        vertex_data.set_array(0, pos_array_edge)
+        self._share_position_array(vertex_data_top.get_array(0))
 
         self.update_poly_centers()
         self.update_poly_normals()
@@ -194,33 +191,11 @@ class GeomTransformMixin:
         """ Bake the origin's transform into the vertices and reset it to identity """
 
         mat = self.origin.get_mat()
-        geoms = self._geoms
         geom_node_top = self._toplvl_node
         geom_node_top.modify_geom(0).transform_vertices(mat)
         self.origin.clear_transform()
         vertex_data_top = geom_node_top.get_geom(0).get_vertex_data()
-        pos_array = vertex_data_top.get_array(0)
-
-        for geom_type in ("poly", "poly_picking"):
-            vertex_data = self._vertex_data[geom_type]
-            vertex_data.set_array(0, pos_array)
-
-        for geom_type in ("vert", "normal"):
-            vertex_data = geoms[geom_type]["pickable"].node().modify_geom(0).modify_vertex_data()
-            vertex_data.set_array(0, pos_array)
-            vertex_data = geoms[geom_type]["sel_state"].node().modify_geom(0).modify_vertex_data()
-            vertex_data.set_array(0, pos_array)
-
-        size = pos_array.data_size_bytes
-        vertex_data = geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
-        pos_array_edge = vertex_data.modify_array(0)
-        from_view = memoryview(pos_array).cast("B")
-        to_view = memoryview(pos_array_edge).cast("B")
-        to_view[:size] = from_view
-        to_view[size:] = from_view
-        pos_array_edge = vertex_data.get_array(0)
-        vertex_data = geoms["edge"]["sel_state"].node().modify_geom(0).modify_vertex_data()
-        vertex_data.set_array(0, pos_array_edge)
+        self._share_position_array(vertex_data_top.get_array(0))
 
         pos_reader = GeomVertexReader(vertex_data_top, "vertex")
 
@@ -289,10 +264,208 @@ class GeomTransformMixin:
             vertex_data = geoms["edge"]["pickable"].node().modify_geom(0).modify_vertex_data()
             vertex_data.set_array(0, pos_array_edge)
 
-    def init_transform(self):
+    def init_transform(self, interactive=False):
 
         self.prepare_transform(self.get_vertex_position_data())
 
+        if interactive and GD["subobj_drag_normal_update"]:
+            self.__init_drag_update(GD["active_obj_level"])
+
+    def __init_drag_update(self, subobj_lvl):
+        """
+        Precompute which polygon normals and centers, as well as which vertex
+        normals, need to be updated while the selected subobjects are dragged.
+        Everything is stored as flat arrays of vertex rows, such that these
+        updates can be done directly from the vertex position data.
+
+        """
+
+        if subobj_lvl == "normal" or not self._verts_to_transf[subobj_lvl]:
+            return
+
+        verts = self._subobjs["vert"]
+        polys = self._subobjs["poly"]
+        shared_normals = self.shared_normals
+        poly_ids = set()
+
+        for merged_vert in self._verts_to_transf[subobj_lvl]:
+            poly_ids.update(merged_vert.polygon_ids)
+
+        poly_ids = list(poly_ids)
+        tri_rows = array.array("I")
+        tri_offsets = array.array("I", [0])
+        poly_rows = array.array("I")
+        poly_offsets = array.array("I", [0])
+
+        for poly_id in poly_ids:
+            poly = polys[poly_id]
+            tri_rows.extend(verts[v_id].row_index for tri in poly for v_id in tri)
+            tri_offsets.append(len(tri_rows))
+            poly_rows.extend(verts[v_id].row_index for v_id in poly.vertex_ids)
+            poly_offsets.append(len(poly_rows))
+
+        # the normals of the transformed polygons are followed by those of the
+        # polygons that are not transformed but still contribute to the updated
+        # vertex normals; the latter remain constant during the transform
+        poly_indices = {p_id: i for i, p_id in enumerate(poly_ids)}
+        poly_normals = array.array("f", bytes(len(poly_ids) * 12))
+        group_rows = array.array("I")
+        group_polys = array.array("I")
+        group_offsets = array.array("I", [0])
+        vert_ids = set(v_id for p_id in poly_ids for v_id in polys[p_id].vertex_ids)
+
+        for shared_normal in set(shared_normals[v_id] for v_id in vert_ids):
+
+            for vert_id in shared_normal:
+
+                vert = verts[vert_id]
+
+                if vert.has_locked_normal():
+                    continue
+
+                poly_id = vert.polygon_id
+
+                if poly_id not in poly_indices:
+                    poly_indices[poly_id] = len(poly_normals) // 3
+                    poly_normals.extend(polys[poly_id].normal)
+
+                group_rows.append(vert.row_index)
+                group_polys.append(poly_indices[poly_id])
+
+            if len(group_rows) > group_offsets[-1]:
+                group_offsets.append(len(group_rows))
+
+        # the toplevel geom and the polygon geoms share a single copy of the
+        # normal array, which is then updated in place, like the position array
+        vertex_data_top = self._toplvl_node.modify_geom(0).modify_vertex_data()
+        normal_array = vertex_data_top.get_array(2)
+        normal_array_main = GeomVertexArrayData(normal_array)
+        vertex_data_top.set_array(2, normal_array_main)
+        self._vertex_data["poly"].set_array(2, normal_array_main)
+        drag_polys = [polys[poly_id] for poly_id in poly_ids]
+
+        self._drag_update_data = {
+            "tri_rows": tri_rows,
+            "tri_offsets": tri_offsets,
+            "poly_rows": poly_rows,
+            "poly_offsets": poly_offsets,
+            "polys": drag_polys,
+            "poly_centers": [poly.center_pos for poly in drag_polys],
+            "poly_normals": poly_normals,
+            "group_rows": group_rows,
+            "group_polys": group_polys,
+            "group_offsets": group_offsets,
+            "normal_array": normal_array,
+            "normal_array_main": normal_array_main
+        }
+        self._drag_update_stats = {"frames": 0, "total_time": 0., "max_time": 0., "pos_time": 0.}
+
+    def __update_dragged_normals(self, pos_array):
+        """
+        Update the normals and centers of the polygons affected by the current
+        subobject transform, as well as the vertex normals depending on them.
+        Only the affected vertex normals are written, directly into the normal
+        array shared by the toplevel geom and the polygon geoms.
+
+        """
+
+        start_time = time.perf_counter()
+        data = self._drag_update_data
+        pos_view = memoryview(pos_array).cast("B").cast("f")
+        tri_rows = data["tri_rows"]
+        tri_offsets = data["tri_offsets"]
+        poly_rows = data["poly_rows"]
+        poly_offsets = data["poly_offsets"]
+        drag_polys = data["polys"]
+        poly_normals = data["poly_normals"]
+
+        for i in range(len(tri_offsets) - 1):
+
+            x = y = z = 0.
+            start, end = tri_offsets[i], tri_offsets[i + 1]
+
+            for j in range(start, end, 3):
+                r1, r2, r3 = tri_rows[j] * 3, tri_rows[j + 1] * 3, tri_rows[j + 2] * 3
+                x1, y1, z1 = pos_view[r1], pos_view[r1 + 1], pos_view[r1 + 2]
+                x2, y2, z2 = pos_view[r2], pos_view[r2 + 1], pos_view[r2 + 2]
+                ux, uy, uz = x2 - x1, y2 - y1, z2 - z1
+                vx, vy, vz = pos_view[r3] - x2, pos_view[r3 + 1] - y2, pos_view[r3 + 2] - z2
+                x += uy * vz - uz * vy
+                y += uz * vx - ux * vz
+                z += ux * vy - uy * vx
+
+            tri_count = (end - start) // 3
+            poly_normals[i * 3:i * 3 + 3] = array.array("f", (x / tri_count, y / tri_count,
+                                                             z / tri_count))
+            x = y = z = 0.
+            start, end = poly_offsets[i], poly_offsets[i + 1]
+
+            for j in range(start, end):
+                r = poly_rows[j] * 3
+                x += pos_view[r]
+                y += pos_view[r + 1]
+                z += pos_view[r + 2]
+
+            count = end - start
+            drag_polys[i].center_pos = Point3(x / count, y / count, z / count)
+
+        vertex_data_top = self._toplvl_node.modify_geom(0).modify_vertex_data()
+        normal_array = data["normal_array_main"]
+        normal_view = memoryview(normal_array).cast("B").cast("f")
+        sign = -1. if self.owner.has_inverted_geometry() else 1.
+        group_rows = data["group_rows"]
+        group_polys = data["group_polys"]
+        group_offsets = data["group_offsets"]
+
+        for i in range(len(group_offsets) - 1):
+
+            x = y = z = 0.
+            start, end = group_offsets[i], group_offsets[i + 1]
+
+            for j in range(start, end):
+                k = group_polys[j] * 3
+                x += poly_normals[k]
+                y += poly_normals[k + 1]
+                z += poly_normals[k + 2]
+
+            length = math.sqrt(x * x + y * y + z * z)
+
+            if length:
+                length *= sign
+                x /= length
+                y /= length
+                z /= length
+
+            for j in range(start, end):
+                r = group_rows[j] * 3
+                normal_view[r] = x
+                normal_view[r + 1] = y
+                normal_view[r + 2] = z
+
+        vertex_data_top.set_array(2, normal_array)
+
+        update_time = time.perf_counter() - start_time
+        stats = self._drag_update_stats
+        stats["frames"] += 1
+        stats["total_time"] += update_time
+        stats["max_time"] = max(stats["max_time"], update_time)
+
+    def get_drag_update_stats(self):
+        """
+        Return the number of frames during which normals were updated for the last
+        interactive subobject transform, the average and maximum time (in
+        milliseconds) that those updates took, as well as the average time spent
+        on updating the vertex positions each frame.
+
+        """
+
+        stats = self._drag_update_stats
+        frames = stats["frames"]
+        avg_time = stats["total_time"] / frames * 1000. if frames else 0.
+        avg_pos_time = stats["pos_time"] / frames * 1000. if frames else 0.
+
+        return frames, avg_time, stats["max_time"] * 1000., avg_pos_time
+
     def set_vert_sel_coordinate(self, axis, value):
 
         verts = self._verts_to_transf["vert"]
@@ -335,6 +508,8 @@ class GeomTransformMixin:
         if not rows:
             return
 
+        start_time = time.perf_counter()
+
         ref_node = self._get_ref_node()
         transf_center_pos = self._get_transf_center_pos()
         origin = self.origin
@@ -397,26 +572,48 @@ class GeomTransformMixin:
             mat *= offset_mat
 
         tmp_vertex_data.transform_vertices(mat, rows)
-        pos_array_tmp = GeomVertexArrayData(tmp_vertex_data.get_array(0))
-        vertex_data_top.set_array(0, pos_array_tmp)
-
-        size = pos_array_tmp.data_size_bytes
+        pos_array_tmp = tmp_vertex_data.get_array(0)
         pos_array_main = self._pos_arrays["main"]
         pos_array_edge = self._pos_arrays["edge"]
         pos_array_edge.unclean_set_num_rows(pos_array_tmp.get_num_rows() * 2)
 
+        # the transformed positions are copied into the array that is already shared
+        # by the subobject geoms, which the toplevel geom then shares as well,
+        # instead of giving the latter a separate copy
         from_view = memoryview(pos_array_tmp).cast("B")
         to_view = memoryview(pos_array_main).cast("B")
         to_view[:] = from_view
-        to_view = memoryview(pos_array_edge).cast("B")
-        to_view[:size] = from_view
-        to_view[size:] = from_view
+        vertex_data_top.set_array(0, pos_array_main)
+        self._copy_edge_positions(pos_array_tmp, pos_array_edge)
+
+        if self._drag_update_data:
+            stats = self._drag_update_stats
+            stats["pos_time"] += time.perf_counter() - start_time
+            self.__update_dragged_normals(pos_array_main)
 
     def finalize_transform(self, cancelled=False):
 
         start_data = self._transf_start_data
         geom_node_top = self._toplvl_node
         vertex_data_top = geom_node_top.modify_geom(0).modify_vertex_data()
+        drag_update_data = self._drag_update_data
+        self._drag_update_data = None
+
+        if drag_update_data and self._drag_update_stats["frames"]:
+
+            frames, avg_time, max_time, avg_pos_time = self.get_drag_update_stats()
+            Notifiers.geom.debug(f"Normals updated during {frames} frames;"
+                                 f" avg. {avg_time :.2f} ms, max. {max_time :.2f} ms per frame;"
+                                 f" positions updated in avg. {avg_pos_time :.2f} ms per frame.")
+
+        if drag_update_data and cancelled:
+
+            normal_array = drag_update_data["normal_array"]
+            vertex_data_top.set_array(2, normal_array)
+            self._vertex_data["poly"].set_array(2, GeomVertexArrayData(normal_array))
+
+            for poly, center_pos in zip(drag_update_data["polys"], drag_update_data["poly_centers"]):
+                poly.center_pos = center_pos
 
         if self._picking_geom_xform_locked:
             pos_array_main = self._pos_arrays["main"]
@@ -840,7 +1037,7 @@ class TransformMixin:
 
             Mgr.update_remotely("transform_values", transform_values)
 
-    def init_transform(self, objects=None):
+    def init_transform(self, objects=None, interactive=False):
 
         geom_data_objs = [o.geom_obj.geom_data_obj for o in objects] if objects else self._groups
 
@@ -849,11 +1046,11 @@ class TransformMixin:
                 geom_data_obj.init_normal_transform()
         else:
             for geom_data_obj in geom_data_objs:
-                geom_data_obj.init_transform()
+                geom_data_obj.init_transform(interactive)
 
     def init_translation(self):
 
-        self.init_transform()
+        self.init_transform(interactive=True)
 
     def translate(self, translation_vec):
 
@@ -868,7 +1065,7 @@ class TransformMixin:
 
     def init_rotation(self):
 
-        self.init_transform()
+        self.init_transform(interactive=True)
 
     def rotate(self, rotation):
 
@@ -883,7 +1080,7 @@ class TransformMixin:
 
     def init_scaling(self):
 
-        self.init_transform()
+        self.init_transform(interactive=True)
 
     def scale(self, scaling):
 
@@ -1,4 +1,75 @@
 from ...base import *
+import array
+
+
+def find_duplicate_rows(row_groups, row_count):
+    """
+    Weld vertex rows that have identical vertex properties.
+
+    The given row_groups is an iterable of sequences of (row, key) pairs, where
+    each key is a hashable combination of the properties of the vertex at that
+    row; only rows within the same group are considered for welding, onto the
+    first row in that group with an equal key.
+
+    Return the (ascending) list of rows that are kept, as well as an array that
+    maps each source row to its destination row.
+
+    """
+
+    dupes = {}
+
+    for group in row_groups:
+
+        kept_rows = {}
+
+        for row, key in group:
+
+            kept_row = kept_rows.setdefault(key, row)
+
+            if kept_row != row:
+                dupes[row] = kept_row
+
+    row_map = array.array("I", bytes(4 * row_count))
+    rows = [row for row in range(row_count) if row not in dupes]
+
+    for row_dest, row_src in enumerate(rows):
+        row_map[row_src] = row_dest
+
+    for row, kept_row in dupes.items():
+        row_map[row] = row_map[kept_row]
+
+    return rows, row_map
+
+
+def benchmark(sizes=(10000, 40000, 160000), group_size=4):
+    """
+    Time the welding pass for meshes of increasing vertex count and return the
+    time spent per vertex for each of them; these should remain roughly equal,
+    as the pass scales linearly with the number of vertices.
+
+    """
+
+    results = {}
+
+    for size in sizes:
+
+        groups = []
+
+        for start in range(0, size, group_size):
+            # every other vertex in a group has the same normal, such that half
+            # of the vertices get welded
+            group = [(row, ((0., 0., 0.), (0., 0., float(row % 2)), (), None))
+                     for row in range(start, min(start + group_size, size))]
+            groups.append(group)
+
+        start_time = time.perf_counter()
+        find_duplicate_rows(groups, size)
+        results[size] = (time.perf_counter() - start_time) / size
+
+    for size, time_per_vert in results.items():
+        Notifiers.geom.info(f"Welded {size} vertices; {time_per_vert * 1e9:.1f} ns per vertex.")
+
+    return results
 
 
 class VertexMerger:
@@ -12,9 +83,7 @@ class VertexMerger:
     def __clear(self):
 
         self.rows = []
-        self.dupes = {}
-        self.verts1 = []
-        self.verts2 = []
+        self.row_map = None
         self.geom = None
         self.vdata_dest = None
         self.prim_dest = None
@@ -33,67 +102,57 @@ class VertexMerger:
         else:
             return NodePath(geom_node)
 
-    def __set_merged_verts_to_compare(self, verts, merged_vert):
-
-        self.verts1 = [verts[v_id] for v_id in merged_vert]
-        self.verts2 = self.verts1[:]
-
-    def __compare_merged_verts(self):
-
-        for vert1 in self.verts1:
-
-            row1 = vert1.row_index
-
-            if row1 not in self.dupes:
-                for vert2 in self.verts2[:]:
-                    self.__check_if_verts_equal(vert1, vert2, row1)
+    def __create_vertex_data(self, geom_data_obj):
 
-    def __check_if_verts_equal(self, vert1, vert2, row1):
+        self.geom = geom_data_obj.toplevel_geom.node().get_geom(0)
+        vdata_src = self.geom.get_vertex_data()
+        self.vdata_dest = vdata_dest = GeomVertexData(vdata_src)
+        rows = self.rows
 
-        if vert2 is not vert1:
+        if len(rows) == vdata_src.get_num_rows():
+            return
 
-            pos1 = vert1.get_pos()
-            normal1 = vert1.normal
-            uv1 = vert1.get_uvs()
-            col1 = vert1.color
+        vdata_dest.unclean_set_num_rows(len(rows))
 
-            pos2 = vert2.get_pos()
-            normal2 = vert2.normal
-            uv2 = vert2.get_uvs()
-            col2 = vert2.color
+        # the kept rows are in ascending order, so consecutive ones can be copied
+        # together as a single block of bytes
+        runs = []
+        run_start = prev_row = rows[0]
 
-            if pos2 == pos1 and normal2 == normal1 and uv2 == uv1 and col2 == col1:
-                row2 = vert2.row_index
-                self.rows.remove(row2)
-                self.verts2.remove(vert2)
-                self.dupes[row2] = row1
+        for row in rows[1:]:
+            if row != prev_row + 1:
+                runs.append((run_start, prev_row + 1))
+                run_start = row
+            prev_row = row
 
-    def __create_vertex_data(self, geom_data_obj):
+        runs.append((run_start, prev_row + 1))
 
-        self.geom = geom_data_obj.toplevel_geom.node().get_geom(0)
-        vdata_src = self.geom.get_vertex_data()
-        self.vdata_dest = GeomVertexData(vdata_src)
-        self.vdata_dest.unclean_set_num_rows(len(self.rows))
-        thread = Thread.get_main_thread()
+        for i in range(vdata_src.get_num_arrays()):
 
-        for row_dest, row_src in enumerate(self.rows):
-            self.vdata_dest.copy_row_from(row_dest, vdata_src, row_src, thread)
+            stride = vdata_src.get_array(i).get_array_format().get_stride()
+            from_view = memoryview(vdata_src.get_array(i)).cast("B")
+            to_view = memoryview(vdata_dest.modify_array(i)).cast("B")
+            offset = 0
 
-        for row2, row1 in list(self.dupes.items()):
-            self.dupes[row2] = self.rows.index(row1)
+            for start, end in runs:
+                size = (end - start) * stride
+                to_view[offset:offset + size] = from_view[start * stride:end * stride]
+                offset += size
 
-    def __create_geom_primitive(self, return_row_change): 
+    def __create_geom_primitive(self, return_row_change):
 
         prim_src = self.geom.get_primitive(0)
         self.prim_dest = prim_dest = GeomTriangles(Geom.UH_static)
         prim_dest.set_index_type(Geom.NT_uint32)
         rows_src = prim_src.get_vertex_list()
-        dupes = self.dupes
-        rows = self.rows
-        rows_dest = [dupes[row] if row in dupes else rows.index(row) for row in rows_src]
+        row_map = self.row_map
+        rows_dest = array.array("I", [row_map[row] for row in rows_src])
+        prim_size = len(rows_dest)
+        prim_array = prim_dest.modify_vertices()
+        prim_array.unclean_set_num_rows(prim_size)
 
-        for indices in (rows_dest[i:i + 3] for i in range(0, len(rows_dest), 3)):
-            prim_dest.add_vertices(*indices)
+        if prim_size:
+            memoryview(prim_array).cast("B").cast("I")[:] = rows_dest
 
         if return_row_change:
             return dict(zip(rows_src, rows_dest))
@@ -115,11 +174,21 @@ class VertexMerger:
 
         verts = geom_data_obj.get_subobjects("vert")
         merged_verts = set(geom_data_obj.merged_verts.values())
-        self.rows = list(range(len(verts)))
+        row_groups = []
 
         for merged_vert in merged_verts:
-            self.__set_merged_verts_to_compare(verts, merged_vert)
-            self.__compare_merged_verts()
+
+            group = []
+
+            for vert_id in merged_vert:
+                vert = verts[vert_id]
+                uvs = tuple(sorted(vert.get_uvs().items()))
+                key = (tuple(vert.get_pos()), tuple(vert.normal), uvs, tuple(vert.color))
+                group.append((vert.row_index, key))
+
+            row_groups.append(group)
+
+        self.rows, self.row_map = find_duplicate_rows(row_groups, len(verts))
 
 
 MainObjects.add_class(VertexMerger)
@@ -368,10 +368,18 @@ class EdgeManager(ObjectManager, PickingColorIDManager):
         PickableTypes.add("edge")
         Mgr.accept("create_merged_edge", self.__create_merged_edge)
 
-    def __create_edge(self, geom_data_obj, verts):
+    def __create_edge(self, geom_data_obj, verts, picking_col_ids=None):
 
         edge_id = self.get_next_id()
-        picking_col_id = self.get_next_picking_color_id()
+
+        # when creating many subobjects, their picking color IDs are reserved
+        # in bulk beforehand; a reserved ID can be None if they ran out, which
+        # was already reported, so no ID is requested separately in that case
+        if picking_col_ids is None:
+            picking_col_id = self.get_next_picking_color_id()
+        else:
+            picking_col_id = next(picking_col_ids)
+
         edge = Edge(edge_id, picking_col_id, geom_data_obj, verts)
 
         return edge
@@ -1,11 +1,42 @@
 from ..base import *
 from .material import render_state_to_material
+from .catmull_clark import PackedQuadData
+
+
+def _get_quad_aux_data(geom_data):
+
+    import array
+
+    coords = geom_data.positions
+    pos_indices = geom_data.pos_indices
+    pos_values = array.array("f", [])
+    sides_values = array.array("I", [])
+    snap_values = array.array("f", [])
+
+    for i in range(0, len(pos_indices), 4):
+
+        quad_coords = [coords[j*3:j*3+3] for j in pos_indices[i:i+4]]
+        pos = sum((Point3(*c) for c in quad_coords), Point3()) / 4
+
+        # the quad is split into the triangles (0, 1, 2) and (0, 2, 3), so the
+        # diagonal (0, 2) should not be rendered
+        for tri_corners, tri_sides in (((0, 1, 2), 0b110), ((0, 2, 3), 0b011)):
+            for corner in tri_corners:
+                pos_values.extend(quad_coords[corner])
+                sides_values.append(tri_sides)
+                snap_values.extend(pos)
+
+    return len(pos_indices) // 2 * 3, pos_values, sides_values, snap_values
 
 
 def create_aux_geom(geom_data):
 
     import array
 
+    if isinstance(geom_data, PackedQuadData):
+        vert_count, pos_values, sides_values, snap_values = _get_quad_aux_data(geom_data)
+        return _build_aux_geom(vert_count, pos_values, sides_values, snap_values)
+
     sides = {}
     polys = []
     positions = {}
@@ -56,22 +87,9 @@ def create_aux_geom(geom_data):
 
         polys.append((poly, poly_verts))
 
-    # Build auxiliary geom, used for wireframe display and snapping.
-
-    vertex_format = Mgr.get("aux_locked_vertex_format")
-    vertex_data = GeomVertexData("wireframe_data", vertex_format, Geom.UH_static)
-    vertex_data.reserve_num_rows(vert_count)
-    vertex_data.unclean_set_num_rows(vert_count)
-    pos_view = memoryview(vertex_data.modify_array(0)).cast("B").cast("f")
-    sides_view = memoryview(vertex_data.modify_array(1)).cast("B").cast("I")
-    snap_view = memoryview(vertex_data.modify_array(2)).cast("B").cast("f")
     pos_values = array.array("f", [])
     sides_values = array.array("I", [])
     snap_values = array.array("f", [])
-    prim = GeomTriangles(Geom.UH_static)
-    prim.set_index_type(Geom.NT_uint32)
-    prim.reserve_num_vertices(vert_count)
-    prim.add_next_vertices(vert_count)
 
     for poly, poly_verts in polys:
 
@@ -85,6 +103,24 @@ def create_aux_geom(geom_data):
                 sides_values.append(tri_sides)
                 snap_values.extend(pos)
 
+    return _build_aux_geom(vert_count, pos_values, sides_values, snap_values)
+
+
+def _build_aux_geom(vert_count, pos_values, sides_values, snap_values):
+
+    # Build auxiliary geom, used for wireframe display and snapping.
+
+    vertex_format = Mgr.get("aux_locked_vertex_format")
+    vertex_data = GeomVertexData("wireframe_data", vertex_format, Geom.UH_static)
+    vertex_data.reserve_num_rows(vert_count)
+    vertex_data.unclean_set_num_rows(vert_count)
+    pos_view = memoryview(vertex_data.modify_array(0)).cast("B").cast("f")
+    sides_view = memoryview(vertex_data.modify_array(1)).cast("B").cast("I")
+    snap_view = memoryview(vertex_data.modify_array(2)).cast("B").cast("f")
+    prim = GeomTriangles(Geom.UH_static)
+    prim.set_index_type(Geom.NT_uint32)
+    prim.reserve_num_vertices(vert_count)
+    prim.add_next_vertices(vert_count)
     pos_view[:] = pos_values
     sides_view[:] = sides_values
     snap_view[:] = snap_values
@@ -265,7 +301,7 @@ class LockedGeomBase:
             texture = vert_color_map.get_texture()
 
             if vert_color_map.active and texture:
-                self.bake_texture(texture)
+                self.bake_texture(texture, vert_color_map.get_sampler())
 
     @property
     def geom_for_pickling(self):
@@ -482,23 +518,12 @@ class LockedGeomBase:
             else:
                 self.is_tangent_space_initialized = True
 
-    def bake_texture(self, texture):
+    def bake_texture(self, texture, sampler=None):
 
         def task():
 
             vertex_data = self.geom.node().modify_geom(0).modify_vertex_data()
-            vertex_data_copy = vertex_data.set_color((1., 1., 1., 1.))
-            array = vertex_data_copy.get_array(1)
-            vertex_data.set_array(1, GeomVertexArrayData(array))
-            geom_copy = self.geom.copy_to(GD.world)
-            geom_copy.detach_node()
-            geom_copy.set_texture(TextureStage.default, texture)
-            geom_copy.flatten_light()
-            geom_copy.apply_texture_colors()
-            vertex_data_copy = geom_copy.node().modify_geom(0).modify_vertex_data()
-            index = vertex_data_copy.format.get_array_with("color")
-            array = vertex_data_copy.modify_array(index)
-            vertex_data.set_array(1, array)
+            tex_bake.bake_texture(vertex_data, texture, sampler)
 
         if self.geom:
             task()
@@ -668,9 +693,9 @@ class LockedGeomBase:
                 GD["progress_steps"] = progress_steps
 
             geom_data_obj = unlocked_geom.geom_data_obj
-            vert_data = geom_data[0]["verts"][0]
 
-            if "pos_ind" not in vert_data:
+            if (not isinstance(geom_data, PackedQuadData)
+                    and "pos_ind" not in geom_data[0]["verts"][0]):
                 for _ in self._define_connectivity(geom_data, gradual=gradual):
                     if gradual:
                         yield True
@@ -726,6 +751,9 @@ class LockedGeomBase:
 
     def get_subdivision_data(self):
 
+        if isinstance(self.geom_data, PackedQuadData):
+            return self.geom_data.get_subdivision_data(self.has_inverted_geometry())
+
         vert_data = self.geom_data[0]["verts"][0]
 
         if "pos_ind" not in vert_data:
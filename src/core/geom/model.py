@@ -549,11 +549,20 @@ class ModelManager(ObjectManager):
 
         vert_normals = [sum(face_normals[i], Vec3()).normalized() for i in range(len(positions))]
         new_geom_data = catmull_clark.convert_data(data, vert_normals)
+        # the vertex rows correspond to the UVs of the converted data
+        pos_values = new_geom_data.positions
+        normal_values = new_geom_data.normals
+        uv_values = new_geom_data.uvs
+        row_pos_indices = [0] * count
 
-        for uv, i in uvs:
-            data_array.extend(positions[i])
-            data_array.extend(vert_normals[i])
-            data_array.extend(uv)
+        for pos_ind, uv_ind in zip(new_geom_data.pos_indices, new_geom_data.uv_indices):
+            row_pos_indices[uv_ind] = pos_ind
+
+        for row, pos_ind in enumerate(row_pos_indices):
+            i = pos_ind * 3
+            data_array.extend(pos_values[i:i+3])
+            data_array.extend(normal_values[i:i+3])
+            data_array.extend(uv_values[row*2:row*2+2])
 
         memview[:] = data_array
 
@@ -570,8 +579,10 @@ class ModelManager(ObjectManager):
         prim_array.unclean_set_num_rows(prim_size)
         memview = memoryview(prim_array).cast("B").cast(int_format)
         data_array = array.array(int_format, [])
+        uv_indices = new_geom_data.uv_indices
 
-        for (row0, row1, row2, row3) in uv_faces:
+        for i in range(0, len(uv_indices), 4):
+            row0, row1, row2, row3 = uv_indices[i:i+4]
             data_array.extend((row0, row1, row2, row0, row2, row3))
 
         memview[:] = data_array
@@ -12,7 +12,8 @@ class Polygon:
             "_id": self.id,
             "_picking_col_id": self.picking_color_id,
             "_creation_time": self.creation_time,
-            "_prev_prop_time": self._prev_prop_time,
+            "_prev_prop_time": ({"tri_data": None} if self._prev_prop_time is None
+                                else self._prev_prop_time),
             "_tri_data": self._tri_data,
             "_vert_ids": self.vertex_ids,
             "_edge_ids": self.edge_ids,
@@ -30,7 +31,8 @@ class Polygon:
         self.id = state["_id"]
         self.picking_color_id = state["_picking_col_id"]
         self.creation_time = state["_creation_time"]
-        self._prev_prop_time = state["_prev_prop_time"]
+        prev_prop_time = state["_prev_prop_time"]
+        self._prev_prop_time = None if prev_prop_time["tri_data"] is None else prev_prop_time
         self._tri_data = state["_tri_data"]
         self.vertex_ids = state["_vert_ids"]
         self.edge_ids = state["_edge_ids"]
@@ -44,7 +46,8 @@ class Polygon:
         self.picking_color_id = picking_col_id
         self.geom_data_obj = geom_data_obj
         self.creation_time = None
-        self._prev_prop_time = {"tri_data": None}
+        # only allocated once set, to save memory for meshes with many polygons
+        self._prev_prop_time = None
         self._tri_data = triangle_data  # sequence of 3-tuples of vertex IDs
         self.vertex_ids = [vert.id for vert in verts]
         self.edge_ids = [edge.id for edge in edges]
@@ -97,10 +100,16 @@ class Polygon:
 
     def set_previous_property_time(self, prop_id, time_id):
 
+        if self._prev_prop_time is None:
+            self._prev_prop_time = {"tri_data": None}
+
         self._prev_prop_time[prop_id] = time_id
 
     def get_previous_property_time(self, prop_id):
 
+        if self._prev_prop_time is None:
+            return
+
         return self._prev_prop_time[prop_id]
 
     def set_triangle_data(self, triangle_data):
@@ -403,10 +412,18 @@ class PolygonManager(ObjectManager, PickingColorIDManager):
         PickingColorIDManager.__init__(self)
         PickableTypes.add("poly")
 
-    def __create_polygon(self, geom_data_obj, triangle_data, edges, verts):
+    def __create_polygon(self, geom_data_obj, triangle_data, edges, verts, picking_col_ids=None):
 
         poly_id = self.get_next_id()
-        picking_col_id = self.get_next_picking_color_id()
+
+        # when creating many subobjects, their picking color IDs are reserved
+        # in bulk beforehand; a reserved ID can be None if they ran out, which
+        # was already reported, so no ID is requested separately in that case
+        if picking_col_ids is None:
+            picking_col_id = self.get_next_picking_color_id()
+        else:
+            picking_col_id = next(picking_col_ids)
+
         polygon = Polygon(poly_id, picking_col_id, geom_data_obj, triangle_data, edges, verts)
 
         return polygon
@@ -19,8 +19,8 @@ def _create_geom(geom_data, initial_coords=None):
     prim_view = memoryview(prim_array).cast("B").cast(int_format)
     verts = [v for p in geom_data for v in p["verts"]]
     vert_count = len(verts)
-    vert_ids = [id(v) for v in verts]
-    prim_view[:] = array.array(int_format, [vert_ids.index(id(v)) for p in geom_data
+    rows = {id(v): i for i, v in enumerate(verts)}
+    prim_view[:] = array.array(int_format, [rows[id(v)] for p in geom_data
         for t in p["tris"] for v in t])
 
     vertex_format = Mgr.get("vertex_format_full")
@@ -52,6 +52,190 @@ def _create_geom(geom_data, initial_coords=None):
     return NodePath(geom_node)
 
 
+def _copy_geom_data(geom_data):
+    """
+    Return a copy of the given primitive geometry data that can be modified
+    without affecting the original.
+    Vertices sharing the same PosObj in the original will also share the same
+    (copied) PosObj in the result.
+
+    """
+
+    pos_objs = {}
+    geom_data_copy = []
+
+    for poly_data in geom_data:
+
+        vert_copies = {}
+
+        for vert_data in poly_data["verts"]:
+
+            vert_copy = vert_data.copy()
+            pos = vert_data["pos"]
+
+            if type(pos) is PosObj:
+
+                if pos not in pos_objs:
+                    pos_objs[pos] = PosObj(pos)
+
+                vert_copy["pos"] = pos_objs[pos]
+
+            vert_copy["normal"] = Vec3(vert_data["normal"])
+
+            if "uvs" in vert_data:
+                vert_copy["uvs"] = vert_data["uvs"].copy()
+
+            vert_copies[id(vert_data)] = vert_copy
+
+        poly_verts = [vert_copies[id(v)] for v in poly_data["verts"]]
+        tris = tuple([vert_copies[id(v)] for v in tri] for tri in poly_data["tris"])
+        geom_data_copy.append({"verts": poly_verts, "tris": tris})
+
+    return geom_data_copy
+
+
+class GeomDataTemplates:
+    """
+    Least-recently-used cache of the geometry data defined for primitives.
+
+    Creating a primitive with the same type, segments and smoothness as one
+    created before reuses the data defined for the latter, instead of building
+    it anew; since that data is modified by the primitive, a copy is handed out.
+
+    """
+
+    max_count = 8
+    _templates = {}
+
+    @classmethod
+    def get(cls, prim_type, define_geom_data, segments, *args):
+        """
+        Return the result of calling define_geom_data(segments, *args), taken
+        from the cache if possible.
+        The first item of the result (or the result itself, if not a tuple) is
+        the geometry data, optionally followed by a dict of normal arrays and
+        other data (e.g. row SparseArrays) that is never modified and can
+        therefore be shared.
+
+        """
+
+        seg_key = tuple(sorted(segments.items())) if type(segments) is dict else segments
+        key = (prim_type, seg_key) + args
+        templates = cls._templates
+
+        if key in templates:
+            # move the template to the end, making it the most recently used one
+            template = templates[key] = templates.pop(key)
+        else:
+            template = define_geom_data(segments, *args)
+            templates[key] = template
+
+            if len(templates) > cls.max_count:
+                del templates[next(iter(templates))]
+
+        if type(template) is not tuple:
+            return _copy_geom_data(template)
+
+        geom_data, normals, *other_data = template
+        normals = {k: array.array(a.typecode, a) for k, a in normals.items()}
+
+        return (_copy_geom_data(geom_data), normals, *other_data)
+
+    @classmethod
+    def clear(cls):
+
+        cls._templates.clear()
+
+
+def benchmark_memory(segments=64):
+    """
+    Measure the memory taken up by the Vertex, Edge and Polygon objects created
+    for the Box, Sphere and Torus primitives at high segment counts, and compare
+    it with the size of the same data laid out in flat arrays (positions,
+    normals, UVs, tangent spaces, rows and flags per vertex, as well as
+    compressed sparse row topology for vert->edge and poly->vert connectivity).
+    Return a dict with the subobject counts and both sizes (in bytes) for each
+    primitive type.
+
+    Note that allocations made by Panda3D itself (e.g. the Point3 and Vec3 data)
+    are not traced, so the size of the subobjects is underestimated.
+
+    """
+
+    import tracemalloc
+    from . import box, sphere, torus
+    from ..vert import Vertex
+    from ..edge import Edge
+    from ..poly import Polygon
+
+    generators = {
+        "box": lambda: box._define_geom_data({"x": segments, "y": segments, "z": segments}),
+        "sphere": lambda: sphere._define_geom_data(segments * 2, True)[0],
+        "torus": lambda: torus._define_geom_data({"ring": segments * 2, "section": segments},
+                                                 True)[0]
+    }
+
+    def create_subobjects(geom_data):
+
+        verts = []
+        edges = []
+        polys = []
+
+        for poly_data in geom_data:
+
+            poly_verts = []
+            vert_ids = {}
+
+            for vert_data in poly_data["verts"]:
+                vert = Vertex(len(verts), len(verts), None, vert_data["pos"])
+                vert.normal = Vec3(vert_data["normal"])
+                vert.set_uvs(vert_data.get("uvs", {}))
+                vert_ids[id(vert_data)] = vert.id
+                verts.append(vert)
+                poly_verts.append(vert)
+
+            poly_edges = []
+
+            for vert1, vert2 in zip(poly_verts, poly_verts[1:] + poly_verts[:1]):
+                edge = Edge(len(edges), len(edges), None, (vert1.id, vert2.id))
+                vert1.add_edge_id(edge.id)
+                vert2.add_edge_id(edge.id)
+                edges.append(edge)
+                poly_edges.append(edge)
+
+            tris = [tuple(vert_ids[id(v)] for v in tri) for tri in poly_data["tris"]]
+            polys.append(Polygon(len(polys), len(polys), None, tris, poly_edges, poly_verts))
+
+        return verts, edges, polys
+
+    results = {}
+
+    for prim_type, generator in generators.items():
+
+        geom_data = generator()
+        tracemalloc.start()
+        verts, edges, polys = create_subobjects(geom_data)
+        subobj_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        vert_count = len(verts)
+        poly_count = len(polys)
+        tri_count = sum(len(poly_data["tris"]) for poly_data in geom_data)
+        # 4-byte floats and indices, 1-byte flags
+        vert_size = (3 + 3 + 2 + 6 + 1) * 4 + 1
+        topology_size = (vert_count + 1 + 2 * len(edges)) * 4  # vert->edge
+        topology_size += len(edges) * 2 * 4  # edge->vert
+        topology_size += (poly_count + 1 + vert_count + tri_count * 3) * 4  # poly->vert
+        array_size = vert_count * vert_size + topology_size
+        results[prim_type] = {"vert_count": vert_count, "edge_count": len(edges),
+                              "poly_count": poly_count, "subobjects": subobj_size,
+                              "arrays": array_size}
+        Notifiers.geom.info(f'{prim_type.capitalize()} with {vert_count} vertices: '
+                            f'{subobj_size / vert_count:.0f} bytes (subobjects) vs. '
+                            f'{array_size / vert_count:.0f} bytes (arrays) per vertex.')
+
+    return results
+
+
 class TemporaryPrimitive:
 
     def __init__(self, prim_type, color, pos):
@@ -606,7 +790,7 @@ class Primitive(LockedGeomBase):
                 texture = vert_color_map.get_texture()
 
                 if vert_color_map.active and texture:
-                    self.bake_texture(texture)
+                    self.bake_texture(texture, vert_color_map.get_sampler())
 
         self.uvs_changed = True
 
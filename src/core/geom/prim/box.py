@@ -8,7 +8,7 @@ def _define_geom_data(segments, temp=False):
     # shared by adjacent sides; this in turn will ensure that the corresponding
     # Vertex objects will be merged
     edge_positions = {}
-    pos_objs = []
+    pos_indices = {}
 
     def get_side_pair(i):
 
@@ -69,13 +69,13 @@ def _define_geom_data(segments, temp=False):
                             pos_obj = edge_positions[key]
                         else:
                             pos_obj = PosObj(pos)
-                            pos_objs.append(pos_obj)
+                            pos_indices[pos_obj] = len(pos_indices)
                             edge_positions[key] = pos_obj
 
                     else:
 
                         pos_obj = PosObj(pos)
-                        pos_objs.append(pos_obj)
+                        pos_indices[pos_obj] = len(pos_indices)
 
                     if temp:
                         vert_data[vert_id] = {"pos": pos_obj, "normal": normal}
@@ -84,7 +84,7 @@ def _define_geom_data(segments, temp=False):
                         u += (1. if (direction > 0 if rotate_uvs else direction < 0) else 0.)
                         v = a if rotate_uvs else b
                         vert_data[vert_id] = {"pos": pos_obj, "normal": normal, "uvs": {0: (u, v)},
-                            "pos_ind": pos_objs.index(pos_obj)}
+                            "pos_ind": pos_indices[pos_obj]}
 
                     vert_id += 1
 
@@ -283,7 +283,7 @@ class Box(Primitive):
 
     def recreate(self):
 
-        geom_data = _define_geom_data(self._segments)
+        geom_data = GeomDataTemplates.get("box", _define_geom_data, self._segments)
         Primitive.recreate(self, geom_data)
 
     def set_segments(self, segments):
@@ -483,7 +483,7 @@ class BoxManager(PrimitiveManager):
 
         segments = self.get_property_defaults()["segments"]
 
-        return _define_geom_data(segments)
+        return GeomDataTemplates.get("box", _define_geom_data, segments)
 
     def create_temp_primitive(self, color, pos):
 
@@ -713,7 +713,7 @@ class BoxManager(PrimitiveManager):
         next_color = self.get_next_object_color()
         model.set_color(next_color, update_app=False)
         picking_col_id = self.get_next_picking_color_id()
-        geom_data = _define_geom_data(segments)
+        geom_data = GeomDataTemplates.get("box", _define_geom_data, segments)
         prim = Box(model, segments, picking_col_id, geom_data)
         prim.init_size(x, y, z)
         self.set_next_object_color()
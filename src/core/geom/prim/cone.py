@@ -6,7 +6,7 @@ import array
 def _define_geom_data(segments, smooth, temp=False):
 
     geom_data = []
-    pos_objs = []
+    pos_indices = {}
     positions_main = []
     # keep track of row indices, one SparseArray per generatrix;
     # compute the initial vertex positions the same for all generatrices, as if
@@ -50,7 +50,7 @@ def _define_geom_data(segments, smooth, temp=False):
         for j in range(segs_h + 1):
 
             pos_obj = PosObj(generatrix_pos[j])
-            pos_objs.append(pos_obj)
+            pos_indices[pos_obj] = len(pos_indices)
             positions_main.append(pos_obj)
 
             if not temp:
@@ -75,6 +75,12 @@ def _define_geom_data(segments, smooth, temp=False):
     if segs_cap:
 
         angle = 2 * pi / segs_c
+        # map the position objects of the main vertices to the index of their
+        # first occurrence, to look up the generatrix of cap vertices
+        main_indices = {}
+
+        for index, pos_obj in enumerate(positions_main):
+            main_indices.setdefault(pos_obj, index)
 
         positions_cap_bottom = positions_main[::segs_h + 1]
         positions_cap_top = positions_main[segs_h::segs_h + 1][::-1]
@@ -127,7 +133,7 @@ def _define_geom_data(segments, smooth, temp=False):
                     if j < segs_c:
                         pos = (x, y, z)
                         pos_obj = PosObj(pos)
-                        pos_objs.append(pos_obj)
+                        pos_indices[pos_obj] = len(pos_indices)
                     else:
                         pos_obj = positions[vert_id - segs_c]
 
@@ -142,7 +148,7 @@ def _define_geom_data(segments, smooth, temp=False):
 
             pos = (0., 0., z)
             pos_obj = PosObj(pos)
-            pos_objs.append(pos_obj)
+            pos_indices[pos_obj] = len(pos_indices)
             positions.append(pos_obj)
 
             if not temp:
@@ -195,7 +201,7 @@ def _define_geom_data(segments, smooth, temp=False):
                 else:
                     uv = uvs_main[vi]
                     vert_data[vi] = {"pos": pos, "normal": normal, "uvs": {0: uv},
-                        "pos_ind": pos_objs.index(pos)}
+                        "pos_ind": pos_indices[pos]}
 
                 generatrix_arrays_by_vert_id[vi][0].set_bit(row)
                 row += 1
@@ -274,10 +280,10 @@ def _define_geom_data(segments, smooth, temp=False):
                         else:
                             uv = uvs[vi]
                             vert_data[vi] = {"pos": pos, "normal": normal, "uvs": {0: uv},
-                                "pos_ind": pos_objs.index(pos)}
+                                "pos_ind": pos_indices[pos]}
 
-                        if pos in positions_main:
-                            index = positions_main.index(pos)
+                        index = main_indices.get(pos)
+                        if index is not None:
                             generatrix_arrays_by_vert_id[index][0].set_bit(row)
                         else:
                             sparse_arrays[0].set_bit(row)
@@ -290,8 +296,8 @@ def _define_geom_data(segments, smooth, temp=False):
 
                     for vi in vert_ids:
                         pos = positions[vi]
-                        if pos in positions_main:
-                            index = positions_main.index(pos)
+                        index = main_indices.get(pos)
+                        if index is not None:
                             generatrix_arrays_by_vert_id[index][1].set_bit(row_alt)
                         else:
                             sparse_arrays[1].set_bit(row_alt)
@@ -302,8 +308,8 @@ def _define_geom_data(segments, smooth, temp=False):
 
                     for vi in vert_ids:
                         pos = positions[vi]
-                        if pos in positions_main:
-                            index = positions_main.index(pos)
+                        index = main_indices.get(pos)
+                        if index is not None:
                             generatrix_arrays_by_vert_id[index][1].set_bit(row_alt)
                         else:
                             sparse_arrays[1].set_bit(row_alt)
@@ -337,10 +343,10 @@ def _define_geom_data(segments, smooth, temp=False):
                     else:
                         uv = uvs[vi]
                         tri_data.append({"pos": pos, "normal": normal, "uvs": {0: uv},
-                            "pos_ind": pos_objs.index(pos)})
+                            "pos_ind": pos_indices[pos]})
 
-                    if pos in positions_main:
-                        index = positions_main.index(pos)
+                    index = main_indices.get(pos)
+                    if index is not None:
                         generatrix_arrays_by_vert_id[index][0].set_bit(row)
                         generatrix_arrays_by_vert_id[index][1].set_bit(row_alt)
                     else:
@@ -613,7 +619,8 @@ class Cone(Primitive):
 
     def recreate(self):
 
-        geom_data, normals, arrays = _define_geom_data(self._segments, self._is_smooth)
+        geom_data, normals, arrays = GeomDataTemplates.get("cone", _define_geom_data,
+            self._segments, self._is_smooth)
         self._normals = normals
         self._generatrix_arrays, self._cap_arrays = arrays
         Primitive.recreate(self, geom_data)
@@ -953,7 +960,7 @@ class ConeManager(PrimitiveManager):
         segments = prop_defaults["segments"]
         is_smooth = prop_defaults["smoothness"]
 
-        return _define_geom_data(segments, is_smooth)
+        return GeomDataTemplates.get("cone", _define_geom_data, segments, is_smooth)
 
     def create_temp_primitive(self, color, pos):
 
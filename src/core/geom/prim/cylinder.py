@@ -6,7 +6,7 @@ import array
 def _define_geom_data(segments, smooth, temp=False):
 
     geom_data = []
-    pos_objs = []
+    pos_indices = {}
     positions_main = []
 
     if not temp:
@@ -35,7 +35,7 @@ def _define_geom_data(segments, smooth, temp=False):
 
             z = j / segs_h
             pos_obj = PosObj((x, y, z))
-            pos_objs.append(pos_obj)
+            pos_indices[pos_obj] = len(pos_indices)
             positions_main.append(pos_obj)
 
             if not temp:
@@ -102,7 +102,7 @@ def _define_geom_data(segments, smooth, temp=False):
                     if j < segs_c:
                         pos = (x, y, z)
                         pos_obj = PosObj(pos)
-                        pos_objs.append(pos_obj)
+                        pos_indices[pos_obj] = len(pos_indices)
                     else:
                         pos_obj = positions[vert_id - segs_c]
 
@@ -117,7 +117,7 @@ def _define_geom_data(segments, smooth, temp=False):
 
             pos = (0., 0., z)
             pos_obj = PosObj(pos)
-            pos_objs.append(pos_obj)
+            pos_indices[pos_obj] = len(pos_indices)
             positions.append(pos_obj)
 
             if not temp:
@@ -173,7 +173,7 @@ def _define_geom_data(segments, smooth, temp=False):
                     smooth_normals.extend(smooth_normal)
                     uv = uvs_main[vi]
                     vert_data[vi] = {"pos": pos, "normal": normal, "uvs": {0: uv},
-                        "pos_ind": pos_objs.index(pos)}
+                        "pos_ind": pos_indices[pos]}
 
             poly_verts = [vert_data[vi] for vi in vert_ids]
             vert_ids = (vi1, vi2, vi3)
@@ -232,7 +232,7 @@ def _define_geom_data(segments, smooth, temp=False):
                             smooth_normals.extend(normal)
                             uv = uvs[vi]
                             vert_data[vi] = {"pos": pos, "normal": normal, "uvs": {0: uv},
-                                "pos_ind": pos_objs.index(pos)}
+                                "pos_ind": pos_indices[pos]}
 
                     poly_verts = [vert_data[vi] for vi in vert_ids]
                     vert_ids = (vi1, vi2, vi3)
@@ -267,7 +267,7 @@ def _define_geom_data(segments, smooth, temp=False):
                         smooth_normals.extend(normal)
                         uv = uvs[vi]
                         tri_data.append({"pos": pos, "normal": normal, "uvs": {0: uv},
-                            "pos_ind": pos_objs.index(pos)})
+                            "pos_ind": pos_indices[pos]})
 
                 tris = (tri_data,)  # triangular face
                 poly_data = {"verts": tri_data, "tris": tris}
@@ -478,7 +478,8 @@ class Cylinder(Primitive):
 
     def recreate(self):
 
-        geom_data, normals = _define_geom_data(self._segments, self._is_smooth)
+        geom_data, normals = GeomDataTemplates.get("cylinder", _define_geom_data,
+            self._segments, self._is_smooth)
         self._normals = normals
         Primitive.recreate(self, geom_data)
 
@@ -719,7 +720,7 @@ class CylinderManager(PrimitiveManager):
         segments = prop_defaults["segments"]
         is_smooth = prop_defaults["smoothness"]
 
-        return _define_geom_data(segments, is_smooth)
+        return GeomDataTemplates.get("cylinder", _define_geom_data, segments, is_smooth)
 
     def create_temp_primitive(self, color, pos):
 
@@ -946,7 +947,8 @@ class CylinderManager(PrimitiveManager):
         next_color = self.get_next_object_color()
         model.set_color(next_color, update_app=False)
         picking_col_id = self.get_next_picking_color_id()
-        geom_data, normals = _define_geom_data(segments, smooth)
+        geom_data, normals = GeomDataTemplates.get("cylinder", _define_geom_data,
+            segments, smooth)
         prim = Cylinder(model, segments, smooth, picking_col_id, geom_data, normals)
         prim.init_size(radius, height)
         self.set_next_object_color()
@@ -167,7 +167,7 @@ class Plane(Primitive):
 
     def recreate(self):
 
-        geom_data = _define_geom_data(self._segments)
+        geom_data = GeomDataTemplates.get("plane", _define_geom_data, self._segments)
         Primitive.recreate(self, geom_data)
 
     def set_segments(self, segments):
@@ -332,7 +332,7 @@ class PlaneManager(PrimitiveManager):
 
         segments = self.get_property_defaults()["segments"]
 
-        return _define_geom_data(segments)
+        return GeomDataTemplates.get("plane", _define_geom_data, segments)
 
     def create_temp_primitive(self, color, pos):
 
@@ -427,7 +427,7 @@ class PlaneManager(PrimitiveManager):
         next_color = self.get_next_object_color()
         model.set_color(next_color, update_app=False)
         picking_col_id = self.get_next_picking_color_id()
-        geom_data = _define_geom_data(segments)
+        geom_data = GeomDataTemplates.get("plane", _define_geom_data, segments)
         prim = Plane(model, segments, picking_col_id, geom_data)
         prim.init_size(x, y)
         self.set_next_object_color()
@@ -6,7 +6,7 @@ import array
 def _define_geom_data(segments, smooth, temp=False):
 
     geom_data = []
-    pos_objs = []
+    pos_indices = {}
     positions_main = []
 
     if not temp:
@@ -36,7 +36,7 @@ def _define_geom_data(segments, smooth, temp=False):
             if j < segments:
                 pos = (x, y, z)
                 pos_obj = PosObj(pos)
-                pos_objs.append(pos_obj)
+                pos_indices[pos_obj] = len(pos_indices)
             else:
                 pos_obj = positions_main[vert_id - segments]
 
@@ -92,7 +92,7 @@ def _define_geom_data(segments, smooth, temp=False):
                     smooth_normals.extend(smooth_normal)
                     uv = uvs_main[vi]
                     vert_data[vi] = {"pos": pos, "normal": normal, "uvs": {0: uv},
-                        "pos_ind": pos_objs.index(pos)}
+                        "pos_ind": pos_indices[pos]}
 
             poly_verts = [vert_data[vi] for vi in vert_ids]
             vert_ids = (vi1, vi2, vi3)
@@ -106,7 +106,7 @@ def _define_geom_data(segments, smooth, temp=False):
     # Define triangular faces at top pole
 
     pole_pos = PosObj((0., 0., 1.))
-    pos_objs.append(pole_pos)
+    pos_indices[pole_pos] = len(pos_indices)
     pole_normal = Vec3(0., 0., 1.)
 
     if not temp:
@@ -131,7 +131,7 @@ def _define_geom_data(segments, smooth, temp=False):
             smooth_normals.extend(pole_normal)
             u = j / segments
             vert_data = {"pos": pole_pos, "normal": normal, "uvs": {0: (u, v)},
-                "pos_ind": pos_objs.index(pole_pos)}
+                "pos_ind": pos_indices[pole_pos]}
 
         tri_data = [vert_data]
         tris = (tri_data,)  # triangular face
@@ -149,7 +149,7 @@ def _define_geom_data(segments, smooth, temp=False):
                 normal = smooth_normal if smooth else poly_normal
                 uv = uvs_top[vi]
                 tri_data.append({"pos": pos, "normal": normal, "uvs": {0: uv},
-                                 "pos_ind": pos_objs.index(pos)})
+                                 "pos_ind": pos_indices[pos]})
 
         poly_data = {"verts": tri_data, "tris": tris}
         geom_data.append(poly_data)
@@ -157,7 +157,7 @@ def _define_geom_data(segments, smooth, temp=False):
     # Define triangular faces at bottom pole
 
     pole_pos = PosObj((0., 0., -1.))
-    pos_objs.append(pole_pos)
+    pos_indices[pole_pos] = len(pos_indices)
     pole_normal = Vec3(0., 0., -1.)
 
     if not temp:
@@ -182,7 +182,7 @@ def _define_geom_data(segments, smooth, temp=False):
             smooth_normals.extend(pole_normal)
             u = 1. - j / segments
             vert_data = {"pos": pole_pos, "normal": normal, "uvs": {0: (u, v)},
-                "pos_ind": pos_objs.index(pole_pos)}
+                "pos_ind": pos_indices[pole_pos]}
 
         tri_data = [vert_data]
         tris = (tri_data,)  # triangular face
@@ -200,7 +200,7 @@ def _define_geom_data(segments, smooth, temp=False):
                 normal = smooth_normal if smooth else poly_normal
                 uv = uvs_bottom[vi]
                 tri_data.append({"pos": pos, "normal": normal, "uvs": {0: uv},
-                                 "pos_ind": pos_objs.index(pos)})
+                                 "pos_ind": pos_indices[pos]})
 
         poly_data = {"verts": tri_data, "tris": tris}
         geom_data.append(poly_data)
@@ -309,7 +309,8 @@ class Sphere(Primitive):
 
     def recreate(self):
 
-        geom_data, normals = _define_geom_data(self._segments, self._is_smooth)
+        geom_data, normals = GeomDataTemplates.get("sphere", _define_geom_data,
+            self._segments, self._is_smooth)
         self._normals = normals
         Primitive.recreate(self, geom_data)
 
@@ -509,7 +510,7 @@ class SphereManager(PrimitiveManager):
         segments = prop_defaults["segments"]
         is_smooth = prop_defaults["smoothness"]
 
-        return _define_geom_data(segments, is_smooth)
+        return GeomDataTemplates.get("sphere", _define_geom_data, segments, is_smooth)
 
     def create_temp_primitive(self, color, pos):
 
@@ -605,7 +606,8 @@ class SphereManager(PrimitiveManager):
         next_color = self.get_next_object_color()
         model.set_color(next_color, update_app=False)
         picking_col_id = self.get_next_picking_color_id()
-        geom_data, normals = _define_geom_data(segments, smooth)
+        geom_data, normals = GeomDataTemplates.get("sphere", _define_geom_data,
+            segments, smooth)
         prim = Sphere(model, segments, smooth, picking_col_id, geom_data, normals)
         prim.init_radius(radius)
         self.set_next_object_color()
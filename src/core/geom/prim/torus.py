@@ -6,7 +6,7 @@ import array
 def _define_geom_data(segments, smooth, temp=False):
 
     geom_data = []
-    pos_objs = []
+    pos_indices = {}
     positions = []
     # keep track of row indices, one SparseArray per section;
     # compute the initial vertex positions the same for all sections, as if
@@ -51,7 +51,7 @@ def _define_geom_data(segments, smooth, temp=False):
 
             if j < segs_s:
                 pos_obj = PosObj(section_pos[j])
-                pos_objs.append(pos_obj)
+                pos_indices[pos_obj] = len(pos_indices)
             else:
                 pos_obj = positions[vert_id - segs_s]
 
@@ -118,7 +118,7 @@ def _define_geom_data(segments, smooth, temp=False):
                 else:
                     uv = uvs[vi]
                     vert_data[vi] = {"pos": pos, "normal": normal, "uvs": {0: uv},
-                        "pos_ind": pos_objs.index(pos)}
+                        "pos_ind": pos_indices[pos]}
 
                 section_arrays_by_vert_id[vi][0].set_bit(row)
                 row += 1
@@ -273,7 +273,8 @@ class Torus(Primitive):
 
     def recreate(self):
 
-        geom_data, normals, arrays = _define_geom_data(self._segments, self._is_smooth)
+        geom_data, normals, arrays = GeomDataTemplates.get("torus", _define_geom_data,
+            self._segments, self._is_smooth)
         self._normals = normals
         self._section_arrays = arrays
         Primitive.recreate(self, geom_data)
@@ -525,7 +526,7 @@ class TorusManager(PrimitiveManager):
         segments = prop_defaults["segments"]
         is_smooth = prop_defaults["smoothness"]
 
-        return _define_geom_data(segments, is_smooth)
+        return GeomDataTemplates.get("torus", _define_geom_data, segments, is_smooth)
 
     def create_temp_primitive(self, color, pos):
 
@@ -148,9 +148,9 @@ class UnlockedGeom:
 
         return self.geom_data_obj.is_tangent_space_initialized
 
-    def bake_texture(self, texture):
+    def bake_texture(self, texture, sampler=None):
 
-        self.geom_data_obj.bake_texture(texture)
+        self.geom_data_obj.bake_texture(texture, sampler)
 
     def get_initial_vertex_colors(self):
 
@@ -3,18 +3,36 @@ from ..base import *
 
 class Vertex:
 
+    # the vertex data is kept in separate slots instead of a dict, as the latter
+    # takes up considerably more memory for meshes with many vertices; for the
+    # same reason, the previous property times and the tangent space are only
+    # allocated once they are set
+    _prop_ids = ("transform", "uvs", "normal", "normal_lock")
     __slots__ = ("type", "full_type", "id", "picking_color_id", "edge_ids", "polygon_id",
-                 "geom_data_obj", "creation_time", "_prev_prop_time", "_pos", "_data")
+                 "geom_data_obj", "creation_time", "_prev_prop_time", "_pos", "_row",
+                 "_row_offset", "_uvs", "_normal", "_normal_is_locked", "_tangent_space",
+                 "_color")
 
     def __getstate__(self):
 
-        data = self._data.copy()
-        data["row_offset"] = 0
+        data = {
+            "row": self._row,
+            "row_offset": 0,
+            "uvs": self._uvs,
+            "normal": self._normal,
+            "normal_is_locked": self._normal_is_locked,
+            "tangent_space": self._tangent_space
+        }
+
+        if self._color is not None:
+            data["color"] = self._color
+
         state = {
             "_id": self.id,
             "_picking_col_id": self.picking_color_id,
             "_creation_time": self.creation_time,
-            "_prev_prop_time": self._prev_prop_time,
+            "_prev_prop_time": (dict.fromkeys(self._prop_ids) if self._prev_prop_time is None
+                                else self._prev_prop_time),
             "_edge_ids": self.edge_ids,
             "_poly_id": self.polygon_id,
             "_pos": self._pos,
@@ -32,11 +50,20 @@ class Vertex:
         self.id = state["_id"]
         self.picking_color_id = state["_picking_col_id"]
         self.creation_time = state["_creation_time"]
-        self._prev_prop_time = state["_prev_prop_time"]
+        prev_prop_time = state["_prev_prop_time"]
+        self._prev_prop_time = (prev_prop_time if any(t is not None for t in
+                                prev_prop_time.values()) else None)
         self.edge_ids = state["_edge_ids"]
         self.polygon_id = state["_poly_id"]
         self._pos = state["_pos"]
-        self._data = state["_data"]
+        data = state["_data"]
+        self._row = data["row"]
+        self._row_offset = data["row_offset"]
+        self._uvs = data["uvs"]
+        self._normal = data["normal"]
+        self._normal_is_locked = data["normal_is_locked"]
+        self._tangent_space = data["tangent_space"]
+        self._color = data.get("color")
 
     def __init__(self, vert_id, picking_col_id, geom_data_obj, pos):
 
@@ -46,37 +73,27 @@ class Vertex:
         self.picking_color_id = picking_col_id
         self.geom_data_obj = geom_data_obj
         self.creation_time = None
-        self._prev_prop_time = {
-            "transform": None,
-            "uvs": None,
-            "normal": None,
-            "normal_lock": None
-        }
+        self._prev_prop_time = None
         self._pos = Point3(*pos)  # in local space
         self.edge_ids = []
         self.polygon_id = None
-        self._data = {
-            "row": 0,
-            "row_offset": 0,
-            "uvs": {},
-            "normal": None,
-            "normal_is_locked": False,
-            "tangent_space": (Vec3(), Vec3())
-        }
+        self._row = 0
+        self._row_offset = 0
+        self._uvs = {}
+        self._normal = None
+        self._normal_is_locked = False
+        self._tangent_space = None
+        self._color = None
 
     @property
     def color(self):
 
-        return self._data.get("color", (1., 1., 1., 1.))
+        return (1., 1., 1., 1.) if self._color is None else self._color
 
     @color.setter
     def color(self, color):
 
-        if color == (1., 1., 1., 1.):
-            if "color" in self._data:
-                del self._data["color"]
-        else:
-            self._data["color"] = color
+        self._color = None if color == (1., 1., 1., 1.) else color
 
     def get_toplevel_object(self, get_group=False):
 
@@ -111,10 +128,16 @@ class Vertex:
 
     def set_previous_property_time(self, prop_id, time_id):
 
+        if self._prev_prop_time is None:
+            self._prev_prop_time = dict.fromkeys(self._prop_ids)
+
         self._prev_prop_time[prop_id] = time_id
 
     def get_previous_property_time(self, prop_id):
 
+        if self._prev_prop_time is None:
+            return
+
         return self._prev_prop_time[prop_id]
 
     def set_pos(self, pos, ref_node=None):
@@ -153,18 +176,16 @@ class Vertex:
     @property
     def row_index(self):
 
-        data = self._data
-
-        return data["row"] + data["row_offset"]
+        return self._row + self._row_offset
 
     @row_index.setter
     def row_index(self, index):
 
-        self._data["row"] = index
+        self._row = index
 
     def offset_row_index(self, offset):
 
-        self._data["row_offset"] += offset
+        self._row_offset += offset
 
     @property
     def row_indices(self):
@@ -175,28 +196,28 @@ class Vertex:
 
         if uv_set_id is None:
             uv_data = {k: v for k, v in uvs.items() if v != (0., 0.)}
-            self._data["uvs"] = uv_data
+            self._uvs = uv_data
         elif uvs != (0., 0.):
-            self._data["uvs"][uv_set_id] = uvs
-        elif uv_set_id in self._data["uvs"]:
-            del self._data["uvs"][uv_set_id]
+            self._uvs[uv_set_id] = uvs
+        elif uv_set_id in self._uvs:
+            del self._uvs[uv_set_id]
 
     def get_uvs(self, uv_set_id=None):
 
         if uv_set_id is None:
-            return self._data["uvs"]
+            return self._uvs
 
-        return self._data["uvs"].get(uv_set_id, (0., 0.))
+        return self._uvs.get(uv_set_id, (0., 0.))
 
     @property
     def normal(self):
 
-        return Vec3(self._data["normal"])
+        return Vec3(self._normal)
 
     @normal.setter
     def normal(self, normal):
 
-        self._data["normal"] = normal
+        self._normal = normal
 
     @property
     def shared_normal(self):
@@ -205,26 +226,29 @@ class Vertex:
 
     def lock_normal(self, locked=True):
 
-        if self._data["normal_is_locked"] == locked:
+        if self._normal_is_locked == locked:
             return False
 
-        self._data["normal_is_locked"] = locked
+        self._normal_is_locked = locked
 
         return True
 
     def has_locked_normal(self):
 
-        return self._data["normal_is_locked"]
+        return self._normal_is_locked
 
     @property
     def tangent_space(self):
 
-        return self._data["tangent_space"]
+        if self._tangent_space is None:
+            return Vec3(), Vec3()
+
+        return self._tangent_space
 
     @tangent_space.setter
     def tangent_space(self, tangent_space):
 
-        self._data["tangent_space"] = tangent_space
+        self._tangent_space = tangent_space
 
     def get_point_at_screen_pos(self, screen_pos):
 
@@ -481,10 +505,18 @@ class VertexManager(ObjectManager, PickingColorIDManager):
         PickableTypes.add("vert")
         Mgr.accept("create_merged_vert", self.__create_merged_vertex)
 
-    def __create_vertex(self, geom_data_obj, pos):
+    def __create_vertex(self, geom_data_obj, pos, picking_col_ids=None):
 
         vert_id = self.get_next_id()
-        picking_col_id = self.get_next_picking_color_id()
+
+        # when creating many subobjects, their picking color IDs are reserved
+        # in bulk beforehand; a reserved ID can be None if they ran out, which
+        # was already reported, so no ID is requested separately in that case
+        if picking_col_ids is None:
+            picking_col_id = self.get_next_picking_color_id()
+        else:
+            picking_col_id = next(picking_col_ids)
+
         vertex = Vertex(vert_id, picking_col_id, geom_data_obj, pos)
 
         return vertex
@@ -921,13 +921,8 @@ class PointHelperManager(ObjectManager, CreationPhaseManager, ObjPropDefaultsMan
 
         if ge.extract_texture_data(tex, GD.window.get_gsg()):
 
-            texels = memoryview(tex.get_ram_image()).cast("I")
-
-            for i, mask in enumerate(texels):
-                for j in range(32):
-                    if mask & (1 << j):
-                        index = 32 * i + j
-                        sel.add(objs[index].get_toplevel_object(get_group=True))
+            indices = region_sel.get_selected_indices(tex.get_ram_image())
+            sel.update(objs[index].get_toplevel_object(get_group=True) for index in indices)
 
         object_root.show(picking_mask)
         state_np.clear_attrib(ShaderAttrib)
@@ -1,8 +1,375 @@
 from .base import *
+from collections import OrderedDict
+from bisect import bisect_right, insort
+import threading
+import queue
 
 COMPRESSION = 9
 
 
+class HistoryJournal:
+    """
+    Writes history data to the history file on a worker thread.
+
+    Data that was added but not yet written to disk is kept in memory, so it can
+    still be read in the meantime.
+
+    """
+
+    def __init__(self, filename, max_queued_events=16):
+
+        self._filename = filename
+        self._queue = queue.Queue(max_queued_events)
+        # pickled data that has not been written to disk yet, by subfile name
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._file_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.__write_entries, name="history_journal",
+                                        daemon=True)
+        self._thread.start()
+
+    def add_entries(self, entries):
+        """
+        Schedule the given (subfile_name, pickled_data) pairs to be written to disk.
+        If too many events are still waiting to be written, this will block until
+        the oldest one has been handled.
+
+        """
+
+        with self._pending_lock:
+            self._pending.update(entries)
+
+        self._queue.put(entries)
+
+    def __write_entries(self):
+
+        while True:
+
+            entries = self._queue.get()
+
+            try:
+
+                with self._file_lock:
+
+                    hist_file = Multifile()
+                    hist_file.open_read_write(self._filename)
+                    streams = []
+
+                    for subfile_name, data in entries:
+                        streams.append(StringStream(data))
+                        hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+
+                    hist_file.flush()
+                    hist_file.close()
+
+                    with self._pending_lock:
+                        for subfile_name, data in entries:
+                            # the entry could have been replaced in the meantime
+                            if self._pending.get(subfile_name) is data:
+                                del self._pending[subfile_name]
+
+            except Exception as e:
+                Notifiers.hist.info(f"(error): Couldn't write history data: {e}")
+
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """
+        Wait until all of the data added so far has been written to disk.
+        This needs to be called before the history file is accessed directly.
+
+        """
+
+        self._queue.join()
+
+    def read(self, subfile_name):
+        """
+        Return the pickled data stored under the given subfile name, or None if
+        it cannot be found.
+
+        """
+
+        with self._pending_lock:
+            data = self._pending.get(subfile_name)
+
+        if data is not None:
+            return data
+
+        with self._file_lock:
+
+            hist_file = Multifile()
+            hist_file.open_read(self._filename)
+            subfile_index = hist_file.find_subfile(subfile_name)
+
+            if subfile_index != -1:
+                data = hist_file.read_subfile(subfile_index)
+
+            hist_file.close()
+
+        return data
+
+
+class HistoryCache:
+    """
+    Least-recently-used cache of history data read from the history file, keyed
+    by (time_id, obj_id, data_id).
+
+    The pickled data is cached instead of the unpickled values, since the latter
+    are often adopted or modified by the objects they are restored to.
+
+    """
+
+    def __init__(self, max_size):
+
+        self._data = OrderedDict()
+        self._size = 0
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+
+        data = self._data.get(key)
+
+        if data is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._data.move_to_end(key)
+
+        return data
+
+    def add(self, key, data):
+
+        size = len(data)
+
+        if size > self.max_size:
+            return
+
+        if key in self._data:
+            self._size -= len(self._data.pop(key))
+
+        self._data[key] = data
+        self._size += size
+
+        while self._size > self.max_size:
+            _, old_data = self._data.popitem(last=False)
+            self._size -= len(old_data)
+            self.evictions += 1
+
+    def invalidate(self, time_ids=None):
+        """
+        Remove the cached data associated with the given time IDs, or all of the
+        cached data if no time IDs are given.
+
+        """
+
+        if time_ids is None:
+            self._data.clear()
+            self._size = 0
+            return
+
+        for key in [k for k in self._data if k[0] in time_ids]:
+            self._size -= len(self._data.pop(key))
+
+    def get_stats(self):
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._data),
+            "size": self._size,
+            "max_size": self.max_size
+        }
+
+
+class HistoryIndex:
+    """
+    Index of the time IDs of the events in which each object property changed,
+    used to quickly find the last change of a property as seen from any event.
+
+    Since the history can branch, the candidate time IDs are checked to belong
+    to an ancestor of the given event; to do this efficiently, the time IDs of
+    the ancestors 1, 2, 4, 8, ... levels up are stored for every event.
+
+    """
+
+    def __init__(self):
+
+        self._changes = {}  # sorted lists of time IDs, by (obj_id, prop_id)
+        self._depths = {}
+        self._ancestors = {}
+
+    def __getstate__(self):
+
+        return {"changes": self._changes, "depths": self._depths, "ancestors": self._ancestors}
+
+    def __setstate__(self, state):
+
+        self._changes = state["changes"]
+        self._depths = state["depths"]
+        self._ancestors = state["ancestors"]
+
+    def add_event(self, event, prev_time_id=None):
+
+        time_id = event.get_time_id()
+
+        if prev_time_id is None:
+            self._depths[time_id] = 0
+            self._ancestors[time_id] = []
+        else:
+            self._depths[time_id] = self._depths[prev_time_id] + 1
+            ancestors = [prev_time_id]
+            self._ancestors[time_id] = ancestors
+            level = 0
+
+            while level < len(self._ancestors[ancestors[level]]):
+                ancestors.append(self._ancestors[ancestors[level]][level])
+                level += 1
+
+        changes = self._changes
+
+        for obj_id, prop_ids in event.get_object_data().items():
+            for prop_id in prop_ids:
+                time_ids = changes.setdefault((obj_id, prop_id), [])
+                if not time_ids or time_ids[-1] < time_id:
+                    time_ids.append(time_id)
+                elif time_id not in time_ids:
+                    insort(time_ids, time_id)
+
+    def rebuild(self, root_event):
+
+        self._changes = {}
+        self._depths = {}
+        self._ancestors = {}
+        self.add_event(root_event)
+        events = [root_event]
+
+        while events:
+
+            next_events = []
+
+            for event in events:
+
+                time_id = event.get_time_id()
+
+                for next_event in event.get_next_events():
+                    self.add_event(next_event, time_id)
+                    next_events.append(next_event)
+
+            events = next_events
+
+    def __is_ancestor(self, time_id, other_time_id):
+        """ Check if the event with time_id is (or is an ancestor of) the other event """
+
+        depth = self._depths.get(time_id)
+        other_depth = self._depths.get(other_time_id)
+
+        if depth is None or other_depth is None or depth > other_depth:
+            return False
+
+        steps = other_depth - depth
+        level = 0
+
+        while steps:
+
+            if steps & 1:
+                other_time_id = self._ancestors[other_time_id][level]
+
+            steps >>= 1
+            level += 1
+
+        return other_time_id == time_id
+
+    def get_last_change(self, time_id, obj_id, prop_id):
+
+        time_ids = self._changes.get((obj_id, prop_id))
+
+        if not time_ids:
+            return
+
+        i = bisect_right(time_ids, time_id)
+
+        while i:
+
+            i -= 1
+            change_time_id = time_ids[i]
+
+            if self.__is_ancestor(change_time_id, time_id):
+                return change_time_id
+
+    @staticmethod
+    def benchmark(event_count=10000, obj_count=100, query_count=10000, branch_chance=.05):
+        """
+        Build a synthetic, branching history of the given number of events, each
+        changing a few properties of random objects, and time finding the last
+        change of random object properties as seen from random events, both by
+        walking back through the events and by using the index.
+        Return the times (in seconds) taken per lookup as a (walk, index) tuple.
+
+        """
+
+        events = {}
+
+        class Event(HistoryEvent):
+
+            # the synthetic events cannot be retrieved through the manager
+            def get_previous_event(self):
+
+                return events.get(self._prev)
+
+        prop_ids = ("transform", "name", "color", "material", "tags", "subobj_selection")
+        root_data = {"objects": {}, "object_ids": TimeIDRef((0, 0))}
+        events[(0, 0)] = root_event = Event((0, 0), root_data)
+        index = HistoryIndex()
+        index.add_event(root_event)
+        time_ids = [(0, 0)]
+
+        for i in range(1, event_count + 1):
+
+            # most events continue the current branch, some start a new one
+            if random.random() < branch_chance:
+                prev_time_id = random.choice(time_ids)
+            else:
+                prev_time_id = time_ids[-1]
+
+            time_id = (i, 0)
+            obj_data = {}
+
+            for _ in range(random.randint(1, 3)):
+                obj_data.setdefault(random.randrange(obj_count), set()).update(
+                    random.sample(prop_ids, random.randint(1, 2)))
+
+            event = Event(time_id, {"objects": obj_data, "object_ids": None})
+            event.set_previous_event(prev_time_id)
+            events[prev_time_id].add_next_event(time_id)
+            events[time_id] = event
+            index.add_event(event, prev_time_id)
+            time_ids.append(time_id)
+
+        queries = [(random.choice(time_ids), random.randrange(obj_count), random.choice(prop_ids))
+                   for _ in range(query_count)]
+
+        start_time = time.perf_counter()
+        walk_results = [events[t].get_last_object_prop_change(o, p) for t, o, p in queries]
+        walk_time = (time.perf_counter() - start_time) / query_count
+        start_time = time.perf_counter()
+        index_results = [index.get_last_change(t, o, p) for t, o, p in queries]
+        index_time = (time.perf_counter() - start_time) / query_count
+
+        if index_results != walk_results:
+            Notifiers.hist.warning('HistoryIndex results differ from those of the event walk!')
+
+        Notifiers.hist.info(f'Looked up {query_count} property changes in {event_count} events; '
+                            f'{walk_time * 1e6:.1f} us (walk) and {index_time * 1e6:.1f} us '
+                            f'(index) per lookup.')
+
+        return walk_time, index_time
+
+
 class TimeIDRef:
 
     def __init__(self, time_id):
@@ -304,6 +671,13 @@ class HistoryManager:
         self._hist_events = {}
         self._prev_time_id = self._next_time_id = self._saved_time_id = (0, 0)
         self._backup_file_index = 1
+        self._journal = journal = HistoryJournal("hist.dat")
+        # make sure that all history data is written to disk before the application exits
+        GD.showbase.finalExitCallbacks.append(journal.flush)
+        # the maximum amount of memory (in bytes) used to cache history data
+        GD.set_default("history_cache_size", 64 * 1024 * 1024)
+        self._cache = HistoryCache(GD["history_cache_size"])
+        self._index = HistoryIndex()
 
         self._clocks = {"automerge": ClockObject(), "autobackup": ClockObject()}
 
@@ -316,6 +690,7 @@ class HistoryManager:
         GD.set_default("autobackup_defaults", autobackup_defaults, copier)
 
         Mgr.expose("history_event", lambda time_id: self._hist_events.get(time_id))
+        Mgr.expose("history_cache_stats", self._cache.get_stats)
         Mgr.accept("require_scene_save", self.__require_scene_save)
         Mgr.accept("reset_history", self.__reset_history)
         Mgr.accept("load_from_history", self.__load_from_history)
@@ -363,7 +738,11 @@ class HistoryManager:
         event_data = {"objects": {}, "object_ids": TimeIDRef((0, 0))}
         root_event = HistoryEvent((0, 0), event_data)
         self._hist_events = {(0, 0): root_event, "root": root_event}
+        self._index = HistoryIndex()
+        self._index.add_event(root_event)
         self._prev_time_id = self._saved_time_id = (0, 0)
+        self._journal.flush()
+        self._cache.invalidate()
 
         hist_file = Multifile()
         hist_file.open_write("hist.dat")
@@ -389,24 +768,30 @@ class HistoryManager:
         if not time_id:
             time_id = self._prev_time_id
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
+        return pickle.loads(self.__read_data(time_id, obj_id, data_id))
 
-        subfile_name = f"{time_id}/{obj_id}/{data_id}"
-        data_pickled = hist_file.read_subfile(hist_file.find_subfile(subfile_name))
+    def __read_data(self, time_id, obj_id, data_id):
 
-        hist_file.close()
+        cache = self._cache
+        key = (time_id, obj_id, data_id)
+        data = cache.get(key)
+
+        if data is None:
+
+            data = self._journal.read(f"{time_id}/{obj_id}/{data_id}")
+
+            if data is not None:
+                cache.max_size = GD["history_cache_size"]
+                cache.add(key, data)
 
-        return pickle.loads(data_pickled)
+        return data
 
     def __get_last_time_id(self, obj_id, prop_id, time_id=None):
 
         if not time_id:
             time_id = self._prev_time_id
 
-        event = self._hist_events[time_id]
-
-        return event.get_last_object_prop_change(obj_id, prop_id)
+        return self._index.get_last_change(time_id, obj_id, prop_id)
 
     def __load_last_value(self, obj_id, prop_id, time_id=None, return_last_time_id=False):
 
@@ -416,18 +801,12 @@ class HistoryManager:
         if time_id not in self._hist_events:
             return
 
-        event = self._hist_events[time_id]
-        last_time_id = event.get_last_object_prop_change(obj_id, prop_id)
+        last_time_id = self._index.get_last_change(time_id, obj_id, prop_id)
 
         if last_time_id is None:
             return
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
-        value = self.__load_property_value(hist_file, last_time_id, obj_id, prop_id)
-
-        hist_file.close()
+        value = self.__load_property_value(last_time_id, obj_id, prop_id)
 
         if return_last_time_id:
             return value, last_time_id
@@ -519,11 +898,11 @@ class HistoryManager:
                 "object_ids": None if obj_ids is None else TimeIDRef(time_id)}
         event = HistoryEvent(time_id, data, self._prev_time_id, self._event_descr_to_store)
         self._hist_events[time_id] = event
+        self._index.add_event(event, self._prev_time_id)
 
-        hist_file = Multifile()
-        hist_file.open_read_write("hist.dat")
-
-        streams = []
+        # the data is pickled right away, while compressing it and writing it to
+        # the history file is left to the journal's worker thread
+        entries = []
 
         for obj_id in obj_data:
 
@@ -534,22 +913,18 @@ class HistoryManager:
 
                 subfile_name = f"{time_id}/{obj_id}/{prop_id}"
                 prop_val = prop_val_data["main"]
-                streams.append(StringStream(pickle.dumps(prop_val, -1)))
-                hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+                entries.append((subfile_name, pickle.dumps(prop_val, -1)))
 
                 if "extra" in prop_val_data:
                     for data_id, data in prop_val_data["extra"].items():
                         subfile_name = f"{time_id}/{obj_id}/{data_id}"
-                        streams.append(StringStream(pickle.dumps(data, -1)))
-                        hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+                        entries.append((subfile_name, pickle.dumps(data, -1)))
 
         if obj_ids is not None:
             subfile_name = f"{time_id}/object_ids"
-            streams.append(StringStream(pickle.dumps(obj_ids, -1)))
-            hist_file.add_subfile(subfile_name, streams[-1], COMPRESSION)
+            entries.append((subfile_name, pickle.dumps(obj_ids, -1)))
 
-        hist_file.flush()
-        hist_file.close()
+        self._journal.add_entries(entries)
 
         self._event_data_to_store = {"objects": {}}
         self._event_descr_to_store = ""
@@ -648,18 +1023,15 @@ class HistoryManager:
         if end_events:
             self.__update_history(None, None, events_to_delete, end_events, None, False, True)
 
-    def __load_property_value(self, hist_file, time_id, obj_id, prop_id):
+    def __load_property_value(self, time_id, obj_id, prop_id):
 
-        subfile_name = f"{time_id}/{obj_id}/{prop_id}"
-        subfile_index = hist_file.find_subfile(subfile_name)
+        prop_val_pickled = self.__read_data(time_id, obj_id, prop_id)
 
-        if subfile_index == -1:
+        if prop_val_pickled is None:
             msg = f"Couldn't load '{prop_id}' property of '{obj_id}' for time ID {time_id}"
             Notifiers.hist.info("(error): " + msg)
             raise RuntimeError(msg)
 
-        prop_val_pickled = hist_file.read_subfile(subfile_index)
-
         return pickle.loads(prop_val_pickled)
 
     def __get_undo_description(self):
@@ -701,15 +1073,13 @@ class HistoryManager:
                 obj = Mgr.get("object", obj_id)
                 obj.destroy(add_to_hist=False)
             else:
-                time_ids[obj_id] = {prop_id: prev_event.get_last_object_prop_change(obj_id,
+                prev_time_id = prev_event.get_time_id()
+                time_ids[obj_id] = {prop_id: self._index.get_last_change(prev_time_id, obj_id,
                                     "creation" if prop_id == "object" else prop_id)
                                     for prop_id in prop_ids}
 
         props_to_restore = {}
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
         for obj_id in time_ids:
 
             obj_time_ids = time_ids[obj_id]
@@ -718,7 +1088,7 @@ class HistoryManager:
             # to undo this, it has to be restored by unpickling it
             if "object" in obj_time_ids:
                 time_id = obj_time_ids["object"]
-                obj = self.__load_property_value(hist_file, time_id, obj_id, "object")
+                obj = self.__load_property_value(time_id, obj_id, "object")
                 # the entire object will be restored
                 obj_time_ids = {"self": None}
             else:
@@ -726,8 +1096,6 @@ class HistoryManager:
 
             props_to_restore[obj] = list(obj_time_ids.keys())
 
-        hist_file.close()
-
         old_time_id = self._prev_time_id
         new_time_id = prev_event.get_time_id()
         Notifiers.hist.debug(f'Undoing event with time ID {old_time_id} and '
@@ -780,23 +1148,18 @@ class HistoryManager:
 
         props_to_restore = {}
 
-        hist_file = Multifile()
-        hist_file.open_read("hist.dat")
-
         for obj_id, prop_ids in obj_data.items():
 
             # if "object" is in prop_ids, it means that the object was created;
             # to redo this, it has to be restored by unpickling it
             if "object" in prop_ids:
-                obj = self.__load_property_value(hist_file, new_time_id, obj_id, "object")
+                obj = self.__load_property_value(new_time_id, obj_id, "object")
                 prop_ids = ["self"]
             else:
                 obj = Mgr.get("object", obj_id)
 
             props_to_restore[obj] = prop_ids
 
-        hist_file.close()
-
         for obj, data_ids in props_to_restore.items():
             obj.restore_data(data_ids, restore_type="redo", old_time_id=old_time_id,
                              new_time_id=new_time_id)
@@ -816,12 +1179,15 @@ class HistoryManager:
 
     def __save_history(self, scene_file, set_saved_state=True):
 
+        self._journal.flush()
         hist_file = Multifile()
         hist_file.open_read_write("hist.dat")
         time_id_stream = StringStream(pickle.dumps(self._prev_time_id, -1))
         hist_file.add_subfile("time_id", time_id_stream, COMPRESSION)
         hist_event_stream = StringStream(pickle.dumps(self._hist_events, -1))
         hist_file.add_subfile("events", hist_event_stream, COMPRESSION)
+        index_stream = StringStream(pickle.dumps(self._index, -1))
+        hist_file.add_subfile("event_index", index_stream, COMPRESSION)
 
         if hist_file.needs_repack():
             hist_file.repack()
@@ -840,6 +1206,8 @@ class HistoryManager:
     def __load_history(self, scene_file):
 
         Mgr.update_remotely("screenshot", "create")
+        self._journal.flush()
+        self._cache.invalidate()
 
         scene_file.extract_subfile(scene_file.find_subfile("hist.dat"), Filename("hist.dat"))
 
@@ -851,6 +1219,14 @@ class HistoryManager:
         events_pickled = hist_file.read_subfile(hist_file.find_subfile("events"))
         self._hist_events = pickle.loads(events_pickled)
         event = self._hist_events[self._prev_time_id]
+        subfile_index = hist_file.find_subfile("event_index")
+
+        if subfile_index == -1:
+            # the history was saved without an index; build it from the events
+            self._index = HistoryIndex()
+            self._index.rebuild(self._hist_events["root"])
+        else:
+            self._index = pickle.loads(hist_file.read_subfile(subfile_index))
 
         obj_ids_time_id = event.get_last_object_ids().get_time_id()
         subfile_name = f"{obj_ids_time_id}/object_ids"
@@ -861,8 +1237,8 @@ class HistoryManager:
 
         for obj_id in obj_ids:
 
-            time_id = event.get_last_object_prop_change(obj_id, "creation")
-            obj = self.__load_property_value(hist_file, time_id, obj_id, "object")
+            time_id = self._index.get_last_change(self._prev_time_id, obj_id, "creation")
+            obj = self.__load_property_value(time_id, obj_id, "object")
             objs_to_restore.append(obj)
 
         hist_file.close()
@@ -1030,6 +1406,7 @@ class HistoryManager:
 
         time_to_restore = to_restore if to_restore else self._prev_time_id
         event_to_restore = self._hist_events[time_to_restore]
+        self._journal.flush()
 
         hist_file = Multifile()
         hist_file.open_read_write("hist.dat")
@@ -1053,8 +1430,8 @@ class HistoryManager:
 
             for obj_id in objects_to_create:
 
-                time_id = event_to_restore.get_last_object_prop_change(obj_id, "creation")
-                obj = self.__load_property_value(hist_file, time_id, obj_id, "object")
+                time_id = self._index.get_last_change(time_to_restore, obj_id, "creation")
+                obj = self.__load_property_value(time_id, obj_id, "object")
                 props_to_restore[obj] = ["self"]
 
             for obj_id in objects_to_update:
@@ -1120,6 +1497,9 @@ class HistoryManager:
         subfile_names.remove("events")
         subfile_names.remove("time_id")
 
+        if "event_index" in subfile_names:
+            subfile_names.remove("event_index")
+
         for event in to_delete:
             events_to_remove.update(get_future_events(event))
 
@@ -1145,6 +1525,9 @@ class HistoryManager:
             add_subfiles_to_remove(event, subfile_names, subfiles_to_remove)
 
         events_to_remove.update(events_to_merge)
+        # any cached data of the removed and merged events is now obsolete
+        self._cache.invalidate({event.get_time_id() for event in events_to_remove}
+                               | {event.get_time_id() for event in to_merge})
 
         for event in events_to_remove:
             del self._hist_events[event.get_time_id()]
@@ -1161,6 +1544,7 @@ class HistoryManager:
 
         if to_delete or to_merge:
             hist_file.repack()
+            self._index.rebuild(self._hist_events["root"])
 
         hist_file.close()
 
@@ -1213,6 +1597,8 @@ class HistoryManager:
 
         merge_time_ids = tuple(merge_time_ids)
         subfiles_to_remove = set()
+        self._journal.flush()
+        self._cache.invalidate()
 
         hist_file = Multifile()
         hist_file.open_read_write("hist.dat")
@@ -1221,6 +1607,9 @@ class HistoryManager:
         subfile_names.remove("events")
         subfile_names.remove("time_id")
 
+        if "event_index" in subfile_names:
+            subfile_names.remove("event_index")
+
         self.__merge_history(event, subfile_names, subfiles_to_remove, hist_file)
 
         root_event = self._hist_events["root"]
@@ -1242,6 +1631,7 @@ class HistoryManager:
 
         root_event.clear_next_events()
         self._hist_events = {time_id: root_event, "root": root_event}
+        self._index.rebuild(root_event)
 
         self._saved_time_id = (-1, 0)
         GD["unsaved_scene"] = True
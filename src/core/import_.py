@@ -1,4 +1,5 @@
 from .base import *
+import array
 
 
 class ImportManager:
@@ -380,22 +381,26 @@ class ImportManager:
     def __define_locked_geom_data(self, geom, quadrangulate=False, gradual=False):
 
         geom_data = []
-        coords = []
+        coords = {}
 
         src_vert_data = geom.get_vertex_data()
-        src_format = src_vert_data.format
         dest_format = Mgr.get("vertex_format_full")
         dest_vert_data = src_vert_data.convert_to(dest_format)
         pos_view = memoryview(dest_vert_data.get_array(0)).cast("B").cast("f")
         col_view = memoryview(dest_vert_data.get_array(1)).cast("B")
         normal_view = memoryview(dest_vert_data.get_array(2)).cast("B").cast("f")
+        positions = pos_view.tolist()
+        row_count = dest_vert_data.get_num_rows()
 
         processed_data = {}
-        tris_by_edge = {}
-        # keep track of which triangles share edges, so they can be combined into quads
-        # afterwards
-        adjacent_tris = {}
         indices = geom.get_primitive(0).get_vertex_list()
+        # the vertex indices of the triangles, three per triangle
+        tri_verts = array.array("I")
+        unique_tris = set()
+
+        def get_tri(tri):
+
+            return tuple(tri_verts[tri*3:tri*3+3])
 
         def get_quad_vert_index_list(quad):
 
@@ -409,16 +414,35 @@ class ImportManager:
 
             return index_list
 
-        def get_quad_score(quad):
+        def normalize(vec):
+
+            length = math.sqrt(sum(c * c for c in vec))
+
+            return [c / length for c in vec] if length else vec
+
+        def cross(vec1, vec2):
+
+            x1, y1, z1 = vec1
+            x2, y2, z2 = vec2
+
+            return [y1 * z2 - z1 * y2, z1 * x2 - x1 * z2, x1 * y2 - y1 * x2]
+
+        def dot(vec1, vec2):
+
+            return sum(c1 * c2 for c1, c2 in zip(vec1, vec2))
+
+        def get_quad_score(index_list):
 
-            vi1, vi2, vi3, vi4 = index_list = get_quad_vert_index_list(quad)
-            points = [Point3(*pos_view[vi*3:vi*3+3]) for vi in index_list]
+            points = [positions[vi*3:vi*3+3] for vi in index_list]
             points.append(points[0])
-            vecs = [points[i + 1] - points[i] for i in range(4)]
-            lengths = [vec.length_squared() for vec in vecs]
+            vecs = [[c2 - c1 for c1, c2 in zip(points[i], points[i + 1])] for i in range(4)]
+            lengths = [dot(vec, vec) for vec in vecs]
 
-            plane = Plane(*points[:3])
-            d = abs(plane.dist_to_plane(points[3]))
+            # the plane through the first three points
+            vec = [c2 - c1 for c1, c2 in zip(points[0], points[2])]
+            plane_normal = normalize(cross(vecs[0], vec))
+            vec = [c2 - c1 for c1, c2 in zip(points[0], points[3])]
+            d = abs(dot(plane_normal, vec))
 
             if d < .00001:
                 score = 10.
@@ -430,49 +454,29 @@ class ImportManager:
                 q = max(.00001, lengths[i]) / max(.00001, lengths[j])
                 score += min(q, 1./q)
 
-            for vec in vecs:
-                vec.normalize()
-
+            vecs = [normalize(vec) for vec in vecs]
             vecs.append(vecs[0])
 
             for i in range(4):
-                score += 1. - abs(vecs[i].dot(vecs[i + 1]))
-                score += vecs[i].cross(vecs[i + 1]).dot(plane.get_normal())
+                score += 1. - abs(dot(vecs[i], vecs[i + 1]))
+                score += dot(cross(vecs[i], vecs[i + 1]), plane_normal)
 
             return score
 
         if gradual:
             tri_count = 0
 
-        for tri_vert_ids in (indices[i:i+3] for i in range(0, len(indices), 3)):
+        for i in range(0, len(indices), 3):
 
-            vi1, vi2, vi3 = tri = tuple(tri_vert_ids)
+            vi1, vi2, vi3 = tri = tuple(indices[i:i+3])
+            # triangles that are merely a rotated copy of an earlier one are left out
+            key = min(tri, (vi2, vi3, vi1), (vi3, vi1, vi2))
 
-            if {tri, (vi2, vi3, vi1), (vi3, vi1, vi2)}.intersection(adjacent_tris):
+            if key in unique_tris:
                 continue
 
-            adjacent_tris[tri] = tris = []
-
-            if quadrangulate:
-
-                edge_vert_ids = ((vi1, vi2), (vi2, vi3), (vi3, vi1))
-
-                for vert_ids in edge_vert_ids:
-
-                    if vert_ids[::-1] in tris_by_edge:
-
-                        for other_tri in tris_by_edge[vert_ids[::-1]]:
-
-                            if tris.count(other_tri) == 2:
-                                tris.remove(other_tri)
-                                tris.remove(other_tri)
-                                adjacent_tris[other_tri].remove(tri)
-                                adjacent_tris[other_tri].remove(tri)
-                            else:
-                                tris.append(other_tri)
-                                adjacent_tris.setdefault(other_tri, []).append(tri)
-
-                    tris_by_edge.setdefault(vert_ids, []).append(tri)
+            unique_tris.add(key)
+            tri_verts.extend(tri)
 
             if gradual:
 
@@ -482,65 +486,42 @@ class ImportManager:
                     yield
                     tri_count = 0
 
-        if quadrangulate:
-
-            quads = {}
-            quad_scores = {}
+        tri_count = len(tri_verts) // 3
+        used_tris = bytearray(tri_count)
+        quads = []
 
-            for tri, other_tris in adjacent_tris.items():
-
-                quad_list = []
+        if quadrangulate:
 
-                for other_tri in other_tris:
-                    quad = (tri, other_tri)
-                    quad_list.append(quad)
+            # each directed edge, encoded as a single integer, is mapped to the
+            # triangles it belongs to; every triangle sharing an edge with an earlier
+            # triangle (in the opposite direction) forms a candidate quad with it
+            tris_by_edge = {}
+            quad_tris = {}
 
-                quads[tri] = quad_list
+            for tri in range(tri_count):
 
-            if gradual:
-                quad_count = 0
+                vi1, vi2, vi3 = tri_verts[tri*3:tri*3+3]
+                tri_vert_ids = {vi1, vi2, vi3}
 
-            for tri, quad_list in quads.items():
+                for vi_a, vi_b in ((vi1, vi2), (vi2, vi3), (vi3, vi1)):
 
-                for quad in quad_list:
-                    if quad in quad_scores or quad[::-1] in quad_scores:
-                        continue
-                    quad_scores[quad] = get_quad_score(quad)
+                    for other_tri in tris_by_edge.get(vi_b * row_count + vi_a, ()):
+                        # a flipped copy of this triangle is not a neighbor
+                        if set(get_tri(other_tri)) != tri_vert_ids:
+                            quad_tris[(other_tri, tri)] = None
 
-                if gradual:
+                    tris_by_edge.setdefault(vi_a * row_count + vi_b, []).append(tri)
 
-                    quad_count += 1
-
-                    if quad_count == 20:
-                        yield
-                        quad_count = 0
-
-            sorted_quads = sorted([(v, k) for k, v in quad_scores.items()])
-            sorted_quads = [k for _, k in sorted_quads]
-            quads = []
+            quad_tris = list(quad_tris)
+            quad_scores = []
 
             if gradual:
                 quad_count = 0
 
-            while sorted_quads:
-
-                quad = sorted_quads.pop()
-                quads.append(quad)
-
-                for tri in quad:
-
-                    for other_tri in adjacent_tris.get(tri, []):
-
-                        adjacent_tris[other_tri].remove(tri)
-                        other_quad = (tri, other_tri)
+            for tri1, tri2 in quad_tris:
 
-                        if other_quad in sorted_quads:
-                            sorted_quads.remove(other_quad)
-                        elif other_quad[::-1] in sorted_quads:
-                            sorted_quads.remove(other_quad[::-1])
-
-                    if tri in adjacent_tris:
-                        del adjacent_tris[tri]
+                quad = (get_tri(tri1), get_tri(tri2))
+                quad_scores.append((get_quad_score(get_quad_vert_index_list(quad)), quad))
 
                 if gradual:
 
@@ -550,14 +531,23 @@ class ImportManager:
                         yield
                         quad_count = 0
 
-        else:
+            # greedily combine the triangles with the best scoring neighbors
+            order = sorted(range(len(quad_tris)), key=quad_scores.__getitem__, reverse=True)
+
+            for i in order:
+
+                tri1, tri2 = quad_tris[i]
 
-            quads = []
+                if not (used_tris[tri1] or used_tris[tri2]):
+                    used_tris[tri1] = used_tris[tri2] = 1
+                    quads.append(quad_scores[i][1])
 
         if gradual:
             poly_count = 0
 
-        for poly in quads + [(tri,) for tri in adjacent_tris]:
+        single_tris = [(get_tri(tri),) for tri in range(tri_count) if not used_tris[tri]]
+
+        for poly in quads + single_tris:
 
             if len(poly) == 2:
                 index_list = get_quad_vert_index_list(poly)
@@ -567,14 +557,12 @@ class ImportManager:
             for row in index_list:
 
                 vert_data = {}
-                pos = Point3(*pos_view[row*3:row*3+3])
+                pos = tuple(positions[row*3:row*3+3])
 
-                for crd in coords:
-                    if pos == crd:
-                        pos = crd
-                        break
+                if pos in coords:
+                    pos = coords[pos]
                 else:
-                    coords.append(pos)
+                    pos = coords[pos] = Point3(*pos)
 
                 vert_data["pos"] = pos
                 vert_data["color"] = tuple(c / 255. for c in col_view[row*4:row*4+4])
@@ -600,7 +600,10 @@ class Material:
         if tex_map.has_texture(rgb_filename, alpha_filename):
             return
 
-        texture = tex_map.set_texture(rgb_filename, alpha_filename)
+        # the image of a vertex color map is needed right away, to be baked
+        # into the vertex colors
+        asynchronous = map_type != "vertex color"
+        texture = tex_map.set_texture(rgb_filename, alpha_filename, asynchronous=asynchronous)
 
         if not tex_map.active:
             return
@@ -618,8 +621,9 @@ class Material:
             if map_type == "vertex color":
 
                 if texture:
+                    sampler = tex_map.get_sampler()
                     for owner in owners:
-                        owner.geom_obj.bake_texture(texture)
+                        owner.geom_obj.bake_texture(texture, sampler)
                 else:
                     for owner in owners:
                         owner.geom_obj.reset_vertex_colors()
@@ -757,8 +761,9 @@ class Material:
             if map_type == "vertex color":
 
                 if active:
+                    sampler = tex_map.get_sampler()
                     for owner in owners:
-                        owner.geom_obj.bake_texture(texture)
+                        owner.geom_obj.bake_texture(texture, sampler)
                 else:
                     for owner in owners:
                         owner.geom_obj.reset_vertex_colors()
@@ -868,7 +873,7 @@ class Material:
             if map_type == "vertex color":
 
                 if texture:
-                    owner.geom_obj.bake_texture(texture)
+                    owner.geom_obj.bake_texture(texture, tex_map.get_sampler())
                 else:
                     owner.geom_obj.reset_vertex_colors()
 
@@ -1259,17 +1259,24 @@ class SelectionManager:
 
         Mgr.get("picking_cam").active = False
 
+        obj_lvl = GD["active_obj_level"]
         lens = get_off_axis_lens((w_f, h_f))
         picking_mask = Mgr.get("picking_mask")
         cam_np = self._region_sel_cam
         cam = cam_np.node()
         cam.set_lens(lens)
         cam.camera_mask = picking_mask
-        bfr = GD.window.make_texture_buffer("tex_buffer", w_b, h_b)
-        cam.active = True
-        GD.showbase.make_camera(bfr, useCamera=cam_np)
         ge = GD.graphics_engine
 
+        if not self._region_sel_uvs and region_sel.use_cpu_region_select():
+            region = region_sel.SelectionRegion(bfr_size, ellipse_data, self._sel_mask_tex)
+            bfr = None
+        else:
+            region = None
+            bfr = GD.window.make_texture_buffer("tex_buffer", w_b, h_b)
+            cam.active = True
+            GD.showbase.make_camera(bfr, useCamera=cam_np)
+
         ctrl_down = GD.mouse_watcher.is_button_down("control")
         shift_down = GD.mouse_watcher.is_button_down("shift")
 
@@ -1280,8 +1287,6 @@ class SelectionManager:
         else:
             op = self._selection_op
 
-        obj_lvl = GD["active_obj_level"]
-
         if self._region_sel_uvs:
 
             Mgr.do("region_select_uvs", cam_np, lens_exp, bfr,
@@ -1348,13 +1353,9 @@ class SelectionManager:
 
                 if ge.extract_texture_data(tex, GD.window.get_gsg()):
 
-                    texels = memoryview(tex.get_ram_image()).cast("I")
-
-                    for i, mask in enumerate(texels):
-                        for j in range(32):
-                            if mask & (1 << j):
-                                index = 32 * i + j
-                                sel.add(objs[index].get_toplevel_object(get_group=True))
+                    indices = region_sel.get_selected_indices(tex.get_ram_image())
+                    sel.update(objs[index].get_toplevel_object(get_group=True)
+                               for index in indices)
 
                 state_np.clear_attrib(ShaderAttrib)
                 Mgr.update_locally("region_picking", False)
@@ -1363,10 +1364,14 @@ class SelectionManager:
                        ellipse_data, self._sel_mask_tex, sel)
 
             new_sel = set()
-            region_select_objects(new_sel)
-            ge.remove_window(bfr)
 
-            if enclose:
+            if region:
+                new_sel = self.__get_region_selection_cpu(objs, cam_np, region, enclose)
+            else:
+                region_select_objects(new_sel)
+                ge.remove_window(bfr)
+
+            if enclose and not region:
                 bfr_exp = GD.window.make_texture_buffer("tex_buffer_exp", w_b + 4, h_b + 4)
                 GD.showbase.make_camera(bfr_exp, useCamera=cam_np)
                 cam.set_lens(lens_exp)
@@ -1392,7 +1397,7 @@ class SelectionManager:
         else:
 
             Mgr.do("region_select_subobjs", cam_np, lens_exp, bfr,
-                   ellipse_data, self._sel_mask_tex, op)
+                   ellipse_data, self._sel_mask_tex, op, region)
 
         if region_type in ("fence", "lasso", "paint"):
             self._sel_mask_tex = None
@@ -1401,6 +1406,43 @@ class SelectionManager:
         Mgr.get("picking_cam").active = True
         Mgr.update_remotely("selection_set", "hide_name")
 
+    def __get_region_selection_cpu(self, objs, cam, region, enclose):
+        """
+        Return the top-level objects whose geometry lies in the given region,
+        by projecting that geometry on the CPU instead of rendering it.
+        Point helpers are tested by the position of their origin only.
+
+        """
+
+        picking_mask = Mgr.get("picking_mask")
+        sel = set()
+
+        for obj in objs:
+
+            if obj.type == "point_helper":
+
+                mat = region_sel.get_projection_mat(obj.origin, cam)
+                x, y = region_sel.project_points((0., 0., 0.), mat, region.size)
+
+                if region.contains_point(x, y):
+                    sel.add(obj.get_toplevel_object(get_group=True))
+
+                continue
+
+            node_paths = [node_path for node_path in obj.origin.find_all_matches("**/+GeomNode")
+                          if not node_path.is_hidden(picking_mask)]
+
+            if not node_paths:
+                continue
+
+            results = (region.overlaps_geom(geom, region_sel.get_projection_mat(node_path, cam),
+                       enclose) for node_path in node_paths for geom in node_path.node().get_geoms())
+
+            if all(results) if enclose else any(results):
+                sel.add(obj.get_toplevel_object(get_group=True))
+
+        return sel
+
     def __get_selection(self, obj_lvl=""):
 
         lvl = obj_lvl if obj_lvl else GD["active_obj_level"]
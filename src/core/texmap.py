@@ -1,4 +1,169 @@
 from .base import *
+import threading
+import queue
+
+
+def _copy_texture_image(src, dest):
+    """ Replace the image of the dest texture with that of the src texture. """
+
+    dest.setup_texture(src.texture_type, src.x_size, src.y_size, src.z_size,
+                       src.component_type, src.format)
+    dest.set_ram_image(src.get_ram_image(), src.ram_image_compression, src.ram_page_size)
+
+    for i in range(1, src.get_num_ram_mipmap_images()):
+        dest.set_ram_mipmap_image(i, src.get_ram_mipmap_image(i), src.get_ram_mipmap_page_size(i))
+
+    dest.filename = src.filename
+    dest.fullpath = src.fullpath
+    dest.alpha_filename = src.alpha_filename
+    dest.alpha_fullpath = src.alpha_fullpath
+
+
+class TextureCache:
+    """
+    Least-recently-used cache of decoded textures, shared by all texture maps.
+
+    The textures are keyed by the full paths of their RGB and alpha image files,
+    together with the modification times of those files, so an image that was
+    edited on disk gets decoded anew.
+    The cached textures themselves are never handed out; texture maps get a copy
+    instead, which shares the image data with the original until modified.
+
+    """
+
+    max_size = 256 * 1024 * 1024
+    _textures = {}
+    _size = 0
+
+    @staticmethod
+    def get_key(rgb_fname, a_fname=None):
+
+        key = []
+
+        for fname in (rgb_fname, a_fname):
+
+            if fname:
+                path = Filename(fname)
+                path.make_absolute()
+                key.extend((path.get_fullpath(), path.get_timestamp()))
+            else:
+                key.extend(("", 0))
+
+        return tuple(key)
+
+    @classmethod
+    def get(cls, key):
+
+        texture = cls._textures.pop(key, None)
+
+        if texture:
+            # re-insert the texture, making it the most recently used one
+            cls._textures[key] = texture
+
+        return texture
+
+    @classmethod
+    def add(cls, key, texture):
+
+        textures = cls._textures
+
+        if key in textures:
+            cls._size -= textures.pop(key).get_ram_image_size()
+
+        textures[key] = texture
+        cls._size += texture.get_ram_image_size()
+
+        while cls._size > cls.max_size and len(textures) > 1:
+            cls._size -= textures.pop(next(iter(textures))).get_ram_image_size()
+
+    @classmethod
+    def clear(cls):
+
+        cls._textures.clear()
+        cls._size = 0
+
+
+class TextureDecoder:
+    """
+    Decodes texture images on a worker thread.
+
+    Until an image has been decoded, the texture maps that need it use a
+    placeholder texture, whose image is replaced with the decoded one as soon
+    as the latter becomes available.
+
+    """
+
+    _requests = queue.Queue()
+    _results = queue.Queue()
+    # placeholder textures waiting for a decoded image, by texture cache key
+    _placeholders = {}
+    _thread = None
+
+    @classmethod
+    def request(cls, key, rgb_fname, a_fname, placeholder):
+
+        placeholders = cls._placeholders
+
+        if key in placeholders:
+            placeholders[key].append(placeholder)
+            return
+
+        if cls._thread is None:
+            cls._thread = threading.Thread(target=cls.__decode_textures,
+                                           name="texture_decoder", daemon=True)
+            cls._thread.start()
+
+        if not placeholders:
+            Mgr.add_task(cls.__handle_decoded_textures, "handle_decoded_textures", sort=48)
+
+        placeholders[key] = [placeholder]
+        cls._requests.put((key, rgb_fname, a_fname))
+
+    @classmethod
+    def is_pending(cls, texture):
+
+        return any(t is texture for p in cls._placeholders.values() for t in p)
+
+    @classmethod
+    def __decode_textures(cls):
+
+        while True:
+
+            key, rgb_fname, a_fname = cls._requests.get()
+            texture = Texture()
+
+            try:
+                if a_fname:
+                    success = texture.read(rgb_fname, a_fname, 0, 0)
+                else:
+                    success = texture.read(rgb_fname)
+            except Exception:
+                success = False
+
+            cls._results.put((key, texture if success else None))
+
+    @classmethod
+    def __handle_decoded_textures(cls, task):
+
+        while True:
+
+            try:
+                key, texture = cls._results.get_nowait()
+            except queue.Empty:
+                break
+
+            placeholders = cls._placeholders.pop(key)
+
+            if texture is None:
+                Notifiers.mgr.warning(f'Could not decode texture image "{key[0]}".')
+                continue
+
+            TextureCache.add(key, texture)
+
+            for placeholder in placeholders:
+                _copy_texture_image(texture, placeholder)
+
+        return task.cont if cls._placeholders else task.done
 
 
 class TextureMap:
@@ -25,6 +190,7 @@ class TextureMap:
 
         state = self.__dict__.copy()
         state["_texture"] = None
+        state["_sampler"] = None
 
         return state
 
@@ -35,7 +201,10 @@ class TextureMap:
         if self.type != "layer":
             self.tex_stage = Mgr.get("tex_stage", self.type)
 
-        self.set_texture(self._rgb_filename, self._alpha_filename)
+        # the image of a vertex color map is needed right away, to be baked
+        # into the vertex colors
+        asynchronous = self.type != "vertex color"
+        self.set_texture(self._rgb_filename, self._alpha_filename, asynchronous=asynchronous)
 
     def __init__(self, map_type, layer_name=None):
 
@@ -49,6 +218,8 @@ class TextureMap:
         self._uv_set_id = 0
         self.active = False
         self._texture = None
+        # sampler of the texture for baking it into vertex colors, created on demand
+        self._sampler = None
         self._rgb_filename = ""
         self._alpha_filename = ""
         self._border_color = (0., 0., 0., 1.)
@@ -69,8 +240,7 @@ class TextureMap:
         tex_map.magfilter = self._filter_ids["mag"]
         tex_map.anisotropic_degree = self._anisotropic_degree
         tex_map.copy_transform(self._transform)
-        texture = self._texture.make_copy() if self._texture else None
-        tex_map.set_texture(self._rgb_filename, self._alpha_filename, texture)
+        self.copy_texture(tex_map)
         tex_map.active = self.active
 
         return tex_map
@@ -145,6 +315,7 @@ class TextureMap:
     def border_color(self, color_values):
 
         self._border_color = color_values
+        self._sampler = None
         texture = self._texture
 
         if texture:
@@ -177,6 +348,7 @@ class TextureMap:
         if self._wrap_modes_locked:
             self._wrap_mode_ids["v" if axis == "u" else "u"] = wrap_mode_id
 
+        self._sampler = None
         texture = self._texture
 
         if texture:
@@ -215,6 +387,7 @@ class TextureMap:
     def __set_filter_type(self, minmag, filter_id):
 
         self._filter_ids[minmag] = filter_id
+        self._sampler = None
         texture = self._texture
 
         if texture:
@@ -269,7 +442,50 @@ class TextureMap:
 
         self.set_uv_set_id(uv_set_id)
 
-    def set_texture(self, rgb_filename="", alpha_filename="", texture=None):
+    def __load_texture(self, rgb_fname, a_fname=None, asynchronous=False):
+
+        key = TextureCache.get_key(rgb_fname, a_fname)
+        cached_texture = TextureCache.get(key)
+
+        if cached_texture:
+
+            texture = cached_texture.make_copy()
+
+        elif asynchronous:
+
+            texture = Texture()
+            texture.setup_2d_texture(1, 1, Texture.T_unsigned_byte, Texture.F_rgb)
+            # use a neutral placeholder color (in BGR order)
+            texture.set_ram_image(b"\xff\x80\x80" if "normal" in self.type else b"\xff\xff\xff")
+            TextureDecoder.request(key, rgb_fname, a_fname, texture)
+
+        else:
+
+            texture = Texture()
+
+            if a_fname:
+                success = texture.read(rgb_fname, a_fname, 0, 0)
+            else:
+                success = texture.read(rgb_fname)
+
+            if success:
+                TextureCache.add(key, texture)
+                texture = texture.make_copy()
+
+        texture.name = self.type
+
+        return texture
+
+    def set_texture(self, rgb_filename="", alpha_filename="", texture=None,
+                    asynchronous=False):
+        """
+        Set the texture of this map, loaded from the given image files if no
+        texture is given.
+        Images that were loaded before are taken from a cache; otherwise, if
+        asynchronous is True, they are decoded on a worker thread, while a
+        placeholder texture is used in the meantime.
+
+        """
 
         if texture is None:
 
@@ -288,12 +504,14 @@ class TextureMap:
 
                 if rgb_fname:
 
-                    texture = Mgr.load_tex(rgb_fname)
                     alpha_fullpath = ""
+                    extension = rgb_fname.get_extension().lower()
+
+                    if TexturePool.make_texture(extension).is_of_type(MovieTexture):
 
-                    if not texture.is_of_type(MovieTexture):
+                        texture = Mgr.load_tex(rgb_fname)
 
-                        texture = Texture(self.type)
+                    else:
 
                         if alpha_filename:
 
@@ -308,14 +526,14 @@ class TextureMap:
                                 alpha_fullpath = a_fname.to_os_specific()
 
                             if a_fname:
-                                texture.read(rgb_fname, a_fname, 0, 0)
+                                texture = self.__load_texture(rgb_fname, a_fname, asynchronous)
                             else:
                                 texture = None
 
                         else:
 
                             alpha_fullpath = ""
-                            texture.read(rgb_fname)
+                            texture = self.__load_texture(rgb_fname, asynchronous=asynchronous)
 
                 else:
 
@@ -344,6 +562,7 @@ class TextureMap:
             self._alpha_filename = ""
 
         self._texture = texture
+        self._sampler = None
 
         return texture
 
@@ -351,6 +570,38 @@ class TextureMap:
 
         return self._texture
 
+    def get_sampler(self):
+        """
+        Return a TextureSampler for the texture of this map, to bake it into
+        vertex colors, or None if there is no texture.
+        The sampler is kept until the texture or its sampling properties change.
+
+        """
+
+        texture = self._texture
+
+        if not texture:
+            return
+
+        if TextureDecoder.is_pending(texture):
+            # the placeholder image will be replaced, so don't keep a sampler of it
+            return tex_bake.TextureSampler(texture)
+
+        if self._sampler is None:
+            self._sampler = tex_bake.TextureSampler(texture)
+
+        return self._sampler
+
+    def copy_texture(self, tex_map):
+        """ Make the given texture map use a copy of the texture of this one. """
+
+        if TextureDecoder.is_pending(self._texture):
+            # the image is still being decoded, so let the other map wait for it
+            tex_map.set_texture(self._rgb_filename, self._alpha_filename, asynchronous=True)
+        else:
+            texture = self._texture.make_copy() if self._texture else None
+            tex_map.set_texture(self._rgb_filename, self._alpha_filename, texture)
+
     def get_tex_filenames(self):
 
         return self._rgb_filename, self._alpha_filename
@@ -369,6 +620,7 @@ class TextureMap:
             return
 
         ids["v"] = wrap_mode_id
+        self._sampler = None
         texture = self._texture
 
         if texture:
@@ -501,10 +753,7 @@ class Layer(TextureMap):
         layer.anisotropic_degree = self.anisotropic_degree
         layer.uv_set_id = self.uv_set_id
         layer.copy_transform(self.get_transform())
-        rgb_filename, alpha_filename = self.get_tex_filenames()
-        tex = self.get_texture()
-        tex_copy = tex.make_copy() if tex else None
-        layer.set_texture(rgb_filename, alpha_filename, tex_copy)
+        self.copy_texture(layer)
         layer.color = self.color
         layer.rgb_scale = self.rgb_scale
         layer.alpha_scale = self.alpha_scale
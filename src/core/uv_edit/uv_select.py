@@ -1088,23 +1088,16 @@ class UVSelectionMixin:
 
             if ge.extract_texture_data(tex, GD.window.get_gsg()):
 
-                texels = memoryview(tex.get_ram_image()).cast("I")
+                indices = region_sel.get_selected_indices(tex.get_ram_image())
                 sel_edges_by_seam = obj_lvl == "edge" and uv_edit_options["sel_edges_by_seam"]
 
                 if obj_lvl == "part":
-                    for i, mask in enumerate(texels):
-                        for j in range(32):
-                            if mask & (1 << j):
-                                index = 32 * i + j
-                                sel.add(subobjs[index])
+                    sel.update(subobjs[index] for index in indices)
                 else:
-                    for i, mask in enumerate(texels):
-                        for j in range(32):
-                            if mask & (1 << j):
-                                index = 32 * i + j
-                                subobj = subobjs[index].merged_subobj
-                                if not sel_edges_by_seam or len(subobj) == 1:
-                                    sel.update(subobj.special_selection)
+                    # several indices can map to the same merged subobject
+                    for subobj in set(subobjs[index].merged_subobj for index in indices):
+                        if not sel_edges_by_seam or len(subobj) == 1:
+                            sel.update(subobj.special_selection)
 
             state_np.clear_attrib(ShaderAttrib)
 
@@ -786,14 +786,8 @@ class SelectionManager:
 
             if ge.extract_texture_data(tex, GD.window.get_gsg()):
 
-                texels = memoryview(tex.get_ram_image()).cast("I")
-
-                for i, mask in enumerate(texels):
-                    for j in range(32):
-                        if mask & (1 << j):
-                            index = 32 * i + j
-                            subobj = subobjs[index]
-                            sel.add(subobj)
+                indices = region_sel.get_selected_indices(tex.get_ram_image())
+                sel.update(subobjs[index] for index in indices)
 
             state_np.clear_attrib(ShaderAttrib)
 
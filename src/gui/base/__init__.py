@@ -1,4 +1,4 @@
 from .base import *
 from .mgr import GUIManager as Mgr
-from .widget import Widget, WidgetCard
+from .widget import Widget, WidgetCard, DirtyRegionCompositor
 from .sizer import Sizer
@@ -13,8 +13,76 @@ if USING_TK:
 PLATFORM_ID = platform.system()
 
 
+class TextImageCache:
+    """
+    Least-recently-used cache of text images, limited by the (estimated) amount
+    of memory taken up by those images.
+
+    """
+
+    def __init__(self, max_size):
+
+        self._images = collections.OrderedDict()
+        self._size = 0
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def __get_image_size(image):
+
+        # a PNMImage stores 16-bit RGB values and a separate 16-bit alpha value
+        return image.get_x_size() * image.get_y_size() * 8
+
+    @property
+    def size(self):
+
+        return self._size
+
+    def get(self, key):
+
+        image = self._images.get(key)
+
+        if image is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._images.move_to_end(key)
+
+        # the image may get modified by the caller, so a copy is returned
+        return PNMImage(image)
+
+    def add(self, key, image):
+
+        images = self._images
+
+        if key in images:
+            self._size -= self.__get_image_size(images.pop(key))
+
+        image_size = self.__get_image_size(image)
+
+        if image_size > self.max_size:
+            return
+
+        images[key] = PNMImage(image)
+        self._size += image_size
+
+        while self._size > self.max_size:
+            _, old_image = images.popitem(last=False)
+            self._size -= self.__get_image_size(old_image)
+
+    def clear(self):
+
+        self._images.clear()
+        self._size = 0
+
+
 class Font:
 
+    # the rendered text images of all fonts are shared in a cache of 16 MB
+    image_cache = TextImageCache(16 * 1024 * 1024)
+
     def __init__(self, path, pixel_size, height, y, line_spacing):
 
         self._text_maker = text_maker = PNMTextMaker(Filename.from_os_specific(path), 0)
@@ -23,6 +91,8 @@ class Font:
         self._height = height
         self._y = y
         self._line_spacing = max(height, line_spacing)
+        # the glyphs and their advances, retrieved once per character
+        self._glyphs = {}
 
     def get_height(self):
 
@@ -32,14 +102,28 @@ class Font:
 
         return self._line_spacing
 
+    def __get_glyph(self, char):
+
+        glyph = self._glyphs.get(char)
+
+        if glyph is None:
+            glyph = self._text_maker.get_glyph(ord(char))
+            self._glyphs[char] = glyph = (glyph, glyph.get_advance())
+
+        return glyph
+
     def calc_width(self, text):
 
-        return self._text_maker.calc_width(text)
+        get_glyph = self.__get_glyph
+
+        return sum(get_glyph(char)[1] for char in text)
 
     def __create_line_image(self, text, text_color=(0., 0., 0., 1.), back_color=None):
 
-        text_maker = self._text_maker
-        w = text_maker.calc_width(text)
+        # the line is composed from the cached glyphs, just like the text maker
+        # would do when generating the text into an image
+        glyphs = [self.__get_glyph(char) for char in text]
+        w = sum(advance for glyph, advance in glyphs)
         h = self._height
         image = PNMImage(w, h, 4)
 
@@ -48,14 +132,31 @@ class Font:
             image.fill(r, g, b)
             image.alpha_fill(a)
 
-        text_maker.set_fg(text_color)
-        text_maker.generate_into(text, image, 0, self._y)
+        text_color = LColor(*text_color)
+        x = 0
+        y = self._y
+
+        for glyph, advance in glyphs:
+            glyph.place(image, x, y, text_color)
+            x += advance
+
         image.unpremultiply_alpha()
 
         return image
 
     def create_image(self, text, text_color=(0., 0., 0., 1.), back_color=None):
 
+        key = (self, text, tuple(text_color), None if back_color is None else tuple(back_color))
+        image = self.image_cache.get(key)
+
+        if image is None:
+            image = self.__create_image(text, text_color, back_color)
+            self.image_cache.add(key, image)
+
+        return image
+
+    def __create_image(self, text, text_color, back_color):
+
         lines = text.split("\n")
         line_count = len(lines)
 
@@ -564,6 +564,140 @@ class Widget:
     def on_right_up(self): pass
 
 
+class DirtyRegionCompositor:
+    """
+    Keeps track of the regions of container images that changed since the last
+    frame, and copies only those regions into the RAM images of the textures of
+    these containers, right before the frame is rendered.
+
+    """
+
+    # maps each texture to its source image, the offset of the texture within
+    # that image and the list of changed rectangles (x, y, width, height) of
+    # the image, in top-down pixel coordinates
+    _dirty_regions = {}
+    # when the changed area exceeds this fraction of the texture area, the whole
+    # image is loaded into the texture instead
+    max_dirty_fraction = .5
+
+    @classmethod
+    def add_region(cls, texture, image, x, y, width, height, image_offset=(0, 0)):
+
+        dirty_regions = cls._dirty_regions
+
+        if not dirty_regions:
+            # make sure the textures are updated before rendering this frame
+            Mgr.add_task(cls.__update_textures, "update_dirty_gui_regions", sort=49)
+
+        if texture in dirty_regions:
+            rects = dirty_regions[texture][2]
+        else:
+            rects = []
+
+        dirty_regions[texture] = (image, image_offset, rects)
+        rects.append((x, y, width, height))
+
+    @classmethod
+    def discard(cls, texture):
+        """
+        Forget about the changed regions of the image of the given texture.
+        This needs to be called whenever a whole new image is loaded into the
+        texture, to prevent pixels of the previous image from being copied over
+        the new one before the next frame is rendered.
+
+        """
+
+        cls._dirty_regions.pop(texture, None)
+
+    @staticmethod
+    def __coalesce(rects):
+        """ Merge overlapping or adjacent rectangles into their bounding rectangles """
+
+        rects = [(x, y, x + w, y + h) for x, y, w, h in rects]
+        merged = True
+
+        while merged:
+
+            merged = False
+
+            for i, (l1, t1, r1, b1) in enumerate(rects):
+                for j in range(i + 1, len(rects)):
+                    l2, t2, r2, b2 = rects[j]
+                    if l1 <= r2 and l2 <= r1 and t1 <= b2 and t2 <= b1:
+                        rects[i] = (min(l1, l2), min(t1, t2), max(r1, r2), max(b1, b2))
+                        del rects[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        return rects
+
+    @classmethod
+    def __update_texture(cls, texture, image, image_offset, rects):
+
+        w_t = texture.get_x_size()
+        h_t = texture.get_y_size()
+        offset_x, offset_y = image_offset
+
+        def load_image():
+
+            if image_offset == (0, 0) and (image.get_x_size(), image.get_y_size()) == (w_t, h_t):
+                texture.load(image)
+            else:
+                sub_image = PNMImage(w_t, h_t, 4)
+                sub_image.copy_sub_image(image, 0, 0, offset_x, offset_y, w_t, h_t)
+                texture.load(sub_image)
+
+        if not (texture.has_ram_image() and texture.get_num_components() == 4
+                and texture.get_component_width() == 1
+                and texture.get_ram_image_compression() == Texture.CM_off):
+            load_image()
+            return
+
+        clipped_rects = []
+
+        for l, t, r, b in cls.__coalesce(rects):
+            l = max(0, l - offset_x)
+            t = max(0, t - offset_y)
+            r = min(w_t, r - offset_x)
+            b = min(h_t, b - offset_y)
+            if l < r and t < b:
+                clipped_rects.append((l, t, r - l, b - t))
+
+        if sum(w * h for l, t, w, h in clipped_rects) > w_t * h_t * cls.max_dirty_fraction:
+            load_image()
+            return
+
+        tex_view = memoryview(texture.modify_ram_image())
+        tmp_tex = Texture("tmp_tex")
+
+        for x, y, w, h in clipped_rects:
+
+            # let Panda3D convert the changed part of the image to the same
+            # RAM image format as that of the texture
+            sub_image = PNMImage(w, h, 4)
+            sub_image.copy_sub_image(image, 0, 0, x + offset_x, y + offset_y, w, h)
+            tmp_tex.load(sub_image)
+            sub_view = memoryview(tmp_tex.get_ram_image())
+            row_size = w * 4
+
+            # the rows of a RAM image are stored from the bottom up
+            for row in range(h):
+                start = ((h_t - y - h + row) * w_t + x) * 4
+                tex_view[start:start + row_size] = sub_view[row * row_size:(row + 1) * row_size]
+
+    @classmethod
+    def __update_textures(cls, task=None):
+
+        dirty_regions = cls._dirty_regions
+
+        for texture, (image, image_offset, rects) in dirty_regions.items():
+            cls.__update_texture(texture, image, image_offset, rects)
+
+        dirty_regions.clear()
+
+
 class WidgetCard:
 
     def __init__(self, widget_type, parent=None, is_root_container=False, sizer_borders=(0, 0, 0, 0)):
@@ -789,7 +923,7 @@ class WidgetCard:
         x += offset_x
         y += offset_y
         img.copy_sub_image(sub_image, x, y, 0, 0, width, height)
-        self.texture.load(img)
+        DirtyRegionCompositor.add_region(self.texture, img, x, y, width, height)
 
         return True
 
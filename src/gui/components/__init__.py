@@ -134,6 +134,7 @@ class Dock(WidgetCard):
                 img.copy_sub_image(widget_img, x_w, y_w, 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img)
 
         l = x
@@ -898,10 +899,8 @@ class Components:
 
         if update_type == "start":
             self._progress_dialog = ProgressDialog(message=arg1, cancellable=arg2)
-        elif update_type == "set_rate":
-            self._progress_dialog.set_rate(arg1)
-        elif update_type == "advance":
-            self._progress_dialog.advance()
+        elif update_type == "set":
+            self._progress_dialog.set_progress(arg1)
         elif update_type == "end":
             self._progress_dialog.close(answer="yes")
 
@@ -82,6 +82,7 @@ class ViewportButtonBar(WidgetCard):
                 img.copy_sub_image(widget_img, x_w, y_w, 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img)
 
         l = x
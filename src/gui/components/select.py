@@ -516,7 +516,7 @@ class SelectionManager:
         hotkey = ("n", 0)
         menu.set_item_hotkey("name_select", hotkey, "N")
 
-        region_select = {"is_default": False, "type": "rect", "enclose": False}
+        region_select = {"is_default": False, "type": "rect", "enclose": False, "backend": "gpu"}
         region_select["shape_color"] = Skin.colors["selection_region_shape_default"]
         region_select["fill_color"] = Skin.colors["selection_region_fill_default"]
         GD.set_default("region_select", region_select)
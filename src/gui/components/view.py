@@ -307,6 +307,7 @@ class ViewTileCard(WidgetCard):
                 img.copy_sub_image(widget_img, x_w, y_w, 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img)
         quad.set_texture(tex)
         self._image = img
@@ -565,6 +565,7 @@ class Dialog(WidgetCard):
                 img.blend_sub_image(widget_img, x, y, 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img)
 
         l = -bl
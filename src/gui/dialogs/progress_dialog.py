@@ -35,7 +35,6 @@ class ProgressBar(Widget):
 
         frame.set_progress_bar(self)
 
-        self._rate = 0.
         self._progress = 0.
 
     @property
@@ -43,11 +42,6 @@ class ProgressBar(Widget):
 
         return self.parent
 
-    def set_rate(self, rate):
-
-        if not self._rate:
-            self._rate = rate
-
     def __update_card_image(self):
 
         image = self.get_image(composed=False)
@@ -59,10 +53,14 @@ class ProgressBar(Widget):
         img.blend_sub_image(image, 0, 0, 0, 0)
         self.card.copy_sub_image(self, img, w, h)
 
-    def advance(self):
+    def set_progress(self, progress):
+
+        # the progress bar never moves backwards, even if the estimated duration
+        # of the process it represents was increased
+        progress = min(1., progress)
 
-        if self._rate:
-            self._progress = min(1., self._progress + self._rate)
+        if progress > self._progress:
+            self._progress = progress
             sizer_cell = self.sizer_cell
             sizer_cell.proportions = (self._progress, 0.)
             sizer = sizer_cell.sizer
@@ -99,10 +97,6 @@ class ProgressDialog(Dialog):
 
         self.finalize()
 
-    def set_rate(self, rate):
-
-        self._progress_bar.set_rate(rate)
-
-    def advance(self):
+    def set_progress(self, progress):
 
-        self._progress_bar.advance()
+        self._progress_bar.set_progress(progress)
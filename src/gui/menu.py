@@ -919,6 +919,7 @@ class Menu(WidgetCard):
             img.copy_sub_image(item.get_image(), x + w_tl, y + h_tl, 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img)
 
         l = -w_tl
@@ -234,6 +234,7 @@ class ControlPane(ScrollPane):
             img_new.copy_sub_image(panel.get_image(), 0, panel.get_pos(net=True)[1], 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img_new)
         self._image = img_new
         self.virtual_size = (w, h_virt_new)
@@ -339,6 +340,7 @@ class ControlPane(ScrollPane):
             img_new.copy_sub_image(panel.get_image(), 0, panel.get_pos(net=True)[1], 0, 0)
 
         tex = self.texture
+        DirtyRegionCompositor.discard(tex)
         tex.load(img_new)
         self._image = img_new
         self.virtual_size = (w, h_virt_new)
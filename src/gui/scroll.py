@@ -151,6 +151,7 @@ class ScrollThumb(Widget):
     def update_images(self):
 
         img = Widget.update_images(self)[self.state]
+        DirtyRegionCompositor.discard(self.texture)
         self.texture.load(img)
 
     def update_mouse_region_frames(self, exclude=""):
@@ -641,6 +642,7 @@ class ScrollPane(WidgetCard):
                 if self._image:
                     sub_image = PNMImage(w, h, 4)
                     sub_image.copy_sub_image(self._image, 0, 0, x, y, w, h)
+                    DirtyRegionCompositor.discard(self.texture)
                     self.texture.load(sub_image)
 
                 sx = tex_scale if scroll_dir == "horizontal" else 1.
@@ -722,6 +724,7 @@ class ScrollPane(WidgetCard):
                     img.unfiltered_stretch_from(src_img)
 
             self._copy_widget_images(img)
+            DirtyRegionCompositor.discard(tex)
 
             if self._subimg_index > -1:
                 w = w_subimg if scroll_dir == "horizontal" else width
@@ -761,17 +764,14 @@ class ScrollPane(WidgetCard):
         img.copy_sub_image(sub_image, x, y, 0, 0, width, height)
 
         if self._subimg_index > -1:
-            width, height = self.get_size()
             scroll_dir = self.sizer.prim_dir
-            w = self._subimg_w if scroll_dir == "horizontal" else width
-            h = height if scroll_dir == "horizontal" else self._subimg_h
-            x = self._subimg_x if scroll_dir == "horizontal" else 0
-            y = 0 if scroll_dir == "horizontal" else self._subimg_y
-            sub_image = PNMImage(w, h, 4)
-            sub_image.copy_sub_image(img, 0, 0, x, y, w, h)
-            self.texture.load(sub_image)
+            offset_x = self._subimg_x if scroll_dir == "horizontal" else 0
+            offset_y = 0 if scroll_dir == "horizontal" else self._subimg_y
+            image_offset = (offset_x, offset_y)
         else:
-            self.texture.load(img)
+            image_offset = (0, 0)
+
+        DirtyRegionCompositor.add_region(self.texture, img, x, y, width, height, image_offset)
 
     def update_mouse_region_frames(self, exclude="", recurse=True):
 
@@ -0,0 +1,244 @@
+"""
+Check that cancelling a long process (e.g. an import) restores the object
+registries and picking color ID ranges exactly as they were when their backups
+were created, going through the same managers, tasks and notification as the
+application itself does.
+
+Run from the root of the project with:
+
+    python -m unittest discover -s tests
+
+"""
+
+import os
+import sys
+import types
+import unittest
+
+try:
+    import panda3d.core
+except ImportError:
+    raise unittest.SkipTest("panda3d is not available")
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_PATH)
+
+
+def _add_bare_packages(*names):
+    """
+    Make the given packages importable without running their __init__ module,
+    so only the Core modules needed here get loaded, without also loading the
+    GUI and the rest of the Core as a side effect.
+
+    """
+
+    for name in names:
+        package = types.ModuleType(name)
+        package.__path__ = [os.path.join(ROOT_PATH, *name.split("."))]
+        sys.modules[name] = package
+
+
+_add_bare_packages("src", "src.core", "src.core.geom", "src.core.geom.data")
+
+from panda3d.core import SparseArray, Vec3
+from src.base import GlobalData as GD
+from src.mgr import AppManager
+from src.core.base import Mgr, PendingTasks, PickingColorIDManager
+from src.core.base.obj_mgr import GeneralObjectManager
+from src.core.geom.vert import VertexManager
+from src.core.geom.edge import EdgeManager
+from src.core.geom.poly import PolygonManager
+from src.core.geom.data.obj import GeomDataObject
+
+SUBOBJ_TYPES = ("vert", "edge", "poly")
+
+
+def setUpModule():
+
+    # the AppManager sets up the world that the GeneralObjectManager needs; the
+    # rest of Mgr.init() requires a window and all other main objects
+    Mgr._app_mgr = AppManager()
+    GeneralObjectManager()
+    VertexManager()
+    EdgeManager()
+    PolygonManager()
+    PickingColorIDManager.init()
+
+
+def _create_grid_data(size):
+    """ Return the geometry data of a flat grid of size * size quads. """
+
+    geom_data = []
+    normal = Vec3(0., 0., 1.)
+
+    for y in range(size):
+        for x in range(size):
+            corners = ((x, y), (x + 1, y), (x + 1, y + 1), (x, y + 1))
+            verts = [{"pos": (cx, cy, 0.), "normal": normal, "uvs": {0: (cx / size, cy / size)},
+                      "pos_ind": cy * (size + 1) + cx} for cx, cy in corners]
+            tris = [(verts[0], verts[1], verts[2]), (verts[0], verts[2], verts[3])]
+            geom_data.append({"verts": verts, "tris": tris})
+
+    return geom_data
+
+
+class RegistryBackupTest(unittest.TestCase):
+
+    def setUp(self):
+
+        Mgr.do("reset_registries")
+        Mgr.do("reset_picking_col_id_ranges")
+        self.geom_data = _create_grid_data(10)
+
+        # build up some state before the checkpoint, with gaps in the ID ranges
+        self.geom_data_objs = [self.__create_geom_data_object(f"test_{i}") for i in range(3)]
+
+        for geom_data_obj in self.geom_data_objs:
+            geom_data_obj.register(restore=False)
+
+        self.geom_data_objs[1].unregister()
+        Mgr.do("update_picking_col_id_ranges", as_task=False)
+
+    def tearDown(self):
+
+        # drop any backups left behind by a failed test, as well as the tasks
+        # that would otherwise remove them
+        self.__cancel_long_process()
+        PendingTasks.clear()
+
+    def __create_geom_data_object(self, data_id):
+
+        geom_data_obj = GeomDataObject(data_id, None)
+
+        for _ in geom_data_obj.process_geom_data(self.geom_data):
+            pass
+
+        return geom_data_obj
+
+    def __take_snapshot(self):
+
+        snapshot = {}
+
+        for subobj_type in SUBOBJ_TYPES:
+            objs = {obj.picking_color_id: obj for obj in Mgr.get(f"{subobj_type}_objs")}
+            last_id = Mgr.get(f"last_{subobj_type}_obj_id")
+            id_ranges = SparseArray(PickingColorIDManager._mgrs[subobj_type]._id_ranges)
+            snapshot[subobj_type] = (objs, last_id, id_ranges)
+
+        return snapshot
+
+    def __check_snapshot(self, snapshot):
+
+        for subobj_type in SUBOBJ_TYPES:
+
+            objs, last_id, id_ranges = snapshot[subobj_type]
+            restored_objs = {obj.picking_color_id: obj for obj in Mgr.get(f"{subobj_type}_objs")}
+            restored_id_ranges = PickingColorIDManager._mgrs[subobj_type]._id_ranges
+
+            self.assertEqual(Mgr.get(f"last_{subobj_type}_obj_id"), last_id)
+            self.assertEqual(restored_objs.keys(), objs.keys())
+
+            for key, obj in objs.items():
+                self.assertIs(restored_objs[key], obj)
+
+            self.assertEqual(restored_id_ranges, id_ranges,
+                             f"\n{subobj_type} restored:\n{restored_id_ranges}"
+                             f"\nexpected:\n{id_ranges}")
+
+    def __start_long_process(self):
+
+        Mgr.do("create_registry_backups")
+        Mgr.do("create_id_range_backups")
+
+    def __cancel_long_process(self):
+
+        Mgr.notify("long_process_cancelled", "test")
+
+    def test_cancel_creation(self):
+
+        snapshot = self.__take_snapshot()
+        self.__start_long_process()
+
+        # cancel the gradual creation of new subobjects part-way
+        geom_data_obj = GeomDataObject("test_cancelled", None)
+        process = geom_data_obj.process_geom_data(self.geom_data, gradual=True)
+
+        for _ in range(3):
+            next(process)
+
+        polys = geom_data_obj.get_subobjects("poly").values()
+        self.assertEqual(len(polys), 60)
+        self.assertNotIn(None, [poly.picking_color_id for poly in polys])
+
+        self.__cancel_long_process()
+        self.__check_snapshot(snapshot)
+
+    def test_cancel_after_registration(self):
+
+        snapshot = self.__take_snapshot()
+        self.__start_long_process()
+
+        # replace an object created before the checkpoint with new ones, as when
+        # unlocking geometry, which is cancellable after registration
+        new_objs = [self.__create_geom_data_object(f"test_new_{i}") for i in range(2)]
+
+        for geom_data_obj in new_objs:
+            geom_data_obj.register(restore=False)
+
+        self.geom_data_objs[0].unregister()
+        new_objs[0].unregister()
+        Mgr.do("update_picking_col_id_ranges", as_task=False)
+
+        # reuse the recovered IDs
+        self.__create_geom_data_object("test_reused").register(restore=False)
+
+        self.__cancel_long_process()
+        self.__check_snapshot(snapshot)
+
+    def test_cancel_after_reset(self):
+
+        snapshot = self.__take_snapshot()
+        self.__start_long_process()
+
+        # start over from empty registries, as when loading a scene file
+        Mgr.do("reset_registries")
+        Mgr.do("reset_picking_col_id_ranges")
+
+        for subobj_type in SUBOBJ_TYPES:
+            self.assertFalse(Mgr.get(f"{subobj_type}_objs"))
+
+        geom_data_obj = self.__create_geom_data_object("test_after_reset")
+        geom_data_obj.register(restore=False)
+
+        self.__cancel_long_process()
+        self.__check_snapshot(snapshot)
+
+    def test_cancel_without_changes(self):
+
+        snapshot = self.__take_snapshot()
+        self.__start_long_process()
+        self.__cancel_long_process()
+        self.__check_snapshot(snapshot)
+
+    def test_backups_removed(self):
+
+        self.__start_long_process()
+        self.__cancel_long_process()
+
+        # the backups are gone, so cancelling again must not change anything
+        self.__create_geom_data_object("test_after_cancel").register(restore=False)
+        snapshot = self.__take_snapshot()
+        self.__cancel_long_process()
+        self.__check_snapshot(snapshot)
+
+    def test_bulk_allocation_matches_single(self):
+
+        mgr = PickingColorIDManager._mgrs["vert"]
+        id_ranges = SparseArray(mgr._id_ranges)
+        ids = Mgr.get("next_picking_color_ids", "vert", 25)
+        mgr._id_ranges = id_ranges
+        self.assertEqual(ids, [mgr.get_next_picking_color_id() for _ in range(25)])
+
+
+if __name__ == "__main__":
+    unittest.main()